@@ -0,0 +1,508 @@
+"""
+Offline benchmark suite: python -m tests.benchmarks --sizes 1000,100000
+"""
+
+import contextlib
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from selenium.webdriver.common.by import By
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import twitter_data_collection as tdc
+from twitter_data_collection import (MIN_TWEETS_PER_HASHTAG, HttpCollector, LexiconMatcher, NearDuplicateIndex,
+                                     PartitionedTweetStore, RunMetrics, SeleniumCollector, SignalSeries,
+                                     SparseSignalEngine, StreamingPipeline, Throttle, TweetBuffer, TweetIdIndex,
+                                     TweetSink, clean_tweets, collect_hashtags_pooled, extract_tweet_from_article,
+                                     extract_visible_tweets, generate_signal, init_driver, page_has_error,
+                                     process_tree_rss_mb, score_lexicon, score_new_tweets, scored_schema,
+                                     scroll_and_collect)
+from tests.fakes import (ERROR_FIXTURE, TIMELINE_FIXTURE, FakeArticle, FakeDriver, MockTimelineServer,
+                         build_error_fixture, build_search_timeline_payload, build_timeline_fixture,
+                         fake_tweet_frame, iter_fake_tweets, make_fake_tweets, serve_fixtures)
+
+BENCH_SIZES = (1_000, 100_000, 1_000_000)
+BENCH_STAGES = ("scroll_and_collect", "extract_tweet_from_article", "clean_tweets", "generate_signal", "score_lexicon",
+                "signal_series", "parquet")
+BENCH_RESULTS_FILE = "bench_results.jsonl"   # one line per stage and size, tagged with the git commit
+BENCH_SCROLL_BATCH = 100                     # articles the fake timeline loads per scroll
+BENCH_PERSIST_BATCH = 1_000                  # records per store.append() in the parquet benchmark
+
+def _generate_signal_dense(df):
+    # the original implementation, kept only as the benchmark baseline
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words="english")
+    X = vectorizer.fit_transform(df["content"].astype(str)).toarray()
+    df["signal"] = np.mean(X, axis=1)
+    return df
+
+def benchmark_signal(n_rows=50_000, batch_rows=5_000):
+    """
+    Peak memory (tracemalloc) and throughput of the dense baseline vs. the
+    sparse engine, plus scoring one new batch incrementally vs. refitting.
+    """
+    import tracemalloc
+    tweets = make_fake_tweets("#nifty50", n_rows)
+    history = pd.DataFrame({"content": [t["content"] for t in tweets]})
+    batch = history.tail(batch_rows).copy()
+
+    def _measure(label, fn, rows):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"[BENCH] {label:<34} {elapsed:7.2f}s  {rows / elapsed:10.0f} rows/s  peak {peak / 2**20:8.1f} MB")
+        return {"seconds": elapsed, "peak_mb": peak / 2**20, "rows": rows}
+
+    results = {}
+    results["dense"] = _measure("dense baseline (refit, .toarray)", lambda: _generate_signal_dense(history.copy()), n_rows)
+    results["sparse_refit"] = _measure("sparse refit", lambda: generate_signal(history.copy()), n_rows)
+    warm = SparseSignalEngine(mode="incremental", model_file=None)
+    warm.score(history["content"].head(n_rows - batch_rows))
+    results["incremental_batch"] = _measure(f"incremental, new batch of {batch_rows}",
+                                            lambda: generate_signal(batch.copy(), engine=warm), batch_rows)
+    results["refit_batch"] = _measure(f"refit history + batch of {batch_rows}",
+                                      lambda: generate_signal(history.copy()), n_rows)
+    hashing = SparseSignalEngine(mode="hashing", model_file=None)
+    results["hashing"] = _measure("hashing", lambda: generate_signal(history.copy(), engine=hashing), n_rows)
+    return results
+
+def benchmark_pool(n_tags=4, pool_size=4, max_tweets=10, latency=0.005):
+    """
+    Offline wall-clock comparison of one session vs. a pool of sessions,
+    using FakeDriver (no browser, no login, no inter-tag pacing, and a token
+    bucket deep enough that the rate limit never kicks in).
+    """
+    tags = [f"#benchtag{i}" for i in range(n_tags)]
+    factory = lambda: FakeDriver(latency=latency)
+    results = {}
+    for size in (1, pool_size):
+        t0 = time.perf_counter()
+        tweets = collect_hashtags_pooled(tags, pool_size=size, pacing=None, driver_factory=factory,
+                                         login=None, sink=TweetSink(), max_tweets=max_tweets,
+                                         min_tweets=min(max_tweets, MIN_TWEETS_PER_HASHTAG), save=False,
+                                         throttle=Throttle(burst=n_tags))
+        results[size] = (time.perf_counter() - t0, len(tweets))
+        print(f"[BENCH] pool_size={size}: {results[size][0]:.1f}s for {results[size][1]} tweets")
+    print(f"[BENCH] Speedup x{results[1][0] / results[pool_size][0]:.2f} with {pool_size} sessions.")
+    return results
+
+def benchmark_pipeline(n_tags=4, max_tweets=60, latency=0.005, pacing=2.0):
+    """
+    Offline scrape-to-signal latency of the collect-then-analyze flow vs. the
+    StreamingPipeline, on FakeDriver with `pacing` seconds between tags.
+    Everything is written to a temporary directory.
+    """
+    import tempfile
+    tags = [f"#benchtag{i}" for i in range(n_tags)]
+    factory = lambda: FakeDriver(latency=latency)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        def _parts(name):
+            root = os.path.join(tmp, name)
+            return dict(store=PartitionedTweetStore(os.path.join(root, "tweets")),
+                        index=TweetIdIndex(os.path.join(root, "index")),
+                        engine=SparseSignalEngine(mode="incremental", model_file=None),
+                        signal_store=PartitionedTweetStore(os.path.join(root, "signals"), schema=scored_schema()),
+                        series=SignalSeries(os.path.join(root, "series")),
+                        near_dups=NearDuplicateIndex(None))
+
+        def _collect(**kwargs):
+            return collect_hashtags_pooled(tags, pool_size=1, pacing=(pacing, pacing), driver_factory=factory,
+                                           login=None, max_tweets=max_tweets, min_tweets=min(max_tweets, 10),
+                                           throttle=Throttle(burst=n_tags), **kwargs)
+
+        # collect everything, then analyze: no tweet has a signal before the last tag is scraped and scored
+        parts = _parts("sequential")
+        t0 = time.perf_counter()
+        tweets = _collect(store=parts["store"], index=parts["index"])
+        score_new_tweets(tweets, "#bench", parts["engine"], parts["signal_store"], parts["series"],
+                         parts["near_dups"])
+        results["sequential"] = {"seconds": time.perf_counter() - t0, "tweets": len(tweets)}
+
+        parts = _parts("pipeline")
+        t0 = time.perf_counter()
+        with StreamingPipeline(**parts) as pipeline:
+            tweets = _collect(pipeline=pipeline)
+        results["pipeline"] = dict(pipeline.report(), seconds=time.perf_counter() - t0)
+    print(f"[BENCH] collect then analyze: {results['sequential']['seconds']:.1f}s for "
+          f"{results['sequential']['tweets']} tweets; first signal after {results['sequential']['seconds']:.1f}s.")
+    rep = results["pipeline"]
+    print(f"[BENCH] pipeline: {rep['seconds']:.1f}s for {rep['tweets']} tweets; scrape-to-signal "
+          f"p50 {rep.get('latency_p50', 0):.2f}s, p95 {rep.get('latency_p95', 0):.2f}s.")
+    return results
+
+def benchmark_backends(pages=30, per_page=20, hashtag="#nifty50", browser=False, latency=0.0):
+    """
+    Throughput and memory of the HTTP backend (and, with browser=True, the
+    Selenium backend in headless Chrome) collecting the same recorded
+    timeline from a MockTimelineServer. Memory is the resident size of the
+    process tree doing the collecting: this Python process for HTTP,
+    chromedriver + Chrome for Selenium.
+    """
+    import tracemalloc
+    tweets = make_fake_tweets(hashtag, pages * per_page)
+    payloads = [build_search_timeline_payload(tweets[p * per_page:(p + 1) * per_page], cursor=f"DAABCgABF{p + 1:04d}")
+                for p in range(pages)]
+    results = {}
+    with MockTimelineServer(payloads, latency=latency) as server:
+        def _http_run():
+            collector = HttpCollector(search_url=server.search_url, bearer_token=server.bearer_token,
+                                      cookies=[{"name": "auth_token", "value": "mock"},
+                                               {"name": "ct0", "value": "mockcsrf"}],
+                                      page_size=per_page, page_pause=None)
+            collector.login()
+            got = collector.collect(hashtag, max_tweets=len(tweets), min_tweets=0)
+            collector.quit()
+            return collector, got
+
+        rss_before = process_tree_rss_mb()
+        t0 = time.perf_counter()
+        collector, got = _http_run()
+        seconds = time.perf_counter() - t0
+        rss = process_tree_rss_mb()
+        # a second, traced pass for the Python allocation peak (tracemalloc would distort the timing)
+        tracemalloc.start()
+        _http_run()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        results["http"] = {"tweets": len(got), "seconds": seconds, "tweets_per_s": len(got) / seconds,
+                           "requests": collector.requests_sent, "python_peak_mb": round(peak, 1),
+                           "rss_mb": rss, "rss_growth_mb": None if rss is None else round(rss - rss_before, 1)}
+
+        if browser:
+            server.require_auth = False  # the page has no login cookies for 127.0.0.1
+            with bench_config(TWITTER_BASE_URL=server.url, JITTER_FLOOR=(0, 0)):
+                collector = SeleniumCollector(init_driver(headless=True, profile_dir=None), login=None)
+                try:
+                    t0 = time.perf_counter()
+                    got = collector.collect(hashtag, max_tweets=len(tweets), min_tweets=0)
+                    seconds = time.perf_counter() - t0
+                    footprint = collector.footprint()
+                finally:
+                    collector.quit()
+            results["selenium"] = {"tweets": len(got), "seconds": seconds, "tweets_per_s": len(got) / seconds,
+                                   "rss_mb": footprint.get("rss_mb"), "js_heap_mb": footprint.get("js_heap_mb")}
+    for name, r in results.items():
+        print(f"[BENCH] {name:<8} {r['tweets']} tweets in {r['seconds']:.2f}s ({r['tweets_per_s']:,.0f} tweets/s), "
+              f"RSS {r['rss_mb']} MB" + (f" (+{r['rss_growth_mb']} MB)" if r.get("rss_growth_mb") is not None else ""))
+    return results
+
+def benchmark_extraction(fixture_path=TIMELINE_FIXTURE, driver=None, repeats=5, base_url=None):
+    """
+    Time per-element extraction against the bulk execute_script path on a
+    saved timeline page loaded in a real (headless) Chrome. With `base_url`
+    (see serve_fixtures) the page is fetched over HTTP instead of file://.
+    The page is reloaded before every pass (outside the timer), since the bulk
+    path marks and prunes what it reads; every pass must see the same articles.
+    """
+    if not os.path.exists(fixture_path):
+        build_timeline_fixture(fixture_path)
+    url = f"{base_url}/{os.path.basename(fixture_path)}" if base_url else "file://" + os.path.abspath(fixture_path)
+    own = driver is None
+    if own:
+        driver = init_driver(headless=True)
+
+    def _timed(extract):
+        elapsed, counts = 0.0, []
+        for _ in range(repeats):
+            driver.get(url)
+            t0 = time.perf_counter()
+            records = extract()
+            elapsed += time.perf_counter() - t0
+            counts.append(len(records or []))
+        if not counts[0] or len(set(counts)) > 1:
+            raise RuntimeError(f"Extraction passes returned {counts} tweets; expected the same non-zero count.")
+        return elapsed / repeats, counts[0]
+
+    try:
+        t_elem, n_elem = _timed(lambda: [extract_tweet_from_article(a)
+                                         for a in driver.find_elements(By.XPATH, "//article")])
+        t_bulk, n = _timed(lambda: extract_visible_tweets(driver))
+    finally:
+        if own:
+            driver.quit()
+    if n != n_elem:
+        raise RuntimeError(f"Bulk extraction read {n} tweets, per-element {n_elem}.")
+    print(f"[BENCH] per-element: {t_elem * 1000:.1f} ms/pass ({t_elem * 1000 / n:.2f} ms/article, {n} articles)")
+    print(f"[BENCH] bulk:        {t_bulk * 1000:.1f} ms/pass ({t_bulk * 1000 / n:.2f} ms/article, {n} articles)")
+    if t_bulk:
+        print(f"[BENCH] Bulk extraction speedup x{t_elem / t_bulk:.1f}")
+    return {"per_element_s": t_elem, "bulk_s": t_bulk, "articles": n}
+
+# =================== BENCHMARKS ===================
+@contextlib.contextmanager
+def bench_config(**overrides):
+    """
+    Temporarily replace module-level CONFIG values (or METRICS) of the collector for a benchmark.
+    """
+    g = vars(tdc)
+    saved = {name: g[name] for name in overrides}
+    g.update(overrides)
+    try:
+        yield
+    finally:
+        g.update(saved)
+
+def git_revision():
+    """
+    (short commit hash, dirty flag) of the checkout this script lives in; (None, False) outside git.
+    """
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                                capture_output=True, text=True, timeout=30).stdout.strip()
+    except Exception:
+        return None, False
+    return commit or None, bool(status)
+
+def _bench_frame(state, size, hashtag):
+    # raw tweets spread over the last 20h so the 24h cleaning window keeps them all
+    if "frame" not in state:
+        state["frame"] = fake_tweet_frame(hashtag, size, spacing_seconds=72_000 / size)
+    return state["frame"]
+
+def _bench_scroll_and_collect(size, hashtag, state):
+    # a few scripted error pages along the way, each cleared by scroll_and_collect's refresh
+    driver = FakeDriver(tweets_per_tag=size, batch=BENCH_SCROLL_BATCH, dom_window=4 * BENCH_SCROLL_BATCH,
+                        error_every=size // BENCH_SCROLL_BATCH // 3 + 1)
+    t0 = time.perf_counter()
+    tweets = scroll_and_collect(driver, hashtag, max_tweets=size, min_tweets=0)
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": len(tweets), "webdriver_commands": driver.commands,
+            "scrolls": driver.scrolls}
+
+def _bench_extract_tweet_from_article(size, hashtag, state):
+    # articles are built in chunks outside the timer; only extraction is measured
+    driver = FakeDriver()
+    feed = iter_fake_tweets(hashtag, size)
+    elapsed, rows = 0.0, 0
+    while True:
+        articles = [FakeArticle(driver, t) for t in itertools.islice(feed, 10_000)]
+        if not articles:
+            break
+        t0 = time.perf_counter()
+        for art in articles:
+            if extract_tweet_from_article(art):
+                rows += 1
+        elapsed += time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": rows, "webdriver_commands": driver.commands}
+
+def _bench_cleaned(state, size, hashtag):
+    # every size starts from an empty in-memory near-duplicate index (the sizes share their first tweets)
+    if "cleaned" not in state:
+        state["cleaned"] = clean_tweets(_bench_frame(state, size, hashtag).copy(), NearDuplicateIndex(directory=None))
+    return state["cleaned"]
+
+def _bench_clean_tweets(size, hashtag, state):
+    frame = _bench_frame(state, size, hashtag).copy()
+    near_dups = NearDuplicateIndex(directory=None)
+    t0 = time.perf_counter()
+    state["cleaned"] = clean_tweets(frame, near_dups)
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": size, "rows_out": len(state["cleaned"]), "near_dup_clusters": len(near_dups)}
+
+def _bench_generate_signal(size, hashtag, state):
+    df = _bench_cleaned(state, size, hashtag).copy()
+    engine = SparseSignalEngine(model_file=None)
+    t0 = time.perf_counter()
+    generate_signal(df, engine=engine)
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": len(df), "signal_mode": engine.mode}
+
+def _bench_score_lexicon(size, hashtag, state):
+    df = _bench_cleaned(state, size, hashtag).copy()
+    matcher = LexiconMatcher()
+    t0 = time.perf_counter()
+    scored = score_lexicon(df, matcher=matcher)
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": len(df), "terms": len(matcher.terms),
+            "hits": int(scored[matcher.classes].to_numpy().sum())}
+
+def _bench_signal_series(size, hashtag, state):
+    # incremental bar updates, fed in daemon-sized batches
+    if "scored" not in state:
+        df = _bench_cleaned(state, size, hashtag).copy()
+        df["signal"] = np.random.default_rng(0).random(len(df))
+        state["scored"] = df
+    df = state["scored"]
+    series = SignalSeries(directory=None)
+    t0 = time.perf_counter()
+    for i in range(0, len(df), 10_000):
+        series.update(df.iloc[i:i + 10_000], hashtag=hashtag)
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "rows": len(df), "bars": {k: len(v) for k, v in series.bars.items()}}
+
+def _bench_parquet(size, hashtag, state):
+    import tempfile
+    frame = _bench_frame(state, size, hashtag)
+    with tempfile.TemporaryDirectory(prefix="tqb-bench-") as root:
+        store = PartitionedTweetStore(root)
+        write_s = 0.0
+        for i in range(0, len(frame), BENCH_PERSIST_BATCH):
+            # collectors hand the store a TweetBuffer; building it is not part of the write
+            records = TweetBuffer(frame.iloc[i:i + BENCH_PERSIST_BATCH].to_dict("records"))
+            t0 = time.perf_counter()
+            store.append(records, hashtag)
+            write_s += time.perf_counter() - t0
+        parts = len(store.files())
+        t0 = time.perf_counter()
+        store.compact(min_files=2)
+        compact_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        rows = len(store.read(columns=["tweet_id", "timestamp", "content"]))
+        read_s = time.perf_counter() - t0
+        disk = sum(os.path.getsize(f) for f in store.files())
+    return {"seconds": write_s + compact_s + read_s, "rows": rows, "write_s": write_s,
+            "compact_s": compact_s, "read_s": read_s, "part_files": parts, "mb_on_disk": disk / 2**20}
+
+BENCH_STAGE_FNS = {
+    "scroll_and_collect": _bench_scroll_and_collect,
+    "extract_tweet_from_article": _bench_extract_tweet_from_article,
+    "clean_tweets": _bench_clean_tweets,
+    "generate_signal": _bench_generate_signal,
+    "score_lexicon": _bench_score_lexicon,
+    "signal_series": _bench_signal_series,
+    "parquet": _bench_parquet,
+}
+
+def run_benchmarks(sizes=BENCH_SIZES, stages=BENCH_STAGES, results_file=BENCH_RESULTS_FILE, hashtag="#nifty50",
+                   trace_memory=False, browser=False):
+    """
+    Offline benchmark suite: every stage in `stages` at every size in `sizes`
+    against FakeDriver and synthetic tweets, with humanized pauses zeroed. Each result is appended to `results_file` tagged with the
+    git commit, so runs can be compared across commits (compare_benchmarks).
+    trace_memory adds tracemalloc peaks (roughly doubles run time); browser
+    also times extraction on the served HTML fixtures in headless Chrome.
+    """
+    import gc
+    import tracemalloc
+    unknown = [s for s in stages if s not in BENCH_STAGE_FNS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark stage(s): {', '.join(unknown)}")
+    commit, dirty = git_revision()
+    run = {"run_id": uuid.uuid4().hex[:12], "commit": commit, "dirty": dirty,
+           "at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "python": sys.version.split()[0]}
+    print(f"[BENCH] Run {run['run_id']} at commit {commit or 'unknown'}{' (dirty)' if dirty else ''}.")
+    results = []
+    # pay for the lazy imports up front so the first size is not charged for them
+    for module in (tdc.pd, tdc.pa, tdc.pq, tdc.ds, tdc.By, tdc.Keys, tdc.WebDriverWait, tdc.EC, tdc.CountVectorizer,
+                   tdc.TfidfVectorizer, tdc.l2_normalize, tdc.sparse, tdc.connected_components):
+        module._load()
+
+    def _record(row):
+        results.append(row)
+        if results_file:
+            with open(results_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+
+    with bench_config(JITTER_FLOOR=(0, 0), METRICS=RunMetrics()):
+        for size in sizes:
+            state = {}
+            for stage in stages:
+                gc.collect()
+                if trace_memory:
+                    tracemalloc.start()
+                out = BENCH_STAGE_FNS[stage](size, hashtag, state)
+                peak = None
+                if trace_memory:
+                    peak = tracemalloc.get_traced_memory()[1] / 2**20
+                    tracemalloc.stop()
+                rate = out["rows"] / out["seconds"] if out["seconds"] else None
+                row = {**run, "stage": stage, "size": size, **out, "rows_per_s": rate, "peak_mb": peak}
+                print(f"[BENCH] {stage:<28} n={size:>9,}  {out['seconds']:8.2f}s  "
+                      f"{rate or 0:12,.0f} rows/s" + (f"  peak {peak:8.1f} MB" if peak is not None else ""))
+                _record(row)
+            del state
+
+    if browser:
+        build_timeline_fixture()
+        build_error_fixture()
+        driver = init_driver(headless=True, profile_dir=None)
+        try:
+            with serve_fixtures(os.path.dirname(TIMELINE_FIXTURE)) as base_url:
+                timing = benchmark_extraction(driver=driver, base_url=base_url)
+                driver.get(f"{base_url}/{os.path.basename(ERROR_FIXTURE)}")
+                error_seen = page_has_error(driver)
+        finally:
+            driver.quit()
+        print(f"[BENCH] Error page detected on fixture: {error_seen}")
+        _record({**run, "stage": "browser_extraction", "size": timing["articles"], "seconds": timing["bulk_s"],
+                 "rows": timing["articles"], "per_element_s": timing["per_element_s"],
+                 "rows_per_s": timing["articles"] / timing["bulk_s"] if timing["bulk_s"] else None,
+                 "error_page_detected": error_seen, "peak_mb": None})
+    return results
+
+def compare_benchmarks(results_file=BENCH_RESULTS_FILE, baseline=None):
+    """
+    Compare the latest benchmark run with the latest run of `baseline` (a
+    commit hash prefix; default: the most recent other commit benchmarked,
+    else the previous run of the same commit).
+    Returns one row per (stage, size) present in both.
+    """
+    if not os.path.exists(results_file):
+        print(f"[WARN] No benchmark results in {results_file}.")
+        return []
+    with open(results_file, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    if not rows:
+        return []
+    current_run = rows[-1]["run_id"]
+    current_commit = rows[-1]["commit"]
+    base_rows = [r for r in rows if r["run_id"] != current_run and (
+        r["commit"] != current_commit if not baseline else (r["commit"] or "").startswith(baseline))]
+    if not base_rows and not baseline:
+        base_rows = [r for r in rows if r["run_id"] != current_run]
+    if not base_rows:
+        print("[WARN] No baseline run to compare against.")
+        return []
+    base_run = base_rows[-1]["run_id"]
+    base = {(r["stage"], r["size"]): r for r in base_rows if r["run_id"] == base_run}
+    print(f"[BENCH] {base_rows[-1]['commit']} -> {current_commit}")
+    out = []
+    for r in rows:
+        if r["run_id"] != current_run or (r["stage"], r["size"]) not in base:
+            continue
+        before, after = base[(r["stage"], r["size"])]["seconds"], r["seconds"]
+        ratio = before / after if after else None
+        print(f"[BENCH] {r['stage']:<28} n={r['size']:>9,}  {before:8.2f}s -> {after:8.2f}s  "
+              f"x{ratio or 0:.2f}")
+        out.append({"stage": r["stage"], "size": r["size"], "before_s": before, "after_s": after, "speedup": ratio})
+    return out
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the collector (no browser or login needed).")
+    parser.add_argument("--sizes", default=",".join(map(str, BENCH_SIZES)),
+                        help="comma-separated tweet counts to benchmark")
+    parser.add_argument("--stages", default=",".join(BENCH_STAGES), help="comma-separated benchmark stages")
+    parser.add_argument("--trace-memory", action="store_true", help="record tracemalloc peaks (slower)")
+    parser.add_argument("--browser", action="store_true",
+                        help="also time extraction on the served fixtures in headless Chrome")
+    parser.add_argument("--backends", action="store_true",
+                        help="compare collector backends on a local mock timeline server (Selenium needs --browser)")
+    parser.add_argument("--compare", nargs="?", const="", default=None, metavar="COMMIT",
+                        help="compare the latest benchmark run with COMMIT (default: previous commit benchmarked)")
+    args = parser.parse_args(argv)
+
+    if args.backends:
+        benchmark_backends(browser=args.browser)
+    elif args.compare is None:
+        run_benchmarks(sizes=tuple(int(v) for v in args.sizes.split(",")), stages=tuple(args.stages.split(",")),
+                       trace_memory=args.trace_memory, browser=args.browser)
+    if args.compare is not None:
+        compare_benchmarks(baseline=args.compare or None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import pytest
+
+import twitter_data_collection as tdc
+from tests.fakes import FakeClock, FakeDriver, MockTimelineServer, build_search_timeline_payload, make_fake_tweets
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmp_path):
+    """
+    Every test runs in its own scratch directory (the CONFIG paths are
+    relative), with the humanized pauses zeroed, fresh run metrics and no
+    near-duplicate index cached from another test.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tdc, "JITTER_FLOOR", (0, 0))
+    monkeypatch.setattr(tdc, "METRICS", tdc.RunMetrics())
+    tdc._near_duplicate_index.cache_clear()
+    yield
+    tdc._near_duplicate_index.cache_clear()
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock(start=1_000.0)
+
+
+@pytest.fixture
+def fake_driver():
+    return FakeDriver(tweets_per_tag=120, batch=10)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return tdc.PartitionedTweetStore(str(tmp_path / "store"))
+
+
+@pytest.fixture
+def tweet_index(tmp_path):
+    return tdc.TweetIdIndex(str(tmp_path / "index"))
+
+
+@pytest.fixture
+def timeline_pages():
+    """Three recorded SearchTimeline pages of 20 tweets, chained by their Bottom cursors."""
+    tweets = make_fake_tweets("#nifty50", 60)
+    return [build_search_timeline_payload(tweets[p * 20:(p + 1) * 20], cursor=f"DAABCgABF{p + 1:04d}")
+            for p in range(3)]
+
+
+@pytest.fixture
+def mock_server(timeline_pages):
+    with MockTimelineServer(timeline_pages) as server:
+        yield server
@@ -0,0 +1,706 @@
+"""
+Offline stand-ins for the live site, used by the tests and the benchmarks:
+synthetic tweets, a scripted WebDriver, a manual clock, fixture pages and a
+local mock of the search timeline endpoint.
+"""
+
+import contextlib
+import functools
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, quote, urlsplit
+
+import pandas as pd
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+from twitter_data_collection import (BULK_EXTRACT_JS, MARK_ARTICLES_JS, METRIC_TEST_IDS, NETWORK_FIXTURE,
+                                     PAGE_ERROR_JS, UNPROCESSED_ARTICLES, WAIT_FOR_ARTICLES_JS, instrument_driver,
+                                     parse_timeline_payload)
+
+# =================== FIXTURES ===================
+TIMELINE_FIXTURE = "fixtures/timeline_sample.html"  # saved timeline page for the extraction benchmark
+ERROR_FIXTURE = "fixtures/error_page.html"          # the "Something went wrong" page, for the error check
+
+# =================== SYNTHETIC TWEETS ===================
+def iter_fake_tweets(hashtag, n, seed=None, spacing_seconds=30, first=0, now=None):
+    """
+    Deterministic synthetic tweets for one hashtag (newest first, like the Latest tab),
+    generated lazily so million-tweet timelines never sit in memory at once.
+    A negative `first` prepends tweets newer than `now` (posted since the
+    timeline was first served), with ids above the rest.
+    """
+    rng = random.Random(zlib.crc32(hashtag.encode()) if seed is None else seed)
+    words = ["nifty", "breakout", "support", "resistance", "buy", "sell", "target", "stoploss",
+             "bullish", "bearish", "expiry", "options", "call", "put", "gap", "rally", "dip"]
+    now = now or datetime.now(timezone.utc)
+    base_id = 1_800_000_000_000_000_000 + rng.randint(0, 10**15)
+    for i in range(first, n):
+        handle = f"trader{rng.randint(1, 500)}"
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(6, 20)))
+        yield {
+            "tweet_id": str(base_id - i * 4096),
+            "username": handle.title(),
+            "handle": handle,
+            "timestamp": (now - timedelta(seconds=spacing_seconds * i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "content": f"{body} {hashtag} #{rng.choice(words)} @{handle} #{i}",
+            "likes": rng.randint(0, 3000),
+            "retweets": rng.randint(0, 400),
+            "replies": rng.randint(0, 90),
+        }
+
+def make_fake_tweets(hashtag, n, seed=None, spacing_seconds=30):
+    return list(iter_fake_tweets(hashtag, n, seed=seed, spacing_seconds=spacing_seconds))
+
+def fake_tweet_frame(hashtag, n, spacing_seconds=30, chunk=50_000):
+    """
+    Synthetic tweets as a DataFrame, built chunk by chunk to keep peak memory low.
+    """
+    it = iter_fake_tweets(hashtag, n, spacing_seconds=spacing_seconds)
+    frames = []
+    while True:
+        part = list(itertools.islice(it, chunk))
+        if not part:
+            break
+        frames.append(pd.DataFrame(part))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+# =================== FAKE CLOCK ===================
+class FakeClock:
+    """
+    Manually advanced clock for the throttling and scheduling code: pass the
+    instance as `clock` and its .sleep as `sleep`, and waits cost no real time.
+    """
+    def __init__(self, start=0.0):
+        self.now = float(start)
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        seconds = max(0.0, seconds)
+        self.now += seconds
+        self.slept += seconds
+
+    advance = sleep
+
+# =================== FAKE DRIVER ===================
+def format_metric(n):
+    """
+    Render a count the way the timeline does: 950, 1.2K, 3.4M.
+    """
+    if n >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if n >= 10_000:
+        return f"{n // 1000}K"
+    if n >= 1_000:
+        return f"{n / 1000:.1f}K"
+    return str(n) if n else ""
+
+class FakeElement:
+    def __init__(self, driver, text="", attrs=None, on_keys=None, on_click=None):
+        self._driver = driver
+        self._text = text
+        self._attrs = attrs or {}
+        self._on_keys = on_keys
+        self._on_click = on_click
+
+    @property
+    def text(self):
+        self._driver.execute(Command.GET_ELEMENT_TEXT)
+        return self._text
+
+    def get_attribute(self, name):
+        self._driver.execute(Command.GET_ELEMENT_ATTRIBUTE)
+        return self._attrs.get(name)
+
+    def is_enabled(self):
+        self._driver.execute(Command.IS_ELEMENT_ENABLED)
+        return True
+
+    def find_element(self, by, value):
+        self._driver.execute(Command.FIND_CHILD_ELEMENT)
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        self._driver.execute(Command.FIND_CHILD_ELEMENTS)
+        return []
+
+    def clear(self):
+        self._driver.execute(Command.CLEAR_ELEMENT)
+        self._text = ""
+
+    def send_keys(self, keys):
+        self._driver.execute(Command.SEND_KEYS_TO_ELEMENT)
+        if self._on_keys:
+            self._on_keys(keys)
+
+    def click(self):
+        self._driver.execute(Command.CLICK_ELEMENT)
+        if self._on_click:
+            self._on_click()
+
+class FakeArticle(FakeElement):
+    """
+    One timeline <article> exposing the same nodes extract_tweet_from_article
+    queries. `liked` renders its like button as "unlike", the way the page
+    shows tweets the account has already liked.
+    """
+    def __init__(self, driver, tweet, liked=False):
+        text = "\n".join([tweet["username"], "@" + tweet["handle"], tweet["content"],
+                          str(tweet["replies"]), str(tweet["retweets"]), str(tweet["likes"])])
+        super().__init__(driver, text)
+        self.tweet = tweet
+        self.liked = liked
+        self.done = False
+
+    def is_enabled(self):
+        self._driver.execute(Command.IS_ELEMENT_ENABLED)
+        if self not in self._driver._dom:
+            raise StaleElementReferenceException("article is no longer attached to the DOM")
+        return True
+
+    def find_element(self, by, value):
+        self._driver.execute(Command.FIND_CHILD_ELEMENT)
+        t = self.tweet
+        if "tweetText" in value:
+            return FakeElement(self._driver, t["content"])
+        if "dir='auto'" in value:
+            return FakeElement(self._driver, t["username"])
+        if by == By.TAG_NAME and value == "time":
+            return FakeElement(self._driver, attrs={"datetime": t["timestamp"]})
+        if "//time" in value or "/status/" in value:
+            return FakeElement(self._driver, attrs={"href": f"https://x.com/{t['handle']}/status/{t['tweet_id']}"})
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        self._driver.execute(Command.FIND_CHILD_ELEMENTS)
+        for key, tid in METRIC_TEST_IDS:
+            if f"@data-testid='{'un' + tid if self.liked and tid == 'like' else tid}'" in value:
+                return [FakeElement(self._driver, format_metric(self.tweet[key]))]
+        return []
+
+    def bulk_record(self):
+        """What BULK_EXTRACT_JS returns for this article."""
+        t = self.tweet
+        return {"tweet_id": t["tweet_id"], "handle": t["handle"], "username": t["username"],
+                "timestamp": t["timestamp"], "content": t["content"], "likes": format_metric(t["likes"]),
+                "retweets": format_metric(t["retweets"]), "replies": format_metric(t["replies"])}
+
+class FakeDriver:
+    """
+    Scripted stand-in for a logged-in Chrome session. Serves synthetic
+    timelines for any searched hashtag, grows the visible timeline when
+    scrolled and can show the "Something went wrong" page a few times
+    (`error_pages` up front, or scripted every `error_every` scrolls).
+    Every command goes through execute(), like on a remote WebDriver, which
+    sleeps `latency` to emulate the chromedriver round trip; `commands` counts them. `dom_window` keeps only the newest N articles in
+    the DOM, like the real virtualized timeline (None keeps them all). With
+    network=True every newly loaded batch is also reported as a
+    SearchTimeline response in the performance log. `live_rate` (tweets/sec,
+    or {hashtag: tweets/sec}) makes new tweets appear at the top of each
+    timeline as `clock` advances, for exercising the daemon's polling.
+    `now` pins the newest tweet's timestamp, so two drivers serve identical timelines.
+    """
+    def __init__(self, tweets_per_tag=200, batch=8, latency=0.0, error_pages=0, network=False,
+                 dom_window=None, error_every=0, live_rate=None, clock=time.time, now=None):
+        self.tweets_per_tag = tweets_per_tag
+        self.network = network
+        self._perf_log = []
+        self._bodies = {}
+        self.batch = batch
+        self.latency = latency
+        self.error_pages = error_pages
+        self.error_every = error_every
+        self.dom_window = dom_window
+        self.commands = 0
+        self.scrolls = 0
+        self._url = "about:blank"
+        self.query = None
+        self.visible = 0
+        self._typed = ""
+        self._cookies = []
+        self._feed = iter(())
+        self._dom = []
+        self.live_rate = live_rate
+        self._clock = clock
+        self._t0 = clock()
+        self._now = now
+        instrument_driver(self)
+
+    def execute(self, driver_command, params=None):
+        self.commands += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"value": None}
+
+    @property
+    def current_url(self):
+        self.execute(Command.GET_CURRENT_URL)
+        return self._url
+
+    @current_url.setter
+    def current_url(self, value):
+        self._url = value
+
+    def _on_search_keys(self, keys):
+        if keys == Keys.ENTER:
+            self.current_url = f"https://x.com/search?q={quote(self._typed)}&src=typed_query"
+            self.query = self._typed
+            self.visible = 0
+            self._typed = ""
+            self._feed = self._new_feed(self.query)
+            self._dom = []
+            self._scroll()
+        else:
+            self._typed += keys
+
+    def _new_feed(self, hashtag):
+        rate = self.live_rate.get(hashtag, 0) if isinstance(self.live_rate, dict) else self.live_rate
+        if not rate:
+            return iter_fake_tweets(hashtag, self.tweets_per_tag, now=self._now)
+        fresh = int((self._clock() - self._t0) * rate)
+        return iter_fake_tweets(hashtag, self.tweets_per_tag, spacing_seconds=1.0 / rate, first=-fresh,
+                                now=datetime.fromtimestamp(self._t0, timezone.utc))
+
+    def _scroll(self):
+        if self.query is None:
+            return
+        self.scrolls += 1
+        if self.error_every and self.scrolls % self.error_every == 0:
+            # the page is either erroring or not: one refresh clears a scripted error
+            self.error_pages = max(self.error_pages, 1)
+        loaded = [FakeArticle(self, t) for t in itertools.islice(self._feed, self.batch)]
+        self._dom.extend(loaded)
+        self.visible += len(loaded)
+        if self.dom_window and len(self._dom) > self.dom_window:
+            del self._dom[:len(self._dom) - self.dom_window]
+        if self.network and loaded:
+            request_id = f"req-{len(self._bodies) + 1}"
+            page = [a.tweet for a in loaded]
+            self._bodies[request_id] = json.dumps(build_search_timeline_payload(page, cursor=f"cursor-{self.visible}"))
+            url = "https://x.com/i/api/graphql/abc123/SearchTimeline?variables=%7B%7D"
+            self._perf_log.append({"level": "INFO", "timestamp": int(time.time() * 1000), "message": json.dumps(
+                {"message": {"method": "Network.responseReceived",
+                             "params": {"requestId": request_id, "type": "XHR",
+                                        "response": {"url": url, "status": 200, "mimeType": "application/json"}}}})})
+
+    def get_log(self, log_type):
+        self.execute(Command.GET_LOG)
+        entries, self._perf_log = self._perf_log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.execute("executeCdpCommand")
+        if cmd == "Network.getResponseBody":
+            if params["requestId"] not in self._bodies:
+                raise NoSuchElementException("No resource with given identifier found")
+            return {"body": self._bodies[params["requestId"]], "base64Encoded": False}
+        if cmd == "Network.setCookies":
+            self._cookies.extend(params["cookies"])
+        return {}
+
+    # --- WebDriver surface used by the collector ---
+    def get(self, url):
+        self.execute(Command.GET)
+        self.current_url = url
+        # a reload renders the articles afresh, without the processed marks
+        for a in self._dom:
+            a.done = False
+
+    def refresh(self):
+        self.execute(Command.REFRESH)
+        if self.error_pages > 0:
+            self.error_pages -= 1
+
+    def quit(self):
+        self.execute(Command.QUIT)
+
+    def set_page_load_timeout(self, seconds):
+        self.execute(Command.SET_TIMEOUTS)
+
+    def set_script_timeout(self, seconds):
+        self.execute(Command.SET_TIMEOUTS)
+
+    def execute_async_script(self, script, *args):
+        self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC)
+        if script == WAIT_FOR_ARTICLES_JS:
+            return {"count": len(self._dom), "error": self.error_pages > 0, "added": True}
+        return None
+
+    def add_cookie(self, cookie):
+        self.execute(Command.ADD_COOKIE)
+        self._cookies.append(cookie)
+
+    def get_cookies(self):
+        self.execute(Command.GET_ALL_COOKIES)
+        return list(self._cookies)
+
+    def get_cookie(self, name):
+        self.execute(Command.GET_COOKIE)
+        return next((c for c in self._cookies if c.get("name") == name), None)
+
+    @property
+    def page_source(self):
+        self.execute(Command.GET_PAGE_SOURCE)
+        if self.error_pages > 0:
+            return "<html><body>Something went wrong. Try reloading.</body></html>"
+        return "<html><body>" + "<article></article>" * len(self._dom) + "</body></html>"
+
+    def execute_script(self, script, *args):
+        self.execute(Command.W3C_EXECUTE_SCRIPT)
+        if script == PAGE_ERROR_JS:
+            return self.error_pages > 0
+        if script == BULK_EXTRACT_JS:
+            skip = set(args[0]) if args else set()
+            high_water = int(args[1]) if len(args) > 1 and args[1] else 0
+            out = []
+            for a in self._unprocessed():
+                a.done = True
+                if a.tweet["tweet_id"] in skip:
+                    continue
+                if high_water and int(a.tweet["tweet_id"]) <= high_water:
+                    out.append({"tweet_id": a.tweet["tweet_id"], "known": True})
+                else:
+                    out.append(a.bulk_record())
+            return out
+        if script == MARK_ARTICLES_JS:
+            for a in args[0]:
+                a.done = True
+            return True
+        if "scroll" in script:
+            self._scroll()
+        return None
+
+    def find_element(self, by, value):
+        self.execute(Command.FIND_ELEMENT)
+        if "input" in value:
+            return FakeElement(self, attrs={"aria-label": "Search query"}, on_keys=self._on_search_keys)
+        if by == By.TAG_NAME and value == "body":
+            return FakeElement(self, on_keys=lambda k: self._scroll())
+        if by == By.LINK_TEXT and value == "Latest":
+            return FakeElement(self, "Latest")
+        if by == By.CSS_SELECTOR and value == "article" and self._dom:
+            return self._dom[0]
+        raise NoSuchElementException(value)
+
+    def _unprocessed(self):
+        return [a for a in self._dom if not a.done]
+
+    def find_elements(self, by, value):
+        self.execute(Command.FIND_ELEMENTS)
+        if value == "//article":
+            return list(self._dom)
+        if value == UNPROCESSED_ARTICLES:
+            return self._unprocessed()
+        if "role='tab'" in value:
+            return [FakeElement(self, "Latest")]
+        return []
+
+# =================== FIXTURE BUILDERS ===================
+def build_search_timeline_payload(tweets, cursor=None):
+    """
+    A SearchTimeline GraphQL response (same nesting as the live API) for the
+    given tweets; used for fixtures, FakeDriver and the mock server.
+    """
+    def _created_at(iso):
+        dt = datetime.strptime(iso[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        return dt.strftime("%a %b %d %H:%M:%S +0000 %Y")
+
+    entries = [{
+        "entryId": f"tweet-{t['tweet_id']}",
+        "sortIndex": t["tweet_id"],
+        "content": {
+            "entryType": "TimelineTimelineItem",
+            "__typename": "TimelineTimelineItem",
+            "itemContent": {
+                "itemType": "TimelineTweet",
+                "__typename": "TimelineTweet",
+                "tweet_results": {"result": {
+                    "__typename": "Tweet",
+                    "rest_id": t["tweet_id"],
+                    "core": {"user_results": {"result": {
+                        "__typename": "User",
+                        "core": {"name": t["username"], "screen_name": t["handle"]},
+                        "legacy": {"name": t["username"], "screen_name": t["handle"]},
+                    }}},
+                    "legacy": {
+                        "id_str": t["tweet_id"],
+                        "created_at": _created_at(t["timestamp"]),
+                        "full_text": t["content"],
+                        "favorite_count": t["likes"],
+                        "retweet_count": t["retweets"],
+                        "reply_count": t["replies"],
+                    },
+                }},
+            },
+        },
+    } for t in tweets]
+    if cursor:
+        entries.append({"entryId": f"cursor-bottom-{cursor}", "sortIndex": "0",
+                        "content": {"entryType": "TimelineTimelineCursor", "__typename": "TimelineTimelineCursor",
+                                    "value": cursor, "cursorType": "Bottom"}})
+    return {"data": {"search_by_raw_query": {"search_timeline": {"timeline": {
+        "instructions": [{"type": "TimelineAddEntries", "entries": entries}]}}}}}
+
+def build_network_fixture(path=NETWORK_FIXTURE, pages=3, per_page=20, hashtag="#nifty50"):
+    tweets = make_fake_tweets(hashtag, pages * per_page)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for p in range(pages):
+            page = tweets[p * per_page:(p + 1) * per_page]
+            f.write(json.dumps(build_search_timeline_payload(page, cursor=f"DAABCgABF{p + 1:04d}")) + "\n")
+    return path
+
+def build_timeline_fixture(path=TIMELINE_FIXTURE, n=60, hashtag="#nifty50"):
+    """
+    Write a static timeline page with the same article markup the live
+    search page uses (User-Name, permalink <time>, tweetText, metric groups).
+    """
+    import html
+    articles = []
+    for i, t in enumerate(make_fake_tweets(hashtag, n)):
+        liked = i % 5 == 0  # tweets the account has liked carry data-testid="unlike"
+        metrics = "".join(
+            f'<div role="button" data-testid="{"un" + tid if liked and tid == "like" else tid}" '
+            f'aria-label="{t[key]} {plural}. {label}"><span>{format_metric(t[key])}</span></div>'
+            for tid, key, plural, label in (("reply", "replies", "Replies", "Reply"),
+                                            ("retweet", "retweets", "Reposts", "Repost"),
+                                            ("like", "likes", "Likes", "Like")))
+        articles.append(
+            '<article data-testid="tweet" role="article"><div>'
+            f'<div data-testid="User-Name"><div dir="auto"><span>{html.escape(t["username"])}</span></div>'
+            f'<a href="/{t["handle"]}" role="link"><span>@{t["handle"]}</span></a>'
+            f'<a href="/{t["handle"]}/status/{t["tweet_id"]}" role="link"><time datetime="{t["timestamp"]}">1m</time></a></div>'
+            f'<div data-testid="tweetText" dir="auto" lang="en"><span>{html.escape(t["content"])}</span></div>'
+            f'<div role="group">{metrics}</div></div></article>')
+    page = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Search / X</title></head><body>'
+            '<main role="main"><div aria-label="Timeline: Search timeline">'
+            + "\n".join(articles) + '</div></main></body></html>')
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+def build_error_fixture(path=ERROR_FIXTURE):
+    """
+    Write the timeline's "Something went wrong" state, for checking page_has_error in a real browser.
+    """
+    page = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Search / X</title></head><body>'
+            '<main role="main"><div aria-label="Timeline: Search timeline"><div>'
+            '<span>Something went wrong. Try reloading.</span>'
+            '<div role="button"><span>Retry</span></div></div></div></main></body></html>')
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+@contextlib.contextmanager
+def serve_fixtures(directory="fixtures", port=0):
+    """
+    Serve the fixture pages over http://127.0.0.1 so the browser loads them the
+    way it loads the live site (file:// pages skip the network stack).
+    Yields the base URL.
+    """
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+    class _Quiet(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), functools.partial(_Quiet, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+# =================== MOCK TIMELINE SERVER ===================
+_MOCK_SEARCH_PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Search / X</title></head><body>
+<main role="main">
+<input aria-label="Search query" placeholder="Search" role="combobox">
+<div role="tablist"><a role="tab" id="latest" href="#">Latest</a></div>
+<div aria-label="Timeline: Search timeline" id="timeline"></div>
+</main>
+<script>
+const API = __API__, BEARER = __BEARER__;
+const query = new URLSearchParams(location.search).get("q");
+const box = document.querySelector("input"), timeline = document.getElementById("timeline");
+let cursor = null, loading = false, done = false;
+box.value = query || "";
+box.addEventListener("keydown", e => {
+  if (e.key === "Enter") location.href = "/search?q=" + encodeURIComponent(box.value) + "&src=typed_query";
+});
+document.getElementById("latest").href = "/search?q=" + encodeURIComponent(query || "") + "&f=live";
+const esc = s => String(s == null ? "" : s).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+const metric = (tid, n, plural, label) =>
+  `<div role="button" data-testid="${tid}" aria-label="${n} ${plural}. ${label}"><span>${n}</span></div>`;
+function article(r) {
+  const t = r.legacy, u = r.core.user_results.result.core, id = r.rest_id;
+  return `<div data-testid="cellInnerDiv"><article data-testid="tweet" role="article"><div>` +
+    `<div data-testid="User-Name"><div dir="auto"><span>${esc(u.name)}</span></div>` +
+    `<a href="/${esc(u.screen_name)}" role="link"><span>@${esc(u.screen_name)}</span></a>` +
+    `<a href="/${esc(u.screen_name)}/status/${id}" role="link"><time datetime="${new Date(t.created_at).toISOString()}">1m</time></a></div>` +
+    `<div data-testid="tweetText" dir="auto" lang="en"><span>${esc(t.full_text)}</span></div>` +
+    `<div role="group">${metric("reply", t.reply_count, "Replies", "Reply")}${metric("retweet", t.retweet_count, "Reposts", "Repost")}` +
+    `${metric("like", t.favorite_count, "Likes", "Like")}</div></div></article></div>`;
+}
+async function load() {
+  if (!query || loading || done) return;
+  loading = true;
+  const vars = {rawQuery: query, count: 20, querySource: "typed_query", product: "Latest"};
+  if (cursor) vars.cursor = cursor;
+  const csrf = (document.cookie.match(/(?:^|; )ct0=([^;]*)/) || [])[1] || "";
+  const resp = await fetch(API + "?variables=" + encodeURIComponent(JSON.stringify(vars)),
+                           {headers: {"authorization": "Bearer " + BEARER, "x-csrf-token": csrf}});
+  if (!resp.ok) {
+    // split so the page source only says it once the error is on screen
+    timeline.insertAdjacentHTML("beforeend", "<div><span>Something went " + "wrong. Try " + "reloading.</span></div>");
+    loading = false;
+    return;
+  }
+  const payload = await resp.json();
+  let next = null, html = "";
+  for (const ins of payload.data.search_by_raw_query.search_timeline.timeline.instructions) {
+    for (const e of ins.entries || []) {
+      if (e.content.cursorType === "Bottom") { next = e.content.value; continue; }
+      const r = e.content.itemContent && e.content.itemContent.tweet_results.result;
+      if (r) html += article(r);
+    }
+  }
+  timeline.insertAdjacentHTML("beforeend", html);
+  done = !next || next === cursor;
+  cursor = next;
+  loading = false;
+}
+const nearBottom = () => window.innerHeight + window.scrollY >= document.body.scrollHeight - 400;
+window.addEventListener("scroll", () => { if (nearBottom()) load(); });
+document.addEventListener("keydown", () => setTimeout(() => { if (nearBottom()) load(); }, 50));
+load();
+</script></body></html>"""
+
+class MockTimelineServer:
+    """
+    Local stand-in for the site's search side that replays recorded
+    SearchTimeline responses (NETWORK_FIXTURE layout: one page per line,
+    each ending in the Bottom cursor of the next) for any query.
+
+    - GET `api_path` answers the page for the request's cursor (an empty
+      page once they run out). With require_auth it answers 403 unless the
+      request carries the bearer token, an auth_token cookie and an
+      x-csrf-token equal to its ct0 cookie; after `rate_limit_after`
+      requests it answers 429.
+    - GET /home and /search serve a minimal search page with the live
+      markup (search box, Latest tab, tweet articles) that pages through
+      the same endpoint as it is scrolled, for the Selenium backend
+      (TWITTER_BASE_URL = server.url).
+
+    Use as a context manager; `url` is the site, `search_url` the endpoint.
+    """
+    api_path = "/i/api/graphql/mock/SearchTimeline"
+
+    def __init__(self, pages=None, fixture=NETWORK_FIXTURE, bearer_token="mock-bearer-token", require_auth=True,
+                 rate_limit_after=None, latency=0.0, port=0):
+        if pages is None:
+            if not os.path.exists(fixture):
+                build_network_fixture(fixture)
+            with open(fixture, "r", encoding="utf-8") as f:
+                pages = [json.loads(line) for line in f if line.strip()]
+        self.pages = list(pages)
+        self._page_after = {parse_timeline_payload(page)[1]: n + 1 for n, page in enumerate(self.pages)}
+        self.bearer_token = bearer_token
+        self.require_auth = require_auth
+        self.rate_limit_after = rate_limit_after
+        self.latency = latency
+        self.port = port
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def search_url(self):
+        return self.url + self.api_path
+
+    def page(self, cursor=None):
+        n = self._page_after.get(cursor, len(self.pages)) if cursor else 0
+        return self.pages[n] if n < len(self.pages) else build_search_timeline_payload([])
+
+    def _authorized(self, headers):
+        cookies = dict(part.strip().partition("=")[::2] for part in (headers.get("Cookie") or "").split(";")
+                       if "=" in part)
+        return (headers.get("authorization") == f"Bearer {self.bearer_token}" and bool(cookies.get("auth_token"))
+                and bool(cookies.get("ct0")) and headers.get("x-csrf-token") == cookies["ct0"])
+
+    def respond(self, query, headers):
+        """(status, JSON payload) for one timeline request."""
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+        if self.latency:
+            time.sleep(self.latency)
+        if self.require_auth and not self._authorized(headers):
+            return 403, {"errors": [{"message": "Could not authenticate you.", "code": 32}]}
+        if self.rate_limit_after is not None and n > self.rate_limit_after:
+            return 429, {"errors": [{"message": "Rate limit exceeded", "code": 88}]}
+        try:
+            variables = json.loads((query.get("variables") or ["{}"])[0])
+        except ValueError:
+            return 400, {"errors": [{"message": "Bad variables"}]}
+        return 200, self.page(variables.get("cursor"))
+
+    def search_page(self):
+        return (_MOCK_SEARCH_PAGE.replace("__API__", json.dumps(self.api_path))
+                .replace("__BEARER__", json.dumps(self.bearer_token)))
+
+    def __enter__(self):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        mock = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path == mock.api_path:
+                    status, payload = mock.respond(parse_qs(parts.query), self.headers)
+                    self._send(status, json.dumps(payload))
+                elif parts.path in ("/", "/home", "/search"):
+                    self._send(200, mock.search_page(), "text/html")
+                else:
+                    self._send(404, json.dumps({"errors": [{"message": "Not found"}]}))
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-timeline", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,44 @@
+import pytest
+
+from twitter_data_collection import CollectorBackend, HttpCollector, SeleniumCollector, collect_tag
+from tests.fakes import FakeDriver
+
+
+def test_backend_without_collect_fails_at_construction():
+    class Incomplete(CollectorBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_selenium_backend_wraps_a_driver():
+    backend = SeleniumCollector(FakeDriver(tweets_per_tag=30, batch=10), login=None)
+    assert len(collect_tag(backend, "#nifty50", max_tweets=30, min_tweets=0)) == 30
+
+
+def test_http_backend_pages_the_mock_timeline(mock_server):
+    backend = HttpCollector(search_url=mock_server.search_url, bearer_token=mock_server.bearer_token,
+                            cookies=[{"name": "auth_token", "value": "mock"}, {"name": "ct0", "value": "mockcsrf"}],
+                            page_size=20, page_pause=None)
+    backend.login()
+    try:
+        tweets = backend.collect("#nifty50", max_tweets=100, min_tweets=0)
+    finally:
+        backend.quit()
+    assert len(tweets) == 60
+    assert mock_server.requests >= 3
+
+
+def test_http_backend_follows_a_rotated_ct0():
+    backend = HttpCollector(search_url="https://x.com/i/api/graphql/mock/SearchTimeline", bearer_token="token",
+                            cookies=[{"name": "auth_token", "value": "mock"}, {"name": "ct0", "value": "csrf-1"}])
+    backend.login()
+    assert backend._csrf_token() == "csrf-1"
+    # a Set-Cookie scoped to the parent domain, next to the copy login() set on the host
+    backend.session.cookies.set("ct0", "csrf-2", domain=".x.com", path="/")
+    assert backend._csrf_token() == "csrf-2"
+    assert backend.session.cookies.get("ct0") == "csrf-2"
+    backend.session.cookies.set("ct0", "csrf-3", domain=".x.com", path="/")
+    assert backend._csrf_token() == "csrf-3"
+    backend.quit()
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from twitter_data_collection import TweetBuffer, records_to_table
+from tests.fakes import make_fake_tweets
+
+
+def _records(n=12):
+    records = make_fake_tweets("#nifty50", n)
+    for i, r in enumerate(records):
+        r["hashtags"] = ["#nifty50", f"#t{i % 3}"][:i % 3]
+        r["mentions"] = [f"@{r['handle']}"] if i % 2 else []
+    # the holes an extractor leaves: no id, no username, a missing count
+    records[1].update(tweet_id=None, username=None, likes=None)
+    return records
+
+
+def test_arrow_and_pandas_match_the_record_path():
+    records = _records()
+    buf = TweetBuffer(records)
+    assert buf.to_arrow().equals(records_to_table(records))
+    assert buf.to_arrow("#sensex").equals(records_to_table(records, "#sensex"))
+    expected = records_to_table(records).to_pandas()
+    pd.testing.assert_frame_equal(buf.to_pandas(), expected)
+    assert buf.to_pandas().dtypes.equals(expected.dtypes)
+
+
+def test_records_read_back_unchanged():
+    records = _records()
+    buf = TweetBuffer(records)
+    back = list(buf)
+    assert back[0] == dict(records[0], query=None)
+    assert back[1]["tweet_id"] is None and back[1]["likes"] == 0
+    assert buf[-1]["mentions"] == records[-1]["mentions"]
+
+
+def test_append_and_extend_after_export():
+    records = _records(20)
+    buf = TweetBuffer(records[:10])
+    exported = buf.to_arrow()
+    frame = buf.to_pandas()
+    buf.append(records[10])
+    buf.extend(TweetBuffer(records[11:15]))
+    buf.extend(records[15:])
+    assert len(buf) == 20
+    assert exported.num_rows == 10 and len(frame) == 10
+    assert exported.equals(records_to_table(records[:10]))
+    assert buf.to_arrow().equals(records_to_table(records))
+
+
+def test_empty_buffer_exports_an_empty_table():
+    assert TweetBuffer().to_arrow().equals(records_to_table([]))
+    assert TweetBuffer().to_pandas().empty
@@ -0,0 +1,45 @@
+import time
+
+from selenium.webdriver.common.keys import Keys
+
+from twitter_data_collection import extract_visible_tweets, scroll_and_collect, search_hashtag
+from tests.fakes import FakeDriver
+
+
+class SlowSearchDriver(FakeDriver):
+    """Runs a search `delay` seconds after Enter, leaving the old timeline up meanwhile."""
+    delay = 0.3
+    _navigate_at = None
+
+    def _on_search_keys(self, keys):
+        if keys == Keys.ENTER and self._navigate_at is None:
+            self._navigate_at = time.monotonic() + self.delay
+        else:
+            super()._on_search_keys(keys)
+
+    def execute(self, driver_command, params=None):
+        if self._navigate_at is not None and time.monotonic() >= self._navigate_at:
+            self._navigate_at = None
+            super()._on_search_keys(Keys.ENTER)
+        return super().execute(driver_command, params)
+
+
+def test_search_waits_for_the_results_to_replace_the_old_timeline():
+    driver = SlowSearchDriver(tweets_per_tag=50, batch=10)
+    search_hashtag(driver, "#nifty50")
+    search_hashtag(driver, "#sensex")
+    tweets = extract_visible_tweets(driver)
+    assert tweets and all("#sensex" in t["content"] for t in tweets)
+
+
+def test_short_timeline_gives_up_without_sleeping():
+    driver = FakeDriver(tweets_per_tag=15, batch=5)
+    t0 = time.perf_counter()
+    tweets = scroll_and_collect(driver, "#nifty50", max_tweets=100, min_tweets=50)
+    assert len(tweets) == 15
+    assert time.perf_counter() - t0 < 10
+
+
+def test_scripted_error_pages_are_cleared_by_one_refresh():
+    driver = FakeDriver(tweets_per_tag=60, batch=5, error_every=2)
+    assert len(scroll_and_collect(driver, "#nifty50", max_tweets=60, min_tweets=0)) == 60
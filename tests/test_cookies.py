@@ -0,0 +1,107 @@
+import json
+import pickle
+
+import pytest
+
+import twitter_data_collection as tdc
+from twitter_data_collection import cookie_to_cdp, inject_cookies, login_driver, normalize_cookie_for_selenium
+from tests.fakes import FakeDriver
+
+EXPORT = [
+    {"name": "auth_token", "value": "secret", "domain": ".x.com", "path": "/", "secure": True, "httpOnly": True,
+     "expirationDate": 1893456000.5, "expires": "1893456000", "sameSite": "no_restriction"},
+    {"name": "ct0", "value": "csrf-1", "domain": ".x.com", "secure": True, "sameSite": "lax"},
+]
+
+
+def test_normalize_fills_domain_and_path():
+    c = normalize_cookie_for_selenium({"Name": "guest_id", "Value": "v1"})
+    assert c == {"name": "guest_id", "value": "v1", "domain": ".twitter.com", "path": "/"}
+    assert normalize_cookie_for_selenium({"key": "k", "value": "v", "Domain": "x.com"})["domain"] == "x.com"
+    assert normalize_cookie_for_selenium({"name": "no_value"}) is None
+    assert normalize_cookie_for_selenium({"value": "no_name"}) is None
+
+
+@pytest.mark.parametrize("field, value, expiry", [
+    ("expiry", 1893456000, 1893456000),
+    ("expires", "1893456000", 1893456000),
+    ("Expires", 1893456000.75, 1893456000),
+    ("expires", "1893456000.75", 1893456000),
+    ("expires", "Tue, 01 Jan 2030 00:00:00 GMT", None),
+])
+def test_normalize_expiry_to_integer_seconds(field, value, expiry):
+    c = normalize_cookie_for_selenium({"name": "n", "value": "v", field: value})
+    assert c.get("expiry") == expiry
+
+
+def test_cookie_to_cdp_maps_the_devtools_fields():
+    c = cookie_to_cdp(normalize_cookie_for_selenium(EXPORT[0]))
+    assert c == {"name": "auth_token", "value": "secret", "domain": ".x.com", "path": "/", "secure": True,
+                 "httpOnly": True, "expires": 1893456000, "sameSite": "None"}
+    assert cookie_to_cdp(normalize_cookie_for_selenium(EXPORT[1]))["sameSite"] == "Lax"
+
+
+def test_inject_sets_every_cookie_with_one_cdp_call():
+    driver = FakeDriver()
+    cookies = [normalize_cookie_for_selenium(c) for c in EXPORT] + [None, {"name": "empty"}]
+    assert inject_cookies(driver, cookies) == 2
+    assert driver.get_cookies() == [cookie_to_cdp(c) for c in cookies[:2]]
+    # no page load needed
+    assert driver.current_url == "about:blank"
+
+
+class NoDevToolsDriver(FakeDriver):
+    """A driver without CDP whose add_cookie rejects sameSite, like older Selenium builds."""
+    def execute_cdp_cmd(self, cmd, params):
+        raise RuntimeError("not a Chromium driver")
+
+    def add_cookie(self, cookie):
+        if "sameSite" in cookie:
+            raise ValueError("invalid sameSite")
+        super().add_cookie(cookie)
+
+
+def test_inject_falls_back_to_add_cookie(monkeypatch):
+    monkeypatch.setattr(tdc.time, "sleep", lambda seconds: None)
+    driver = NoDevToolsDriver()
+    cookies = [normalize_cookie_for_selenium(c) for c in EXPORT]
+    assert inject_cookies(driver, cookies) == 2
+    assert driver.current_url == tdc.TWITTER_BASE_URL
+    assert [c["name"] for c in driver.get_cookies()] == ["auth_token", "ct0"]
+    assert all("sameSite" not in c for c in driver.get_cookies())
+
+
+class RotatingDriver(FakeDriver):
+    """Sets a new ct0 on every /home load, as the site does after a login."""
+    def get(self, url):
+        super().get(url)
+        if url.endswith("/home"):
+            self._cookies = [dict(c, value="csrf-2") if c["name"] == "ct0" else c for c in self._cookies]
+
+
+def test_login_saves_the_cookies_the_browser_holds(monkeypatch):
+    with open(tdc.COOKIES_JSON_FILE, "w", encoding="utf-8") as f:
+        json.dump(EXPORT, f)
+    monkeypatch.setattr(tdc, "CHROME_PROFILE_DIR", None)
+    login_driver(RotatingDriver())
+    with open(tdc.COOKIES_FILE_PKL, "rb") as f:
+        saved = {c["name"]: c["value"] for c in pickle.load(f)}
+    assert saved == {"auth_token": "secret", "ct0": "csrf-2"}
+    # the next login starts from the rotated cookies
+    driver = FakeDriver()
+    login_driver(driver)
+    assert driver.get_cookie("ct0")["value"] == "csrf-2"
+
+
+@pytest.mark.parametrize("profile_is_new, checks", [(True, 0), (False, 1)])
+def test_session_check_is_skipped_on_a_new_profile(monkeypatch, profile_is_new, checks):
+    with open(tdc.COOKIES_JSON_FILE, "w", encoding="utf-8") as f:
+        json.dump(EXPORT, f)
+    monkeypatch.setattr(tdc, "CHROME_PROFILE_DIR", "chrome_profile")
+    calls = []
+    monkeypatch.setattr(tdc, "session_is_valid", lambda driver: calls.append(driver) and False)
+    driver = FakeDriver()
+    driver.profile_is_new = profile_is_new
+    login_driver(driver)
+    assert len(calls) == checks
+    assert driver.get_cookie("auth_token")
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+import twitter_data_collection as tdc
+from twitter_data_collection import AdaptivePoller, HttpCollector, PartitionedTweetStore, RequestBudget, run_daemon
+from tests.fakes import FakeClock, FakeDriver, make_fake_tweets
+
+
+@pytest.fixture(autouse=True)
+def market_closed(monkeypatch):
+    # no MARKET_BOOST, so intervals depend on the tweet rate alone
+    monkeypatch.setattr(tdc, "market_is_open", lambda now=None: False)
+
+
+def test_poller_tracks_the_tweet_rate():
+    poller = AdaptivePoller("#nifty50", min_interval=60, max_interval=1800, target=15, alpha=0.5)
+    assert poller.next_due == 0.0
+    # 11 tweets 30 s apart: 1/30 per second, so 15 new ones take 450 s
+    assert poller.observe(make_fake_tweets("#nifty50", 11, spacing_seconds=30), now=1000) == 1450
+    assert poller.rate == pytest.approx(1 / 30)
+    # a busier poll pulls the EWMA up and the interval down, but not below min_interval
+    poller.observe(make_fake_tweets("#nifty50", 300), now=1450)
+    assert poller.rate == pytest.approx(0.5 * 300 / 450 + 0.5 / 30)
+    assert poller.interval(1450) == 60
+
+
+def test_quiet_tag_backs_off_to_max_interval():
+    poller = AdaptivePoller("#sensex", min_interval=60, max_interval=1800, target=15, alpha=1.0)
+    # no sample yet: poll again soon
+    assert poller.interval(0) == 60
+    poller.observe([], now=0)
+    assert poller.rate == 0.0
+    assert poller.next_due == 1800
+    poller.observe(make_fake_tweets("#sensex", 1), now=1800)
+    assert poller.interval(1800) == 1800   # 1/1800 per second: 15 new ones would take 7.5 h
+
+
+def test_saturated_poll_doubles_the_sample():
+    plain = AdaptivePoller("#nifty50", min_interval=1, max_interval=10_000, alpha=1.0)
+    capped = AdaptivePoller("#nifty50", min_interval=1, max_interval=10_000, alpha=1.0)
+    for poller, saturated in ((plain, False), (capped, True)):
+        poller.observe([], now=0)
+        poller.observe(make_fake_tweets("#nifty50", 100), now=1000, saturated=saturated)
+    assert capped.rate == 2 * plain.rate == 0.2
+    assert capped.interval(1000) == plain.interval(1000) / 2
+
+
+def test_request_budget_slides():
+    budget = RequestBudget(limit=3, window=60)
+    for now in (0, 10, 20):
+        assert budget.wait_time(now) == 0
+        budget.spend(now)
+    assert budget.remaining(30) == 0
+    assert budget.wait_time(30) == 30
+    # the first search leaves the window at t=60, the second at t=70
+    assert budget.wait_time(60) == 0 and budget.remaining(60) == 1
+    budget.spend(60)
+    assert budget.wait_time(65) == 5
+    assert RequestBudget(limit=0).wait_time(0) == 0 and RequestBudget(limit=0).remaining(0) is None
+
+
+def _daemon(tmp_path, clock, driver, **kwargs):
+    store = PartitionedTweetStore(str(tmp_path / "store"))
+    signal_store = PartitionedTweetStore(str(tmp_path / "signals"), schema=tdc.scored_schema())
+    polls = run_daemon(driver=driver, clock=clock, sleep=clock.sleep, store=store, signal_store=signal_store,
+                       index=tdc.TweetIdIndex(str(tmp_path / "index")), **kwargs)
+    return polls, store, signal_store
+
+
+def _polls(tag):
+    return tdc.METRICS.counters.get(("daemon_polls", (("hashtag", tag),)), 0)
+
+
+def test_daemon_polls_busy_tags_more_often(tmp_path):
+    clock = FakeClock(start=time.time())
+    driver = FakeDriver(tweets_per_tag=30, batch=10, live_rate={"#nifty50": 0.5, "#sensex": 0.005}, clock=clock)
+    polls, store, signal_store = _daemon(tmp_path, clock, driver, hashtags=["#nifty50", "#sensex"], login=None,
+                                         max_polls=8)
+    assert polls == 8
+    # #sensex is next due in 15 / 0.005 s (clamped to 30 min); #nifty50 every minute meanwhile
+    assert (_polls("#nifty50"), _polls("#sensex")) == (7, 1)
+    assert clock.slept >= 6 * 60
+    saved = store.read()
+    assert saved["tweet_id"].is_unique
+    assert len(store.read(hashtags=["#sensex"])) == 30
+    # every later poll picks up the 30 tweets posted in the minute since the last one
+    assert len(store.read(hashtags=["#nifty50"])) == 30 + 6 * 30
+    assert set(signal_store.read()["tweet_id"]) <= set(saved["tweet_id"])
+
+
+def test_daemon_logs_in_again_when_a_poll_fails(tmp_path, monkeypatch):
+    clock = FakeClock(start=time.time())
+    logins = []
+    collect_tag = tdc.collect_tag
+
+    def _flaky(driver, tag, **kwargs):
+        if len(logins) == 1:
+            raise RuntimeError("session expired")
+        return collect_tag(driver, tag, **kwargs)
+
+    monkeypatch.setattr(tdc, "collect_tag", _flaky)
+    polls, store, _ = _daemon(tmp_path, clock, FakeDriver(tweets_per_tag=20, batch=10), hashtags=["#nifty50"],
+                              login=logins.append, max_polls=2)
+    assert polls == 2 and len(logins) == 2
+    assert len(store.read()) == 20
+
+
+def test_daemon_uses_the_configured_backend(tmp_path, monkeypatch, mock_server):
+    class MockCollector(HttpCollector):
+        def __init__(self):
+            super().__init__(search_url=mock_server.search_url, bearer_token=mock_server.bearer_token,
+                             cookies=[{"name": "auth_token", "value": "mock"}, {"name": "ct0", "value": "mockcsrf"}],
+                             page_size=20, page_pause=None)
+
+    def _no_browser():
+        raise AssertionError("the http backend must not start Chrome")
+
+    monkeypatch.setattr(tdc, "COLLECTOR_BACKEND", "http")
+    monkeypatch.setattr(tdc, "HttpCollector", MockCollector)
+    monkeypatch.setattr(tdc, "init_driver", _no_browser)
+    clock = FakeClock(start=time.time())
+    polls, store, _ = _daemon(tmp_path, clock, None, hashtags=["#nifty50"], max_polls=2)
+    assert polls == 2
+    assert mock_server.requests >= 3
+    assert len(store.read()) == 60
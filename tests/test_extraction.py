@@ -0,0 +1,32 @@
+from selenium.webdriver.common.by import By
+
+from twitter_data_collection import (extract_tweet_from_article, extract_visible_tweets, parse_metric_count,
+                                     search_hashtag)
+from tests.benchmarks import benchmark_extraction
+from tests.fakes import FakeArticle, make_fake_tweets
+
+
+def test_parse_metric_count():
+    assert [parse_metric_count(t) for t in ("", None, "7", "1,234", "1.2K", "15K", "3M")] == \
+        [0, 0, 7, 1234, 1200, 15000, 3_000_000]
+
+
+def test_bulk_and_per_element_give_the_same_records(fake_driver):
+    search_hashtag(fake_driver, "#nifty50")
+    per_element = [extract_tweet_from_article(a) for a in fake_driver.find_elements(By.XPATH, "//article")]
+    bulk = extract_visible_tweets(fake_driver)
+    assert len(bulk) >= fake_driver.batch
+    assert bulk == per_element
+
+
+def test_metrics_land_in_their_own_columns(fake_driver):
+    tweet = dict(make_fake_tweets("#nifty50", 1)[0], likes=321, retweets=45, replies=6)
+    for liked in (False, True):
+        rec = extract_tweet_from_article(FakeArticle(fake_driver, tweet, liked=liked))
+        assert (rec["likes"], rec["retweets"], rec["replies"]) == (321, 45, 6)
+
+
+def test_extraction_benchmark_reads_every_article_on_every_pass(fake_driver, tmp_path):
+    search_hashtag(fake_driver, "#nifty50")
+    timing = benchmark_extraction(str(tmp_path / "timeline.html"), driver=fake_driver, repeats=3)
+    assert timing["articles"] == len(fake_driver.find_elements(By.XPATH, "//article"))
@@ -0,0 +1,28 @@
+import pandas as pd
+
+import twitter_data_collection as tdc
+from tests.fakes import make_fake_tweets
+
+
+def _fill(store, per_tag=300):
+    for tag in ("#nifty50", "#sensex", "#banknifty"):
+        store.append(make_fake_tweets(tag, per_tag, spacing_seconds=600), tag)
+
+
+def test_small_store_is_analyzed_in_process(store, tmp_path):
+    _fill(store)
+    stats = tdc.analyze_history(store=store, workers=4, output=str(tmp_path / "history.parquet"))
+    assert stats["workers"] == 1
+    assert stats["written"] > 0
+
+
+def test_pooled_analysis_matches_in_process(store, tmp_path, monkeypatch):
+    _fill(store)
+    serial = tdc.analyze_history(store=store, workers=1, output=str(tmp_path / "serial.parquet"))
+    monkeypatch.setattr(tdc, "HISTORY_POOL_MIN_MB", 0)
+    monkeypatch.setattr(tdc.os, "cpu_count", lambda: 2)
+    pooled = tdc.analyze_history(store=store, workers=2, output=str(tmp_path / "pooled.parquet"))
+    assert pooled["workers"] == 2
+    assert pooled["written"] == serial["written"]
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "pooled.parquet"),
+                                  pd.read_parquet(tmp_path / "serial.parquet"))
@@ -0,0 +1,26 @@
+from twitter_data_collection import HWM_STOP_AFTER, scroll_and_collect
+from tests.fakes import FakeDriver
+
+
+def test_index_lookups_survive_a_flush(tweet_index):
+    tweet_index.add_many(["1800000000000000001", "1800000000000000005"], hashtag="#nifty50")
+    tweet_index.flush()
+    tweet_index.add_many(["1800000000000000003"])
+    assert list(tweet_index.contains_many(["1800000000000000001", "1800000000000000002",
+                                           "1800000000000000003", None])) == [True, False, True, False]
+    assert tweet_index.high_water_mark("#nifty50") == "1800000000000000005"
+
+
+def test_scroll_stops_at_already_collected_tweets(fake_clock, tweet_index):
+    driver = FakeDriver(tweets_per_tag=400, batch=10, live_rate=1.0, clock=fake_clock)
+    first = scroll_and_collect(driver, "#nifty50", max_tweets=50, min_tweets=0, index=tweet_index)
+    assert len(first) == 50
+    tweet_index.add_many([r["tweet_id"] for r in first], hashtag="#nifty50")
+
+    fake_clock.advance(12)  # 12 tweets posted since
+    scrolls = driver.scrolls
+    second = scroll_and_collect(driver, "#nifty50", max_tweets=400, min_tweets=0, index=tweet_index)
+    assert len(second) == 12
+    assert not {r["tweet_id"] for r in second} & {r["tweet_id"] for r in first}
+    # stopped right after the high-water mark instead of scrolling the other 338 tweets
+    assert driver.scrolls - scrolls <= (12 + HWM_STOP_AFTER) // driver.batch + 2
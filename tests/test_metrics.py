@@ -0,0 +1,102 @@
+import json
+import os
+import re
+import threading
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+
+import twitter_data_collection as tdc
+from twitter_data_collection import RunMetrics, instrument_driver, search_hashtag
+from tests.fakes import FakeDriver
+
+SAMPLE = re.compile(r'^[a-z_]+(\{([a-z_]+="([^"\\]|\\.)*",?)*\})? -?[0-9.e+-]+$')
+
+
+def _commands(metrics):
+    return {dict(labels)["phase"]: value for (name, labels), value in metrics.counters.items()
+            if name == "webdriver_commands" and dict(labels)["command"] == Command.FIND_ELEMENTS}
+
+
+def test_commands_are_counted_under_the_innermost_phase():
+    metrics = tdc.METRICS
+    driver = FakeDriver()
+    driver.find_elements(By.XPATH, "//article")
+    with metrics.phase("search"):
+        driver.find_elements(By.XPATH, "//article")
+        with metrics.phase("extract"):
+            driver.find_elements(By.XPATH, "//article")
+            driver.find_elements(By.XPATH, "//article")
+        driver.find_elements(By.XPATH, "//article")
+    assert _commands(metrics) == {"other": 1, "search": 2, "extract": 2}
+    assert metrics.timers["search"]["calls"] == 1
+    assert metrics.timers["extract"]["seconds"] <= metrics.timers["search"]["seconds"]
+
+
+def test_instrumenting_twice_counts_once():
+    driver = instrument_driver(FakeDriver())
+    driver.find_elements(By.XPATH, "//article")
+    assert _commands(tdc.METRICS) == {"other": 1}
+
+
+def test_fake_driver_is_counted_through_execute(fake_driver):
+    with tdc.METRICS.phase("search"):
+        search_hashtag(fake_driver, "#nifty50")
+    counted = sum(v for (name, _), v in tdc.METRICS.counters.items() if name == "webdriver_commands")
+    assert counted == fake_driver.commands > 0
+    assert tdc.METRICS.thread_commands() == counted
+
+
+def test_thread_commands_are_per_thread():
+    metrics = tdc.METRICS
+    driver = FakeDriver()
+    counts = []
+
+    def _worker(n):
+        for _ in range(n):
+            driver.find_elements(By.XPATH, "//article")
+        counts.append(metrics.thread_commands())
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in (3, 5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(counts) == [3, 5]
+    assert _commands(metrics) == {"other": 8}
+
+
+def test_prometheus_exposition():
+    metrics = RunMetrics()
+    with metrics.phase("scroll"):
+        pass
+    metrics.inc("http_requests", status=200)
+    metrics.inc("http_requests", 2, status=200)
+    metrics.inc("pipeline_errors", stage='sa"ve\\x\n')
+    metrics.record_hashtag("#nifty50", tweets=40, seconds=8.0, roundtrips=120)
+    text = metrics.prometheus_text()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    for line in lines:
+        assert line.startswith("# HELP tqb_") or line.startswith("# TYPE tqb_") or SAMPLE.match(line), line
+    assert "# TYPE tqb_phase_calls_total counter" in lines
+    assert 'tqb_phase_calls_total{phase="scroll"} 1' in lines
+    assert 'tqb_http_requests_total{status="200"} 3' in lines
+    assert 'tqb_pipeline_errors_total{stage="sa\\"ve\\\\x\\n"} 1' in lines
+    assert 'tqb_hashtag_tweets_per_second{hashtag="#nifty50"} 5.0' in lines
+    assert 'tqb_hashtag_roundtrips_per_tweet{hashtag="#nifty50"} 3.0' in lines
+    # every metric is declared once, before its samples
+    names = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+    assert len(names) == len(set(names))
+
+
+def test_write_report(tmp_path):
+    metrics = RunMetrics()
+    metrics.inc("tweets_saved", 7, hashtag="#sensex")
+    metrics.record_hashtag("#sensex", tweets=7, seconds=2.0, roundtrips=0)
+    metrics.write_report(str(tmp_path / "run.json"), str(tmp_path / "run.prom"))
+    report = json.loads((tmp_path / "run.json").read_text())
+    assert report["counters"] == [{"name": "tweets_saved", "labels": {"hashtag": "#sensex"}, "value": 7}]
+    assert report["hashtags"]["#sensex"]["tweets_per_second"] == 3.5
+    assert 'tqb_tweets_saved_total{hashtag="#sensex"} 7' in (tmp_path / "run.prom").read_text()
+    assert sorted(os.listdir(tmp_path)) == ["run.json", "run.prom"]
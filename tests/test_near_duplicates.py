@@ -0,0 +1,79 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from twitter_data_collection import NearDuplicateIndex, clean_stored_tweets, clean_tweets, minhash_signatures
+from tests.fakes import make_fake_tweets
+
+
+def _tweets(with_ids):
+    tweets = make_fake_tweets("#nifty50", 10, spacing_seconds=60)
+    # reposts of the first three with a link appended: near duplicates, not exact ones
+    tweets += [dict(t, tweet_id=str(int(t["tweet_id"]) + 1), content=t["content"] + " https://t.co/x" + str(i))
+               for i, t in enumerate(tweets[:3])]
+    if not with_ids:
+        for t in tweets:
+            t["tweet_id"] = None
+    return tweets
+
+
+@pytest.mark.parametrize("with_ids", [True, False])
+def test_cleaning_the_same_window_twice_keeps_the_same_tweets(store, tmp_path, with_ids):
+    store.append(_tweets(with_ids), "#nifty50")
+    kept = []
+    for _ in range(2):
+        # a fresh index object per run, as in a new process
+        near_dups = NearDuplicateIndex(str(tmp_path / "near_dups"))
+        kept.append(clean_stored_tweets(store, filename=str(tmp_path / "cleaned.parquet"),
+                                        near_dups=near_dups, near_dup_mode="drop")["written"])
+        near_dups.flush()
+    assert kept == [10, 10]
+
+
+def test_in_memory_clean_is_stable_for_tweets_without_ids():
+    near_dups = NearDuplicateIndex(None)
+    first = clean_tweets(_tweets(with_ids=False), near_dups, near_dup_mode="drop")
+    second = clean_tweets(_tweets(with_ids=False), near_dups, near_dup_mode="drop")
+    assert len(first) == len(second) == 10
+    assert sorted(first["content"]) == sorted(second["content"])
+
+
+def test_identities_never_collide_with_status_ids():
+    tweets = pd.DataFrame(_tweets(with_ids=False))
+    ids = NearDuplicateIndex.identities(None, tweets["tweet_id"], [1, 2, 3] + [4] * (len(tweets) - 3))
+    assert (ids >> 63 == 1).all()
+
+
+def test_near_duplicates_are_flagged_not_dropped_by_default():
+    cleaned = clean_tweets(_tweets(with_ids=True), NearDuplicateIndex(None))
+    assert len(cleaned) == 13
+    assert cleaned["near_duplicate"].sum() == 3
+
+
+def test_flush_appends_key_runs_and_merges_them_logarithmically(tmp_path):
+    directory = str(tmp_path / "near_dups")
+    index = NearDuplicateIndex(directory)
+    batches = [minhash_signatures([t["content"] for t in make_fake_tweets(f"#tag{i}", 50)], index.num_perm,
+                                  index.shingle)[0] for i in range(7)]
+    clusters = []
+    for i, signatures in enumerate(batches):
+        ids = np.arange(i * 100 + 1, i * 100 + 51, dtype=np.uint64)
+        clusters.append(index.assign(signatures, ids)[0])
+        index.flush()
+        runs = set(glob.glob(os.path.join(directory, "keys-*.u64")))
+        # one run per set bit of the flush count, like a binary counter
+        assert len(runs) == bin(i + 1).count("1")
+        if i == 3:
+            merged = runs
+        # flushes five to seven only write and merge runs smaller than the fourth flush's
+        assert i <= 3 or merged < runs
+    reloaded = NearDuplicateIndex(directory)
+    assert len(reloaded) == len(index)
+    for i, signatures in enumerate(batches):
+        ids = np.arange(i * 100 + 1, i * 100 + 51, dtype=np.uint64)
+        again, duplicate = reloaded.assign(signatures, ids)
+        np.testing.assert_array_equal(again, clusters[i])
+        assert not duplicate.any()
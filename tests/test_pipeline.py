@@ -0,0 +1,150 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import twitter_data_collection as tdc
+from twitter_data_collection import (PartitionedTweetStore, PipelineError, SparseSignalEngine, StreamingPipeline,
+                                     TweetBuffer)
+from tests.fakes import FakeDriver, make_fake_tweets
+
+
+@pytest.fixture(autouse=True)
+def keep_near_duplicates(monkeypatch):
+    # only exact duplicates are dropped, so every count below is known up front
+    monkeypatch.setattr(tdc, "NEAR_DUP_MODE", "flag")
+
+
+def _batches(hashtag, n, size=5):
+    tweets = make_fake_tweets(hashtag, n * size)
+    return [TweetBuffer(tweets[i * size:(i + 1) * size]) for i in range(n)]
+
+
+class BlockingStore(PartitionedTweetStore):
+    """Holds every append until `release` is set."""
+    def __init__(self, root):
+        super().__init__(root)
+        self.release = threading.Event()
+
+    def append(self, records, hashtag):
+        self.release.wait(timeout=10)
+        return super().append(records, hashtag)
+
+
+class FlakyEngine(SparseSignalEngine):
+    """Incremental engine whose `fail_on`-th score() call raises."""
+    def __init__(self, fail_on):
+        super().__init__(mode="incremental", model_file=None)
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def score(self, texts, update=True):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise ValueError("scoring failed")
+        return super().score(texts, update)
+
+
+def test_a_full_queue_blocks_the_scraper(tmp_path):
+    store = BlockingStore(str(tmp_path / "store"))
+    pipeline = StreamingPipeline(store=store, maxsize=1)
+    submitted = []
+
+    def _scrape():
+        for batch in _batches("#nifty50", 4):
+            pipeline.submit("#nifty50", batch)
+            submitted.append(batch)
+
+    scraper = threading.Thread(target=_scrape, daemon=True)
+    scraper.start()
+    scraper.join(0.5)
+    # the save stage holds the first batch and its queue the second: the third submit waits
+    assert scraper.is_alive() and len(submitted) == 2
+    store.release.set()
+    scraper.join(10)
+    pipeline.close()
+    assert len(submitted) == 4
+    assert pipeline.stats["scored"] == 20
+
+
+def test_close_drains_every_batch_and_stops_the_stages():
+    pipeline = StreamingPipeline(maxsize=1)
+    for batch in _batches("#nifty50", 5):
+        pipeline.submit("#nifty50", batch)
+    pipeline.close()
+    assert pipeline.stats == {"batches": 5, "tweets": 25, "scored": 25, "errors": 0}
+    assert not any(t.is_alive() for t in pipeline._threads)
+    assert len(pipeline.signal_store.read()) == 25
+    with pytest.raises(RuntimeError):
+        pipeline.submit("#nifty50", _batches("#sensex", 1)[0])
+
+
+def test_stage_errors_are_raised_on_close():
+    pipeline = StreamingPipeline(engine=FlakyEngine(fail_on=2))
+    for batch in _batches("#nifty50", 3):
+        pipeline.submit("#nifty50", batch)
+    with pytest.raises(PipelineError) as err:
+        pipeline.close()
+    assert [(stage, tag) for stage, tag, _ in err.value.errors] == [("score", "#nifty50")]
+    assert isinstance(err.value.__cause__, ValueError)
+    # the other batches still went all the way through
+    assert pipeline.stats["scored"] == 10
+    assert len(pipeline.store.read()) == 15
+
+
+def test_stage_errors_do_not_mask_an_exception_leaving_the_block():
+    with pytest.raises(LookupError):
+        with StreamingPipeline(engine=FlakyEngine(fail_on=1)) as pipeline:
+            pipeline.submit("#nifty50", _batches("#nifty50", 1)[0])
+            raise LookupError("scraper failed")
+    assert pipeline.stats["errors"] == 1
+
+
+def test_batches_are_deduplicated_against_earlier_ones():
+    tweets = make_fake_tweets("#nifty50", 10)
+    # the same text under new ids, as reposts of the first three
+    reposts = [dict(t, tweet_id=str(int(t["tweet_id"]) + 1)) for t in tweets[:3]]
+    with StreamingPipeline() as pipeline:
+        pipeline.submit("#nifty50", TweetBuffer(tweets[:6]))
+        # overlapping ids, as re-collected after an error page
+        pipeline.submit("#nifty50", TweetBuffer(tweets[4:]))
+        pipeline.submit("#sensex", TweetBuffer(reposts))
+    assert pipeline.stats["tweets"] == 13
+    assert sorted(pipeline.signal_store.read()["tweet_id"]) == sorted(t["tweet_id"] for t in tweets)
+
+
+def _run(runner, directory, now, monkeypatch):
+    directory.mkdir()
+    monkeypatch.chdir(directory)
+    tdc._near_duplicate_index.cache_clear()
+    monkeypatch.setattr(tdc, "init_driver", lambda: FakeDriver(tweets_per_tag=20, batch=5, now=now))
+    runner()
+    return {
+        "store": set(PartitionedTweetStore(tdc.STORE_DIR).read()["tweet_id"]),
+        "series": {label: tdc.read_signal_series(label).sort_values(["tag", "bucket"], ignore_index=True)
+                   [["tag", "bucket", "count", "likes", "retweets", "replies"]] for label in tdc.SERIES_INTERVALS},
+    }
+
+
+def test_pipeline_writes_the_rows_of_the_batch_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(tdc, "HASHTAGS", ["#nifty50", "#sensex"])
+    monkeypatch.setattr(tdc, "WORKER_PACING_SECONDS", (0, 0))
+    monkeypatch.setattr(tdc, "login_driver", lambda driver: None)
+    monkeypatch.setattr(tdc, "plot_signals", lambda df: None)
+    # the oldest of the 20 tweets (30 s apart) starts a 15-minute bar, so the
+    # batch path's replace=True update keeps every bar
+    hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    now = hour + timedelta(seconds=19 * 30)
+
+    batch = _run(tdc.collect_then_analyze, tmp_path / "batch", now, monkeypatch)
+    cleaned = set(pd.read_parquet(tdc.CLEANED_FILE)["tweet_id"])
+    streamed = _run(tdc.collect_streaming, tmp_path / "streamed", now, monkeypatch)
+    scored = set(PartitionedTweetStore(tdc.SIGNAL_STORE_DIR).read()["tweet_id"])
+
+    assert len(batch["store"]) == 40
+    assert streamed["store"] == batch["store"]
+    assert scored == cleaned
+    for label, bars in batch["series"].items():
+        assert len(bars)
+        pd.testing.assert_frame_equal(streamed["series"][label], bars)
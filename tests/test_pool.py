@@ -0,0 +1,114 @@
+import threading
+import time
+
+from selenium.common.exceptions import InvalidSessionIdException
+
+import twitter_data_collection as tdc
+from twitter_data_collection import DriverPool, Throttle, TweetSink, collect_hashtags_pooled
+from tests.fakes import FakeDriver
+
+TAGS = ["#nifty50", "#sensex", "#banknifty", "#finnifty"]
+
+
+def _login(driver):
+    driver.add_cookie({"name": "auth_token", "value": "fake"})
+
+
+class TrackedDriver(FakeDriver):
+    """FakeDriver that records quit() and can crash after `die_after` scrolls."""
+    def __init__(self, die_after=None, **kwargs):
+        super().__init__(**kwargs)
+        self.die_after = die_after
+        self.quit_called = False
+
+    def execute(self, driver_command, params=None):
+        if self.die_after is not None and self.scrolls >= self.die_after:
+            raise InvalidSessionIdException("invalid session id")
+        return super().execute(driver_command, params)
+
+    def quit(self):
+        self.quit_called = True
+        super().quit()
+
+
+def test_pool_reuses_released_sessions_and_replaces_broken_ones():
+    opened, logins = [], []
+
+    def _factory():
+        opened.append(TrackedDriver())
+        return opened[-1]
+
+    pool = DriverPool(2, driver_factory=_factory, login=logins.append)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second and logins == [first, second]
+    waiter = []
+    thread = threading.Thread(target=lambda: waiter.append(pool.acquire()))
+    thread.start()
+    thread.join(0.3)
+    # both slots are taken: the third acquire waits for a release
+    assert thread.is_alive()
+    pool.release(first)
+    thread.join(5)
+    assert waiter == [first] and len(opened) == 2
+    pool.release(second, broken=True)
+    assert second.quit_called
+    third = pool.acquire()
+    assert third is opened[2] and logins[-1] is third
+    pool.close()
+    assert first.quit_called and third.quit_called
+
+
+def _pooled(fake_clock, factory, **kwargs):
+    return collect_hashtags_pooled(TAGS, pool_size=2, pacing=None, driver_factory=factory, login=_login,
+                                   sink=TweetSink(), max_tweets=20, min_tweets=0, save=False,
+                                   throttle=Throttle(burst=len(TAGS), clock=fake_clock), sleep=fake_clock.sleep,
+                                   **kwargs)
+
+
+def test_two_tags_never_share_a_driver(fake_clock, monkeypatch):
+    in_use, overlaps, served = set(), [], []
+    lock = threading.Lock()
+    collect = tdc.collect_tag_resumable
+
+    def _tracked(driver, tag, partial, **kwargs):
+        with lock:
+            if id(driver) in in_use:
+                overlaps.append(tag)
+            in_use.add(id(driver))
+            served.append(id(driver))
+        try:
+            return collect(driver, tag, partial, **kwargs)
+        finally:
+            with lock:
+                in_use.discard(id(driver))
+
+    monkeypatch.setattr(tdc, "collect_tag_resumable", _tracked)
+    opened = []
+
+    def _factory():
+        opened.append(TrackedDriver(tweets_per_tag=20, batch=10, latency=0.002))
+        return opened[-1]
+
+    tweets = _pooled(fake_clock, _factory)
+    assert overlaps == []
+    assert len(opened) == 2 and set(served) == {id(d) for d in opened}
+    assert len(tweets) == 20 * len(TAGS)
+    assert all(d.quit_called for d in opened)
+
+
+def test_dead_session_is_replaced_and_logged_in(fake_clock):
+    opened = []
+
+    def _factory():
+        # the first browser crashes partway through its first tag
+        opened.append(TrackedDriver(die_after=2 if not opened else None, tweets_per_tag=20, batch=10))
+        return opened[-1]
+
+    started = time.perf_counter()
+    tweets = _pooled(fake_clock, _factory)
+    assert time.perf_counter() - started < 30
+    assert len(opened) == 3
+    assert opened[0].quit_called
+    # the replacement was logged in before it served the retried tag
+    assert all(d.get_cookie("auth_token") for d in opened[1:])
+    assert len(tweets) == 20 * len(TAGS)
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import twitter_data_collection as tdc
+from twitter_data_collection import bin_signals, render_report
+
+
+def _frame():
+    return pd.DataFrame({
+        "signal": [0.0, 0.25, 0.5, 0.75, 1.0, np.nan],
+        "timestamp": ["2024-05-06T10:00:00.000Z", "2024-05-06T10:01:00.000Z", "2024-05-06T10:07:00.000Z",
+                      "2024-05-06T10:12:00.000Z", None, "2024-05-06T10:03:00.000Z"],
+        "query": ["#nifty50", "#nifty50", "#nifty50", "#sensex", "#sensex", "#sensex"],
+    })
+
+
+def test_bin_edges_and_counts():
+    binned = bin_signals(_frame(), bins=4, interval="5min")
+    assert binned["rows"] == 6
+    np.testing.assert_array_equal(binned["hist_edges"], [0.0, 0.25, 0.5, 0.75, 1.0])
+    # the last bin is closed, so 0.75 and 1.0 share it; the NaN signal is left out
+    np.testing.assert_array_equal(binned["hist_counts"], [1, 1, 1, 2])
+    assert binned["stats"]["scored"] == 5 and binned["stats"]["p50"] == 0.5
+    # the series drop the row without a timestamp too
+    assert binned["interval_seconds"] == 300
+    nifty, sensex = binned["series"]["#nifty50"], binned["series"]["#sensex"]
+    np.testing.assert_array_equal(nifty["time"], pd.to_datetime(["2024-05-06 10:00", "2024-05-06 10:05",
+                                                                 "2024-05-06 10:10"]).to_numpy())
+    np.testing.assert_array_equal(nifty["tweets"], [2, 1, 0])
+    np.testing.assert_array_equal(nifty["mean"], [0.125, 0.5, np.nan])
+    np.testing.assert_array_equal(sensex["tweets"], [0, 0, 1])
+
+
+def test_series_bins_widen_to_max_points():
+    binned = bin_signals(_frame(), bins=4, interval="5min", max_points=2)
+    assert binned["interval_seconds"] == 600
+    np.testing.assert_array_equal(binned["series"]["#nifty50"]["tweets"], [3, 0])
+    np.testing.assert_array_equal(binned["series"]["#sensex"]["tweets"], [0, 1])
+
+
+def test_report_files_are_replaced_atomically(tmp_path, monkeypatch):
+    directory = tmp_path / "reports"
+    directory.mkdir()
+    (directory / "signal_report.html").write_text("previous report")
+    replaced = []
+    real_replace = os.replace
+
+    def _replace(src, dst):
+        # the old page is still whole right up to the swap
+        if dst.endswith(".html"):
+            assert (directory / "signal_report.html").read_text() == "previous report"
+        replaced.append((src, dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(tdc.os, "replace", _replace)
+    paths = render_report(bin_signals(_frame(), bins=4), str(directory))
+    assert [os.path.basename(p) for p in paths] == ["signal_distribution.png", "signal_series.png",
+                                                    "signal_report.html"]
+    assert [dst for _, dst in replaced] == paths
+    assert all(os.path.dirname(src) == str(directory) and ".tmp" in src for src, _ in replaced)
+    assert sorted(os.listdir(directory)) == sorted(os.path.basename(p) for p in paths)
+    page = (directory / "signal_report.html").read_text()
+    assert "<td>#nifty50</td><td>3</td>" in page and 'src="signal_series.png"' in page
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from twitter_data_collection import SignalSeries
+from tests.fakes import fake_tweet_frame
+
+
+def _scored(tag, n):
+    df = fake_tweet_frame(tag, n, spacing_seconds=37)
+    df["query"] = tag
+    df["signal"] = np.random.default_rng(len(tag)).random(len(df))
+    return df
+
+
+def test_incremental_update_equals_full_recompute():
+    df = pd.concat([_scored("#nifty50", 600), _scored("#sensex", 400)], ignore_index=True)
+    full = SignalSeries(directory=None)
+    full.update(df)
+
+    incremental = SignalSeries(directory=None)
+    # out-of-order batches, so late tweets land in bars that already exist
+    shuffled = df.sample(frac=1.0, random_state=0)
+    for start in range(0, len(shuffled), 97):
+        incremental.update(shuffled.iloc[start:start + 97])
+
+    for label in full.intervals:
+        pd.testing.assert_frame_equal(incremental.bars[label], full.bars[label], check_exact=False, rtol=1e-9,
+                                      check_like=True)
+
+
+def test_bars_round_trip_through_parquet(tmp_path):
+    series = SignalSeries(directory=str(tmp_path / "series"))
+    series.update(_scored("#nifty50", 200))
+    series.save()
+    reloaded = SignalSeries(directory=str(tmp_path / "series"))
+    for label in series.intervals:
+        pd.testing.assert_frame_equal(reloaded.frame(label), series.frame(label), check_dtype=False,
+                                      check_categorical=False)
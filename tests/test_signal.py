@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+
+from twitter_data_collection import LexiconMatcher, SparseSignalEngine, generate_signal, score_lexicon
+from tests.fakes import make_fake_tweets
+
+
+def _contents(n):
+    return pd.DataFrame({"content": [t["content"] for t in make_fake_tweets("#nifty50", n)]})
+
+
+def test_sparse_scores_match_the_dense_baseline():
+    df = _contents(500)
+    dense = TfidfVectorizer(max_features=1000, stop_words="english").fit_transform(df["content"]).toarray()
+    sparse = generate_signal(df.copy(), engine=SparseSignalEngine(mode="refit", model_file=None))
+    np.testing.assert_allclose(sparse["signal"].to_numpy(), dense.mean(axis=1), rtol=1e-12, atol=1e-15)
+
+
+def test_incremental_engine_matches_a_refit_on_one_batch():
+    df = _contents(300)
+    refit = SparseSignalEngine(mode="refit", model_file=None).score(df["content"])
+    incremental = SparseSignalEngine(mode="incremental", model_file=None).score(df["content"])
+    np.testing.assert_allclose(incremental, refit, rtol=1e-12, atol=1e-15)
+
+
+def test_hashing_engine_averages_over_the_hash_space(tmp_path):
+    df = _contents(400)
+    counts = HashingVectorizer(n_features=2 ** 10, alternate_sign=False, norm=None,
+                               stop_words="english").transform(df["content"])
+    dense = TfidfTransformer().fit_transform(counts).toarray()
+    model = str(tmp_path / "model.pkl")
+    engine = SparseSignalEngine(mode="hashing", model_file=model, hash_features=2 ** 10)
+    np.testing.assert_allclose(engine.score(df["content"]), dense.mean(axis=1), rtol=1e-12, atol=1e-15)
+    # a reloaded model scores the next batch against the same running IDF
+    engine.save()
+    reloaded = SparseSignalEngine(mode="hashing", model_file=model, hash_features=2 ** 10)
+    later = _contents(450)["content"][400:]
+    np.testing.assert_allclose(reloaded.score(later), engine.score(later), rtol=1e-12, atol=1e-15)
+
+
+def _hits(texts, **kwargs):
+    matcher = LexiconMatcher(**kwargs)
+    return pd.DataFrame(matcher.counts(texts), columns=matcher.classes)
+
+
+def test_longest_phrase_wins():
+    hits = _hits(["bank nifty breakout", "nifty 50 looks weak", "niftybank and nifty bank"])
+    assert hits["ticker_BANKNIFTY"].tolist() == [1, 0, 2]
+    # the words of a matched phrase are not counted again on their own
+    assert hits["ticker_NIFTY"].tolist() == [0, 1, 0]
+    assert hits["bullish"].tolist() == [1, 0, 0]
+
+
+def test_directional_phrases_override_their_words():
+    scores = LexiconMatcher().score(["short covering rally", "going short here", "gap up then gap down",
+                                     "profit booking, sell off"])
+    assert scores[["bullish", "bearish"]].values.tolist() == [[2, 0], [0, 1], [1, 1], [0, 2]]
+    assert scores["direction"].tolist() == [1.0, -1.0, 0.0, -1.0]
+
+
+def test_phrases_do_not_span_rows():
+    texts = ["long on bank", "nifty today", "gap", "down we go"]
+    assert _hits(texts)["ticker_BANKNIFTY"].sum() == 0
+    assert _hits(texts)["ticker_NIFTY"].tolist() == [0, 1, 0, 0]
+    assert _hits(texts)["bearish"].sum() == 0
+    # the same holds where a chunk ends between the two words
+    pd.testing.assert_frame_equal(_hits(texts, chunk_rows=1), _hits(texts))
+
+
+def test_cashtags_hashtags_and_punctuation_are_trimmed():
+    hits = _hits(["#Nifty50 to the moon, $RELIANCE!", "(#BankNifty) BULLISH!!!", "bullishness #sbin's"])
+    assert hits["ticker_NIFTY"].tolist() == [1, 0, 0]
+    assert hits["ticker_RELIANCE"].tolist() == [1, 0, 0]
+    assert hits["ticker_BANKNIFTY"].tolist() == [0, 1, 0]
+    # whole words only: neither "bullishness" nor "sbin's" is a term
+    assert hits["bullish"].tolist() == [0, 1, 0]
+    assert hits["ticker_SBIN"].tolist() == [0, 0, 0]
+
+
+def test_missing_and_empty_texts_score_zero():
+    scores = LexiconMatcher().score(pd.Series([None, "", "   ", "buy"]))
+    assert scores.drop(columns="direction").iloc[:3].to_numpy().sum() == 0
+    assert scores["direction"].tolist() == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_score_lexicon_adds_columns_in_place_of_old_ones():
+    df = pd.DataFrame({"content": ["bullish on infy", None]}, index=[7, 3])
+    scored = score_lexicon(score_lexicon(df))
+    assert scored.index.tolist() == [7, 3]
+    assert list(scored.columns).count("direction") == 1
+    assert scored.loc[7, "ticker_INFY"] == 1 and scored.loc[7, "direction"] == 1.0
+    assert scored.loc[3, "direction"] == 0.0
+    assert score_lexicon(pd.DataFrame()).empty
@@ -0,0 +1,72 @@
+import glob
+import os
+
+import pytest
+
+import twitter_data_collection as tdc
+from tests.fakes import make_fake_tweets
+
+
+def _tmp_files(store):
+    return glob.glob(os.path.join(store.root, "**", ".*.tmp"), recursive=True)
+
+
+def test_append_is_atomic(store, monkeypatch):
+    tweets = make_fake_tweets("#nifty50", 30)
+    store.append(tweets[:10], "#nifty50")
+
+    def _crash(table, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"PAR1 half a file")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tdc.pq, "write_table", _crash)
+    with pytest.raises(OSError):
+        store.append(tweets[10:], "#nifty50")
+    monkeypatch.undo()
+    # readers never see the half-written part
+    assert len(store.read()) == 10
+    assert all(not os.path.basename(f).startswith(".") for f in store.files())
+
+
+def test_compaction_merges_parts_and_drops_duplicate_ids(store):
+    tweets = make_fake_tweets("#nifty50", 30, spacing_seconds=1)
+    for batch in (tweets[:15], tweets[10:25], tweets[20:]):
+        store.append(batch, "#nifty50")
+    assert len(store.files()) == 3
+    assert store.compact(min_files=2) == 1
+    assert len(store.files()) == 1
+    assert not _tmp_files(store)
+    assert sorted(store.read()["tweet_id"]) == sorted(t["tweet_id"] for t in tweets)
+
+
+def test_failed_compaction_keeps_the_parts(store, monkeypatch):
+    tweets = make_fake_tweets("#nifty50", 20, spacing_seconds=1)
+    store.append(tweets[:10], "#nifty50")
+    store.append(tweets[10:], "#nifty50")
+    parts = store.files()
+
+    def _crash(table, path, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tdc.pq, "write_table", _crash)
+    with pytest.raises(OSError):
+        store.compact(min_files=2)
+    monkeypatch.undo()
+    assert store.files() == parts
+    assert len(store.read()) == 20
+
+
+def test_legacy_file_is_imported_with_likes_and_replies_swapped(store):
+    legacy = tdc.pd.DataFrame(make_fake_tweets("#nifty50", 5)).drop(columns=["tweet_id", "handle"])
+    legacy.to_parquet(tdc.DATA_FILE, index=False)
+    assert tdc.import_legacy_data_file(store) == 5
+    stored = store.read().sort_values("timestamp", ignore_index=True)
+    legacy = legacy.sort_values("timestamp", ignore_index=True)
+    # the old extractor wrote the reply count as likes and the like count as replies
+    assert stored["likes"].tolist() == legacy["replies"].tolist()
+    assert stored["replies"].tolist() == legacy["likes"].tolist()
+    assert stored["retweets"].tolist() == legacy["retweets"].tolist()
+    assert set(stored["query"]) == {"legacy"}
+    assert os.path.exists(tdc.DATA_FILE + ".imported")
+    assert tdc.import_legacy_data_file(store) == 0
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+
+import pytest
+
+from twitter_data_collection import CircuitBreaker, TagQueue, Throttle, TokenBucket, backoff_delay
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    rng = random.Random(0)
+    for attempt in range(10):
+        ceiling = min(60, 5 * 2 ** attempt)
+        for _ in range(20):
+            assert ceiling / 2 <= backoff_delay(attempt, base=5, cap=60, rng=rng) <= ceiling
+
+
+def test_circuit_breaker_transitions(fake_clock):
+    breaker = CircuitBreaker(threshold=2, base=10, cap=40, clock=fake_clock, rng=random.Random(1))
+    assert breaker.state == "closed"
+    assert breaker.record_failure() == 0.0
+    assert breaker.state == "closed"
+
+    first = breaker.record_failure()
+    assert 5 <= first <= 10 and breaker.state == "open"
+    assert breaker.ready_at() == pytest.approx(fake_clock() + first)
+
+    fake_clock.advance(first)
+    assert breaker.state == "half-open"
+    # a failed trial re-opens it for longer
+    second = breaker.record_failure()
+    assert 10 <= second <= 20 and breaker.state == "open"
+
+    fake_clock.advance(second)
+    assert breaker.state == "half-open"
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.opens == 0
+
+
+def test_token_bucket_refills_at_its_rate(fake_clock):
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=fake_clock)
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.ready_at() == pytest.approx(fake_clock() + 2)
+    fake_clock.advance(2)
+    assert bucket.try_take()
+
+
+def test_throttle_reports_what_holds_a_tag_back(fake_clock):
+    throttle = Throttle(searches_per_minute=60, burst=1, tag_failures=1, session_failures=2, base=30, cap=30,
+                        clock=fake_clock, rng=random.Random(0))
+    assert throttle.ready_at("#nifty50") == (fake_clock(), None)
+    throttle.acquire("#nifty50")
+    when, reason = throttle.ready_at("#sensex")
+    assert reason == "rate_limit" and when == pytest.approx(fake_clock() + 1)
+
+    throttle.failure("#nifty50", session_wide=True)
+    fake_clock.advance(1)
+    when, reason = throttle.ready_at("#nifty50")
+    assert reason == "tag_backoff" and when > fake_clock()
+    assert throttle.ready_at("#sensex") == (fake_clock(), None)
+
+
+def test_failed_tag_is_retried_after_its_backoff(fake_clock):
+    throttle = Throttle(burst=10, tag_failures=1, base=10, cap=10, clock=fake_clock, rng=random.Random(0))
+    queue = TagQueue(["#nifty50", "#sensex"], throttle, max_attempts=2)
+    calls = []
+
+    def _work(tag):
+        calls.append((tag, fake_clock()))
+        if tag == "#nifty50" and len(calls) == 1:
+            raise RuntimeError("boom")
+
+    queue.run("main", _work, sleep=fake_clock.sleep)
+    assert sorted(queue.completed) == ["#nifty50", "#sensex"]
+    retry = [t for tag, t in calls if tag == "#nifty50"][1]
+    assert 5 <= retry - 1_000 <= 10
+    assert throttle.waited["tag_backoff"] == pytest.approx(retry - 1_000)
+
+
+def test_idle_sessions_wait_for_tags_instead_of_polling():
+    throttle = Throttle(burst=10, tag_failures=1, base=0.2, cap=0.2, rng=random.Random(0))
+    queue = TagQueue(["#nifty50"], throttle, max_attempts=2)
+    claims = []
+    original = queue._claim
+
+    def _counted(session, sleep=None):
+        claims.append(session)
+        return original(session, sleep)
+
+    queue._claim = _counted
+    failed = threading.Event()
+
+    def _work(tag):
+        if not failed.is_set():
+            time.sleep(0.3)
+            failed.set()
+            raise RuntimeError("boom")
+
+    sessions = [threading.Thread(target=queue.run, args=(f"session-{n}", _work)) for n in (1, 2)]
+    t0 = time.perf_counter()
+    for t in sessions:
+        t.start()
+    for t in sessions:
+        t.join(timeout=5)
+    assert queue.completed == ["#nifty50"]
+    assert time.perf_counter() - t0 < 1.5
+    # one claim per tag attempt plus one returning "drained" per session
+    assert len(claims) <= 5
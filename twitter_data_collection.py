@@ -7,31 +7,170 @@ import random
 import re
 import pickle
 import os
+import glob
 import sys
 import json
+import math
+import queue
+import threading
 import unicodedata
+import collections
+import contextlib
+import functools
+import importlib
+import array
+import uuid
+import zlib
+import abc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+# =================== LAZY HEAVY IMPORTS ===================
+# pandas/numpy/pyarrow/selenium/sklearn are only imported when the stage
+# that needs them first touches them; the import time is recorded as a
+# startup phase (see startup_phase / report_startup). matplotlib is only
+# ever imported by the report process (see render_report).
+STARTUP_TIMINGS = {}
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from sklearn.feature_extraction.text import TfidfVectorizer
+@contextlib.contextmanager
+def startup_phase(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = STARTUP_TIMINGS.get(name, 0.0) + time.perf_counter() - t0
+
+def report_startup():
+    if STARTUP_TIMINGS:
+        parts = ", ".join(f"{k} {v:.2f}s" for k, v in STARTUP_TIMINGS.items())
+        print(f"[INFO] Startup phases: {parts} (total {sum(STARTUP_TIMINGS.values()):.2f}s)")
+
+class _LazyImport:
+    """
+    Stands in for a module (or one attribute of it) until first use.
+    """
+    def __init__(self, module, attr=None):
+        self._module = module
+        self._attr = attr
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            with startup_phase(f"import {self._module.split('.')[0]}"):
+                target = importlib.import_module(self._module)
+                if self._attr:
+                    target = getattr(target, self._attr)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+pd = _LazyImport("pandas")
+np = _LazyImport("numpy")
+pa = _LazyImport("pyarrow")
+pc = _LazyImport("pyarrow.compute")
+ds = _LazyImport("pyarrow.dataset")
+pq = _LazyImport("pyarrow.parquet")
+
+webdriver = _LazyImport("selenium.webdriver")
+Service = _LazyImport("selenium.webdriver.chrome.service", "Service")
+Options = _LazyImport("selenium.webdriver.chrome.options", "Options")
+By = _LazyImport("selenium.webdriver.common.by", "By")
+Keys = _LazyImport("selenium.webdriver.common.keys", "Keys")
+WebDriverWait = _LazyImport("selenium.webdriver.support.ui", "WebDriverWait")
+EC = _LazyImport("selenium.webdriver.support.expected_conditions")
+NoSuchElementException = _LazyImport("selenium.common.exceptions", "NoSuchElementException")
+ChromeDriverManager = _LazyImport("webdriver_manager.chrome", "ChromeDriverManager")
+CountVectorizer = _LazyImport("sklearn.feature_extraction.text", "CountVectorizer")
+HashingVectorizer = _LazyImport("sklearn.feature_extraction.text", "HashingVectorizer")
+TfidfVectorizer = _LazyImport("sklearn.feature_extraction.text", "TfidfVectorizer")
+l2_normalize = _LazyImport("sklearn.preprocessing", "normalize")
+sparse = _LazyImport("scipy.sparse")
+requests = _LazyImport("requests")
+HTTPAdapter = _LazyImport("requests.adapters", "HTTPAdapter")
+connected_components = _LazyImport("scipy.sparse.csgraph", "connected_components")
 
 # =================== CONFIG ===================
 HASHTAGS = ["#nifty50", "#sensex", "#intraday", "#banknifty"]
 COOKIES_FILE_PKL = "twitter_cookies.pkl"   # saved cookies (pickle)
 COOKIES_JSON_FILE = "twitter_cookies.json" # optional JSON file (user can drop exported cookies here too)
-DATA_FILE = "tweets_collected.parquet"
+DATA_FILE = "tweets_collected.parquet"    # legacy single-file store, imported into STORE_DIR once
+STORE_DIR = "tweets_store"                # append-only parts: STORE_DIR/date=YYYY-MM-DD/tag=<hashtag>/*.parquet
+COMPACT_MIN_FILES = 8                     # compact a partition once it has this many part files
 CLEANED_FILE = "tweets_cleaned.parquet"
+STREAMING_CLEAN = True       # clean straight from STORE_DIR in record batches instead of one big DataFrame
+CLEAN_WINDOW = timedelta(days=1)
+CLEAN_BATCH_ROWS = 65_536
+PIPELINE = False             # True: clean, score and persist each scroll batch while the next one is scraped
+                             # (scores go to SIGNAL_STORE_DIR, not CLEANED_FILE; see StreamingPipeline)
+PIPELINE_QUEUE_BATCHES = 8   # batches buffered between two pipeline stages; a full queue blocks the scraper
+
+# near-duplicate clusters (MinHash over word shingles + LSH), checked against every earlier batch
+NEAR_DUP_MODE = "flag"        # "flag" = keep them, marked (dup_cluster/near_duplicate columns); "drop" them while cleaning; "off"
+NEAR_DUP_THRESHOLD = 0.6      # estimated Jaccard similarity of word shingles at which two tweets share a cluster
+NEAR_DUP_NUM_PERM = 64        # MinHash signature length (bands/rows per band are derived from the threshold)
+NEAR_DUP_SHINGLE = 2          # words per shingle
+NEAR_DUP_DIR = "near_dup_index"
+NEAR_DUP_CHUNK_ROWS = 20_000  # texts hashed per pass
+
+# signal engine: "refit" = fit TF-IDF on the frame each run (original behaviour, kept sparse)
+#                "incremental" = frozen vocabulary + running IDF persisted in SIGNAL_MODEL_FILE
+#                "hashing" = hashed features + running IDF, no vocabulary at all
+SIGNAL_MODE = "refit"
+SIGNAL_MODEL_FILE = "signal_model.pkl"
+SIGNAL_MAX_FEATURES = 1000
+SIGNAL_HASH_FEATURES = 2 ** 18
+
+# per-hashtag signal bars: mean signal, tweet count and engagement-weighted signal per interval
+SERIES_DIR = "signal_series"                    # one sorted parquet file per interval: bars_<label>.parquet
+SERIES_INTERVALS = {"1m": "1min", "5m": "5min", "15m": "15min"}
+SERIES_ROLLING_WINDOW = timedelta(hours=1)      # rolling count / mean over the bars inside this window
+SERIES_RETENTION = timedelta(days=30)           # bars older than this (vs. the newest bar) are dropped
+ENGAGEMENT_WEIGHTS = {"likes": 1.0, "retweets": 2.0, "replies": 1.5}  # weight = 1 + log1p(weighted engagement)
+
+# headless reports (PNG + HTML), rendered in a background process with matplotlib's Agg backend
+REPORT_DIR = "reports"
+REPORT_BINS = 50                  # bins of the signal histogram
+REPORT_INTERVAL = "5min"          # bin width of the per-hashtag series ...
+REPORT_MAX_POINTS = 2000          # ... widened so no series has more bins than this
+
+# direction lexicon and NSE instruments (whole words, case-insensitive; phrases match consecutive words)
+LEXICON_SCORING = True
+LEXICON_FILE = "lexicon.json"   # optional {"bullish": [...], "bearish": [...], "tickers": {...}} replacing the lists below
+BULLISH_TERMS = ["bullish", "bull", "bulls", "buy", "buying", "long", "breakout", "rally", "rallies", "upside",
+                 "uptrend", "accumulate", "outperform", "upgrade", "rebound", "bounce", "calls", "green",
+                 "gap up", "higher high", "higher highs", "all time high", "ath", "short covering"]
+BEARISH_TERMS = ["bearish", "bear", "bears", "sell", "selling", "short", "breakdown", "crash", "downside",
+                 "downtrend", "dump", "underperform", "downgrade", "selloff", "panic", "puts", "red",
+                 "gap down", "lower low", "lower lows", "profit booking", "sell off"]
+NSE_TICKERS = {
+    "NIFTY": ["nifty", "nifty50", "nifty 50"],
+    "BANKNIFTY": ["banknifty", "bank nifty", "niftybank", "nifty bank"],
+    "FINNIFTY": ["finnifty", "fin nifty"],
+    "SENSEX": ["sensex"],
+    "RELIANCE": ["reliance", "ril"],
+    "HDFCBANK": ["hdfcbank", "hdfc bank"],
+    "ICICIBANK": ["icicibank", "icici bank"],
+    "SBIN": ["sbin", "sbi"],
+    "INFY": ["infy", "infosys"],
+    "TCS": ["tcs"],
+    "ITC": ["itc"],
+    "AXISBANK": ["axisbank", "axis bank"],
+    "KOTAKBANK": ["kotakbank", "kotak bank", "kotak"],
+    "LT": ["larsen"],
+    "BAJFINANCE": ["bajfinance", "bajaj finance"],
+    "TATAMOTORS": ["tatamotors", "tata motors"],
+    "TATASTEEL": ["tatasteel", "tata steel"],
+    "ADANIENT": ["adanient", "adani enterprises"],
+    "MARUTI": ["maruti"],
+    "WIPRO": ["wipro"],
+}
+LEXICON_CHUNK_ROWS = 100_000    # rows matched per pass (bounds the token arrays and the count matrix)
 
 # If you want youo can paste cookie JSON directly into the script, replace the empty list below
 # with the JSON string or Python list object you exported from your browser.
@@ -41,21 +180,358 @@ COOKIES_JSON = ""  # paste JSON string here or leave empty to load COOKIES_JSON_
 MAX_TWEETS_PER_HASHTAG = 20
 MIN_TWEETS_PER_HASHTAG = 10
 HEADLESS = False
+DRIVER_PATH_CACHE = ".chromedriver_path"   # resolved chromedriver path, reused across launches
+CHROME_PROFILE_DIR = "chrome_profile"      # persistent user-data-dir (logged-in session survives runs); None to disable
+
+# instrumentation
+METRICS_JSON_FILE = "run_report.json"      # per-run phase timings, counters, per-hashtag throughput
+METRICS_PROM_FILE = "run_metrics.prom"     # same numbers in Prometheus text format (node_exporter textfile)
+PROFILER = None                            # None | "cprofile" | "pyinstrument"
+PROFILE_OUTPUT = "run_profile"
 SCROLL_RETRY_LIMIT = 6
-ERROR_PAUSE_SECONDS = 600  # 10 min for Something went wrong Error
+EVENT_DRIVEN_WAITS = True       # wait on page state (new articles, search box) instead of fixed random sleeps
+WAIT_TIMEOUT_SECONDS = 10       # longest we wait for the timeline to change
+JITTER_FLOOR = (0.3, 0.9)       # humanized pause still taken after the page is ready
+ERROR_PAGE_REFRESHES = 1        # immediate refreshes before an erroring tag is handed back to the scheduler
+
+# throttling: a token bucket per session, circuit breakers with exponential backoff per hashtag and per session
+SESSION_SEARCHES_PER_MINUTE = 4     # refill rate of each session's token bucket
+SESSION_BURST = 2                   # bucket size
+TAG_BREAKER_FAILURES = 1            # consecutive failures before a hashtag cools down
+SESSION_BREAKER_FAILURES = 2        # consecutive error pages before a whole session cools down
+BACKOFF_BASE_SECONDS = 120          # first cool-down; doubles each time the breaker re-opens (with jitter)
+BACKOFF_MAX_SECONDS = 1800
+TAG_MAX_ATTEMPTS = 4                # tries per hashtag per run before giving up on it
+
+# concurrent collection: one WebDriver session per worker, each scraping its own hashtag
+CONCURRENT_COLLECTION = False          # False -> original one-session sequential loop
+POOL_SIZE = 2                          # max browser sessions alive at once
+WORKER_PACING_SECONDS = (15, 180)      # pause a session takes between two tags
+
+COLLECT_MODE = "dom"     # "dom" = scrape articles; "network" = decode the timeline JSON the page loads
+TWITTER_BASE_URL = "https://twitter.com"   # site the browser opens (a tests.fakes.MockTimelineServer URL for offline runs)
+
+# collector backend: "selenium" = one Chrome session per worker (COLLECT_MODE applies)
+#                    "http" = pooled keep-alive HTTP client calling the search timeline endpoint with the saved cookies
+COLLECTOR_BACKEND = "selenium"
+HTTP_SEARCH_URL = os.environ.get("TQB_SEARCH_URL", "")      # https://x.com/i/api/graphql/<queryId>/SearchTimeline
+HTTP_BEARER_TOKEN = os.environ.get("TQB_BEARER_TOKEN", "")  # bearer token the web app sends with its API calls
+HTTP_SEARCH_FEATURES = json.loads(os.environ.get("TQB_SEARCH_FEATURES", "{}"))  # its "features" JSON, if required
+HTTP_PAGE_SIZE = 20                 # tweets asked for per timeline page
+HTTP_POOL_CONNECTIONS = 4           # keep-alive connections per HTTP session
+HTTP_TIMEOUT_SECONDS = 15
+HTTP_PAGE_PAUSE = (0.8, 2.0)        # pause between two pages of one search (the browser's scroll cadence)
+HTTP_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/124.0.0.0 Safari/537.36")
+TIMELINE_URL_MARKERS = ("SearchTimeline", "HomeTimeline", "HomeLatestTimeline", "adaptive.json")
+NETWORK_FIXTURE = "fixtures/search_timeline_sample.jsonl"  # recorded responses for offline replay
+LEAN_BROWSER = True      # text-only profile: no images, media or web fonts
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.mp4", "*.m3u8", "*.m4s", "*.woff", "*.woff2", "*.ttf",
+    "*video.twimg.com*", "*pbs.twimg.com/media*", "*pbs.twimg.com/card_img*", "*pbs.twimg.com/profile_images*",
+    "*pbs.twimg.com/amplify_video*", "*pbs.twimg.com/ext_tw_video*",
+]
+# what happens to an article once it has been read: "off", "strip" (release its media), "detach" (remove its cell)
+PRUNE_PROCESSED = "strip"
+BULK_EXTRACTION = True   # one execute_script per scroll pass; False -> per-element WebDriver queries
+
+# daemon mode (python twitter_data_collection.py --daemon): one live session, each hashtag on its own schedule
+DAEMON_MIN_INTERVAL = 60            # seconds between polls of the busiest tag
+DAEMON_MAX_INTERVAL = 30 * 60       # ... and of the quietest
+DAEMON_TARGET_NEW_PER_POLL = 15     # poll each tag about when this many new tweets should be waiting
+DAEMON_RATE_ALPHA = 0.3             # EWMA weight of the latest observed tweet rate
+DAEMON_MAX_TWEETS_PER_POLL = 100
+DAEMON_REQUEST_BUDGET = 120         # searches allowed per DAEMON_BUDGET_WINDOW, all tags together
+DAEMON_BUDGET_WINDOW = 3600
+DAEMON_FLUSH_EVERY = 20             # polls between tweet-index flushes
+DAEMON_REPORT_EVERY = 60            # polls between signal reports of the last CLEAN_WINDOW (0 = never)
+SIGNAL_STORE_DIR = "signals_store"  # cleaned + scored tweets written by the daemon, same layout as STORE_DIR
+MARKET_UTC_OFFSET = timedelta(hours=5, minutes=30)   # NSE runs on IST
+MARKET_HOURS = ((9, 15), (15, 30))                   # open, close (local time, Mon-Fri)
+MARKET_BOOST = 2.0                  # poll this many times more often while the market is open
+
+# batch re-analysis of the stored history (python twitter_data_collection.py --analyze)
+HISTORY_FILE = "history_scored.parquet"
+HISTORY_SHARD_BY = "date"       # one worker task per tweet date ("date") or per hashtag ("tag")
+HISTORY_WORKERS = None          # worker processes; None = one per CPU
+HISTORY_GLOBAL_IDF = True       # score every shard against one vocabulary/IDF fitted over all shards
+HISTORY_POOL_MIN_MB = 4         # stored Parquet below this (~100k tweets) is analyzed in-process: spawning costs more
+
+# persistent index of collected status ids (sorted id file + bloom filter + per-hashtag high-water marks)
+USE_TWEET_INDEX = True
+TWEET_INDEX_DIR = "tweet_index"
+BLOOM_CAPACITY = 5_000_000   # ids the bloom filter is sized for (~9 MB at 0.1% false positives)
+BLOOM_FP_RATE = 0.001
+HWM_STOP_AFTER = 3           # stop scrolling after this many tweets at/below the hashtag's high-water mark
+
+# =================== INSTRUMENTATION ===================
+class RunMetrics:
+    """
+    Per-run timers and counters.
+
+    phase(name) times a block and attributes every WebDriver command sent
+    inside it (see instrument_driver) to that phase; phases nest per thread.
+    record_hashtag() keeps tweets/sec and round trips per tweet per hashtag.
+    write_report() exports a JSON run report and a Prometheus text file.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started_at = datetime.now(timezone.utc)
+        self.timers = {}      # phase -> {"calls", "seconds", "max_seconds"}
+        self.counters = {}    # (name, ((label, value), ...)) -> value
+        self.hashtags = {}    # hashtag -> {"tweets", "seconds", "roundtrips", "runs"}
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+            self._local.commands = 0
+        return self._local.stack
+
+    def current_phase(self):
+        stack = self._stack()
+        return stack[-1] if stack else "other"
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        stack = self._stack()
+        stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            stack.pop()
+            with self._lock:
+                t = self.timers.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+                t["calls"] += 1
+                t["seconds"] += elapsed
+                t["max_seconds"] = max(t["max_seconds"], elapsed)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def count_command(self, command):
+        self._stack()
+        self._local.commands += 1
+        self.inc("webdriver_commands", phase=self.current_phase(), command=command)
+
+    def thread_commands(self):
+        """WebDriver commands sent so far by the calling thread."""
+        self._stack()
+        return self._local.commands
+
+    def record_hashtag(self, hashtag, tweets, seconds, roundtrips):
+        with self._lock:
+            h = self.hashtags.setdefault(hashtag, {"tweets": 0, "seconds": 0.0, "roundtrips": 0, "runs": 0})
+            h["tweets"] += tweets
+            h["seconds"] += seconds
+            h["roundtrips"] += roundtrips
+            h["runs"] += 1
+
+    def report(self):
+        with self._lock:
+            hashtags = {}
+            for tag, h in self.hashtags.items():
+                hashtags[tag] = dict(h, tweets_per_second=h["tweets"] / h["seconds"] if h["seconds"] else 0.0,
+                                     roundtrips_per_tweet=h["roundtrips"] / h["tweets"] if h["tweets"] else None)
+            return {
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": (datetime.now(timezone.utc) - self.started_at).total_seconds(),
+                "startup": dict(STARTUP_TIMINGS),
+                "phases": {k: dict(v) for k, v in self.timers.items()},
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "hashtags": hashtags,
+            }
+
+    def prometheus_text(self, prefix="tqb"):
+        rep = self.report()
+
+        def _labels(**kv):
+            esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in kv.items()) + "}"
+
+        lines = []
+
+        def _metric(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{name}{labels} {value}" for labels, value in samples)
+
+        _metric("phase_seconds_total", "counter", "Wall time spent in each phase.",
+                [(_labels(phase=k), round(v["seconds"], 6)) for k, v in rep["phases"].items()])
+        _metric("phase_calls_total", "counter", "Times each phase ran.",
+                [(_labels(phase=k), v["calls"]) for k, v in rep["phases"].items()])
+        _metric("startup_seconds", "gauge", "Startup time per phase.",
+                [(_labels(phase=k), round(v, 6)) for k, v in rep["startup"].items()])
+        by_name = {}
+        for c in rep["counters"]:
+            by_name.setdefault(c["name"], []).append((_labels(**c["labels"]), c["value"]))
+        for name, samples in by_name.items():
+            _metric(f"{name}_total", "counter", f"Counter {name}.", samples)
+        _metric("hashtag_tweets_total", "counter", "Tweets collected per hashtag.",
+                [(_labels(hashtag=k), v["tweets"]) for k, v in rep["hashtags"].items()])
+        _metric("hashtag_tweets_per_second", "gauge", "Collection throughput per hashtag.",
+                [(_labels(hashtag=k), round(v["tweets_per_second"], 4)) for k, v in rep["hashtags"].items()])
+        _metric("hashtag_roundtrips_per_tweet", "gauge", "WebDriver round trips per collected tweet.",
+                [(_labels(hashtag=k), round(v["roundtrips_per_tweet"], 4)) for k, v in rep["hashtags"].items()
+                 if v["roundtrips_per_tweet"] is not None])
+        _metric("run_duration_seconds", "gauge", "Seconds since the run started.",
+                [("", round(rep["duration_seconds"], 3))])
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, json_path=METRICS_JSON_FILE, prom_path=METRICS_PROM_FILE):
+        if json_path:
+            _atomic_write_bytes(json_path, json.dumps(self.report(), indent=2).encode("utf-8"))
+        if prom_path:
+            _atomic_write_bytes(prom_path, self.prometheus_text().encode("utf-8"))
+        print(f"[INFO] Wrote run report to {json_path} and metrics to {prom_path}.")
+
+    def print_summary(self):
+        rep = self.report()
+        for name, t in sorted(rep["phases"].items(), key=lambda kv: -kv[1]["seconds"]):
+            print(f"[METRICS] {name:<14} {t['seconds']:8.2f}s over {t['calls']} calls")
+        for tag, h in rep["hashtags"].items():
+            rt = h["roundtrips_per_tweet"]
+            print(f"[METRICS] {tag:<14} {h['tweets']} tweets, {h['tweets_per_second']:.2f} tweets/s, "
+                  f"{'n/a' if rt is None else f'{rt:.1f}'} round trips/tweet")
+
+METRICS = RunMetrics()
+
+def instrument_driver(driver, metrics=None):
+    """
+    Count every WebDriver command `driver` sends (element commands included:
+    WebElement routes through its parent's execute) under the current phase.
+    """
+    metrics = metrics or METRICS
+    if getattr(driver, "_tqb_instrumented", False):
+        return driver
+    execute = driver.execute
+
+    def _counted_execute(driver_command, params=None):
+        metrics.count_command(driver_command)
+        return execute(driver_command, params)
+    driver.execute = _counted_execute
+    driver._tqb_instrumented = True
+    return driver
+
+@contextlib.contextmanager
+def profiled(kind=PROFILER, output=PROFILE_OUTPUT):
+    """
+    Optional whole-run profiler: "cprofile" writes <output>.pstats and prints
+    the top functions, "pyinstrument" (if installed) writes <output>.html.
+    """
+    if kind == "cprofile":
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(output + ".pstats")
+            pstats.Stats(prof).sort_stats("cumulative").print_stats(25)
+            print(f"[INFO] cProfile stats written to {output}.pstats")
+    elif kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("[WARN] pyinstrument not installed; running without profiler.")
+            yield
+            return
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(output + ".html", "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+            print(f"[INFO] pyinstrument report written to {output}.html")
+    else:
+        yield
 
 # =================== SELENIUM INIT ===================
-def init_driver(headless=HEADLESS):
+def resolve_chromedriver(cache_file=DRIVER_PATH_CACHE):
+    """
+    chromedriver path from CHROMEDRIVER_PATH or the cache file; only asks
+    ChromeDriverManager (network lookup) when neither points at a real binary.
+    """
+    path = os.environ.get("CHROMEDRIVER_PATH")
+    if not path and cache_file and os.path.exists(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+    if path and os.path.isfile(path):
+        return path
+    path = ChromeDriverManager().install()
+    if cache_file:
+        try:
+            with open(cache_file, "w", encoding="utf-8") as f:
+                f.write(path)
+        except OSError:
+            pass
+    return path
+
+def init_driver(headless=HEADLESS, capture_network=None, profile_dir=CHROME_PROFILE_DIR):
+    if capture_network is None:
+        capture_network = COLLECT_MODE == "network"
     options = Options()
     options.add_argument("--start-maximized")
+    profile_is_new = bool(profile_dir) and not os.path.isdir(profile_dir)
+    if profile_dir:
+        # a warm profile keeps the session cookies, cache and service worker between runs
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
     # try to reduce detection flags
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
     if headless:
         options.add_argument("--headless=new")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if capture_network:
+        # DevTools network events land in the "performance" log
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if LEAN_BROWSER:
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        })
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument("--disable-remote-fonts")
+    with startup_phase("driver path"):
+        service = Service(resolve_chromedriver())
+    with startup_phase("browser launch"):
+        driver = webdriver.Chrome(service=service, options=options)
+    driver.profile_is_new = profile_is_new  # login_driver skips the session check on it
     driver.set_page_load_timeout(60)
-    return driver
+    driver.set_script_timeout(WAIT_TIMEOUT_SECONDS + 5)
+    if capture_network or LEAN_BROWSER:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            if LEAN_BROWSER:
+                # catches video segments and fonts the content settings above don't cover
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            print(f"[WARN] Could not configure DevTools network domain: {e}")
+    return instrument_driver(driver)
+
+def browser_footprint(driver):
+    """
+    {"js_heap_mb", "dom_nodes"} of the current page via DevTools, or {} if unavailable.
+    """
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])}
+    except Exception:
+        return {}
+    if not metrics:
+        return {}
+    return {"js_heap_mb": round(metrics.get("JSHeapUsedSize", 0) / 2**20, 1), "dom_nodes": int(metrics.get("Nodes", 0))}
 
 # =================== COOKIE UTILITIES ===================
 def normalize_cookie_for_selenium(cookie):
@@ -105,7 +581,88 @@ def normalize_cookie_for_selenium(cookie):
         c["sameSite"] = cookie.get("sameSite")
     return c
 
-def load_cookies_from_json_string(driver, json_string, save_pickle=True):
+def cookie_to_cdp(cookie):
+    """
+    Selenium-style cookie dict -> DevTools Network.CookieParam.
+    """
+    c = {"name": cookie["name"], "value": cookie["value"], "domain": cookie.get("domain") or ".twitter.com",
+         "path": cookie.get("path") or "/"}
+    if cookie.get("secure") is not None:
+        c["secure"] = bool(cookie["secure"])
+    if cookie.get("httpOnly") is not None:
+        c["httpOnly"] = bool(cookie["httpOnly"])
+    if cookie.get("expiry"):
+        c["expires"] = int(cookie["expiry"])
+    same_site = str(cookie.get("sameSite") or "").lower()
+    same_site = {"no_restriction": "None", "none": "None", "lax": "Lax", "strict": "Strict"}.get(same_site)
+    if same_site:
+        c["sameSite"] = same_site
+    return c
+
+def inject_cookies(driver, cookies):
+    """
+    Set all cookies with one DevTools Network.setCookies call (no page load
+    needed). Falls back to add_cookie one by one on the twitter.com origin.
+    Returns the number of cookies set.
+    """
+    cookies = [c for c in cookies if c and c.get("name") and c.get("value") is not None]
+    if not cookies:
+        return 0
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [cookie_to_cdp(c) for c in cookies]})
+        return len(cookies)
+    except Exception as e:
+        print(f"[WARN] Bulk cookie injection unavailable ({e}); adding cookies one by one.")
+
+    # load a base page first (domain needs to match for add_cookie)
+    driver.get(TWITTER_BASE_URL)
+    time.sleep(2)
+    added = 0
+    for cookie in cookies:
+        try:
+            # Selenium doesn't allow setting "sameSite" in some versions; remove if problematic
+            if "sameSite" in cookie:
+                try:
+                    driver.add_cookie(cookie)
+                except Exception:
+                    # try removing sameSite and retry
+                    cookie = dict(cookie)
+                    cookie.pop("sameSite", None)
+                    driver.add_cookie(cookie)
+            else:
+                driver.add_cookie(cookie)
+            added += 1
+        except Exception:
+            # some cookies may fail to add; continue
+            continue
+    if added:
+        driver.refresh()
+        time.sleep(3)
+    return added
+
+def session_is_valid(driver):
+    """
+    True if the browser profile is still logged in (auth_token cookie present and the
+    search box renders), in which case cookie re-injection can be skipped.
+    """
+    try:
+        driver.get(f"{TWITTER_BASE_URL}/home")
+        if not (driver.get_cookie("auth_token")):
+            return False
+        WebDriverWait(driver, 8).until(EC.presence_of_element_located((By.XPATH, '//input[@aria-label="Search query"]')))
+        return True
+    except Exception:
+        return False
+
+def session_lost(driver):
+    """
+    True if a session that just failed needs logging in again: a browser
+    that is no longer logged in (or no longer answers), or any backend,
+    which has no page to check and reopens its session from the saved cookies.
+    """
+    return isinstance(driver, CollectorBackend) or not session_is_valid(driver)
+
+def load_cookies_from_json_string(driver, json_string):
     """
     Inject cookies given a JSON string or Python list.
     Returns True if any cookie was added.
@@ -125,58 +682,24 @@ def load_cookies_from_json_string(driver, json_string, save_pickle=True):
         print("[ERROR] Cookie JSON must be a list of cookie objects.")
         return False
 
-    # load a base page first (domain needs to match for add_cookie)
-    driver.get("https://twitter.com")
-    time.sleep(2)
-
-    added = 0
-    for cookie in cookies_list:
-        normalized = normalize_cookie_for_selenium(cookie)
-        if not normalized:
-            continue
-        try:
-            # Selenium doesn't allow setting "sameSite" in some versions; remove if problematic
-            if "sameSite" in normalized:
-                try:
-                    driver.add_cookie(normalized)
-                except Exception:
-                    # try removing sameSite and retry
-                    normalized.pop("sameSite", None)
-                    driver.add_cookie(normalized)
-            else:
-                driver.add_cookie(normalized)
-            added += 1
-        except Exception as e:
-            # some cookies may fail to add; continue
-            # print(f"[WARN] Could not add cookie {normalized.get('name')}: {e}")
-            continue
+    normalized = [c for c in (normalize_cookie_for_selenium(cookie) for cookie in cookies_list) if c]
+    added = inject_cookies(driver, normalized)
 
     if added > 0:
-        # optionally save to pickle for later convenience
-        if save_pickle:
-            try:
-                cookies_for_pickle = driver.get_cookies()
-                with open(COOKIES_FILE_PKL, "wb") as f:
-                    pickle.dump(cookies_for_pickle, f)
-                print(f"[INFO] Injected {added} cookies and saved to {COOKIES_FILE_PKL}")
-            except Exception as e:
-                print(f"[WARN] Could not save cookies pickle: {e}")
-        # refresh and wait
-        driver.refresh()
-        time.sleep(4)
+        print(f"[INFO] Injected {added} cookies.")
         return True
     else:
         print("[WARN] No cookies injected (check JSON format and domain).")
         return False
 
-def load_cookies_from_file(driver, json_path=COOKIES_JSON_FILE, save_pickle=True):
+def load_cookies_from_file(driver, json_path=COOKIES_JSON_FILE):
     if not os.path.exists(json_path):
         print(f"[WARN] Cookie JSON file {json_path} not found.")
         return False
     try:
         with open(json_path, "r", encoding="utf-8") as f:
             content = f.read()
-            return load_cookies_from_json_string(driver, content, save_pickle=save_pickle)
+            return load_cookies_from_json_string(driver, content)
     except Exception as e:
         print(f"[ERROR] Failed to read cookie JSON file: {e}")
         return False
@@ -187,24 +710,147 @@ def try_load_pickle(driver, pickle_path=COOKIES_FILE_PKL):
     try:
         with open(pickle_path, "rb") as f:
             cookies = pickle.load(f)
-        driver.get("https://twitter.com")
-        time.sleep(1)
-        added = 0
-        for cookie in cookies:
-            try:
-                driver.add_cookie(cookie)
-                added += 1
-            except Exception:
-                continue
+        added = inject_cookies(driver, cookies)
         if added:
-            driver.refresh()
-            time.sleep(3)
             print(f"[INFO] Loaded {added} cookies from pickle {pickle_path}.")
             return True
     except Exception as e:
         print(f"[WARN] Could not load pickle cookies: {e}")
     return False
 
+def save_session_cookies(driver, pickle_path=COOKIES_FILE_PKL):
+    """
+    Pickle the cookies the logged-in browser holds now, so tokens the server
+    rotated since the export (ct0 and friends) are what the next run injects.
+    """
+    try:
+        cookies = driver.get_cookies()
+        if cookies:
+            _atomic_write_bytes(pickle_path, pickle.dumps(cookies))
+            print(f"[INFO] Saved {len(cookies)} session cookies to {pickle_path}.")
+    except Exception as e:
+        print(f"[WARN] Could not save cookies pickle: {e}")
+
+def load_saved_cookies(pickle_path=COOKIES_FILE_PKL, json_path=COOKIES_JSON_FILE):
+    """
+    Normalized cookie dicts from the pickle, COOKIES_JSON or the JSON file
+    (the order _inject_saved_cookies tries them in), without a browser.
+    Returns [] if none of them holds a usable cookie.
+    """
+    if os.path.exists(pickle_path):
+        try:
+            with open(pickle_path, "rb") as f:
+                cookies = [c for c in (normalize_cookie_for_selenium(c) for c in pickle.load(f)) if c]
+            if cookies:
+                return cookies
+        except Exception as e:
+            print(f"[WARN] Could not load pickle cookies: {e}")
+    sources = [("COOKIES_JSON", COOKIES_JSON)] if COOKIES_JSON else []
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            sources.append((json_path, f.read()))
+    for name, raw in sources:
+        try:
+            cookies = json.loads(raw) if isinstance(raw, str) else list(raw)
+        except Exception as e:
+            print(f"[WARN] Could not parse cookie JSON from {name}: {e}")
+            continue
+        cookies = [c for c in (normalize_cookie_for_selenium(c) for c in cookies if isinstance(c, dict)) if c]
+        if cookies:
+            return cookies
+    return []
+
+# =================== PAGE-STATE WAITS ===================
+# Resolves as soon as timeline articles are added (or the error banner shows),
+# instead of sleeping a fixed time. arguments: [min article count, timeout ms, callback]
+# min count -1 = only react to articles added after the call.
+WAIT_FOR_ARTICLES_JS = r"""
+const done = arguments[arguments.length - 1];
+const minCount = arguments[0], timeoutMs = arguments[1];
+const hasError = () => document.evaluate(
+  "boolean(//span[contains(., 'Something went wrong') or contains(., 'Try reloading')])",
+  document, null, XPathResult.BOOLEAN_TYPE, null).booleanValue;
+const state = (added) => ({count: document.querySelectorAll('article').length, error: hasError(), added: added});
+const now = state(false);
+if ((minCount >= 0 && now.count > minCount) || now.error) { done(now); return; }
+let timer = null;
+const obs = new MutationObserver((mutations) => {
+  let added = false;
+  for (const m of mutations) {
+    for (const n of m.addedNodes) {
+      if (n.nodeType === 1 && (n.tagName === 'ARTICLE' || n.querySelector('article'))) { added = true; break; }
+    }
+    if (added) break;
+  }
+  const s = state(added);
+  if (added || s.error) { obs.disconnect(); clearTimeout(timer); done(s); }
+});
+obs.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => { obs.disconnect(); done(state(false)); }, timeoutMs);
+"""
+
+# Targeted error-banner check: returns a boolean instead of shipping page_source over the wire.
+PAGE_ERROR_JS = r"""
+return document.evaluate(
+  "boolean(//span[contains(., 'Something went wrong') or contains(., 'Try reloading')])",
+  document, null, XPathResult.BOOLEAN_TYPE, null).booleanValue;
+"""
+
+def human_pause(legacy=(1.2, 3)):
+    """
+    Humanized jitter: the JITTER_FLOOR when waits are event driven, the old fixed range otherwise.
+    """
+    lo, hi = JITTER_FLOOR if EVENT_DRIVEN_WAITS else legacy
+    time.sleep(random.uniform(lo, hi))
+
+def wait_for_timeline(driver, min_count=-1, legacy=(2, 4), timeout=WAIT_TIMEOUT_SECONDS):
+    """
+    Block until the timeline renders new articles (or shows its error banner,
+    or `timeout`), then take the jitter floor. Falls back to the legacy sleep
+    when waits are not event driven or the async script cannot run.
+    Returns {"count", "error", "added"} or None.
+    """
+    if not EVENT_DRIVEN_WAITS:
+        time.sleep(random.uniform(*legacy))
+        return None
+    try:
+        state = driver.execute_async_script(WAIT_FOR_ARTICLES_JS, min_count, int(timeout * 1000))
+    except Exception:
+        time.sleep(random.uniform(*legacy))
+        return None
+    human_pause()
+    return state if isinstance(state, dict) else None
+
+def wait_for_navigation(driver, previous_url, old_article=None, timeout=WAIT_TIMEOUT_SECONDS):
+    """
+    Block until the browser has left `previous_url` or `old_article` has gone
+    stale, so whatever is counted next belongs to the new page. Returns
+    False on timeout (and at once when waits are not event driven).
+    """
+    if not EVENT_DRIVEN_WAITS:
+        time.sleep(random.uniform(1, 2))
+        return True
+
+    def _left(d):
+        if d.current_url != previous_url:
+            return True
+        return old_article is not None and EC.staleness_of(old_article)(d)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(_left)
+        return True
+    except Exception:
+        return False
+
+def page_has_error(driver):
+    if EVENT_DRIVEN_WAITS:
+        try:
+            return bool(driver.execute_script(PAGE_ERROR_JS))
+        except Exception:
+            pass
+    page_source = driver.page_source
+    return "Something went wrong" in page_source or "Try reloading" in page_source
+
 # =================== HELPER: click latest tab ===================
 def click_latest_tab(driver):
     try:
@@ -214,9 +860,9 @@ def click_latest_tab(driver):
                 text = el.text.strip().lower()
                 if "latest" in text:
                     driver.execute_script("arguments[0].scrollIntoView({block:'center'})", el)
-                    time.sleep(random.uniform(0.3, 0.8))
+                    human_pause((0.3, 0.8))
                     el.click()
-                    time.sleep(random.uniform(1.5, 3))
+                    wait_for_timeline(driver, legacy=(1.5, 3))
                     return True
             except Exception:
                 continue
@@ -225,15 +871,16 @@ def click_latest_tab(driver):
     try:
         latest = driver.find_element(By.LINK_TEXT, "Latest")
         latest.click()
-        time.sleep(random.uniform(1.5, 3))
+        wait_for_timeline(driver, legacy=(1.5, 3))
         return True
     except Exception:
         return False
 
 # =================== SEARCH + SCROLL STRATEGIES ===================
 def search_hashtag(driver, hashtag):
-    driver.get("https://twitter.com/home")
-    time.sleep(random.uniform(2.5, 5))
+    driver.get(f"{TWITTER_BASE_URL}/home")
+    # the WebDriverWait below already blocks until the search box exists
+    human_pause((2.5, 5))
     selectors = [
         '//input[@aria-label="Search query"]',
         '//input[@placeholder="Search Twitter"]',
@@ -255,15 +902,23 @@ def search_hashtag(driver, hashtag):
     for ch in hashtag:
         search_input.send_keys(ch)
         time.sleep(random.uniform(0.03, 0.12))
+    # the home timeline's articles are still in the DOM until the results replace them
+    try:
+        old_article = driver.find_element(By.CSS_SELECTOR, "article")
+    except Exception:
+        old_article = None
+    previous_url = driver.current_url
     search_input.send_keys(Keys.ENTER)
-    time.sleep(random.uniform(3, 5))
+    if not wait_for_navigation(driver, previous_url, old_article):
+        print(f"[WARN] Search for {hashtag} did not navigate within {WAIT_TIMEOUT_SECONDS}s.")
+    wait_for_timeline(driver, min_count=0, legacy=(3, 5))
 
     if not click_latest_tab(driver):
         try:
             script = f"window.history.pushState({{}}, '', '?q={hashtag.replace('#','%23')}&f=live');"
             driver.execute_script(script)
             driver.refresh()
-            time.sleep(random.uniform(2.5, 4))
+            wait_for_timeline(driver, min_count=0, legacy=(2.5, 4))
         except Exception:
             pass
 
@@ -284,12 +939,11 @@ def page_down_scroll(driver):
 
 def scroll_into_last_article(driver):
     try:
-        articles = driver.find_elements(By.XPATH, "//article")
-        if not articles:
-            return False
-        last = articles[-1]
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", last)
-        return True
+        # resolved in-page: fetching every //article handle grows with scroll depth
+        return bool(driver.execute_script(
+            "const a = document.querySelectorAll('article');"
+            "if (!a.length) return false;"
+            "a[a.length - 1].scrollIntoView({block: 'center'}); return true;"))
     except Exception:
         return False
 
@@ -303,7 +957,63 @@ def js_scroll_bottom(driver):
 SCROLL_STRATEGIES = [small_increment_scroll, scroll_into_last_article, page_down_scroll, js_scroll_bottom]
 
 # =================== TWEET EXTRACTION ===================
-def extract_tweet_from_article(article):
+STATUS_HREF_RE = re.compile(r"/([^/?#]+)/status/(\d+)")
+METRIC_COUNT_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMB])?")
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"@\w+")
+# record field -> data-testid of its button in the article's action bar
+METRIC_TEST_IDS = (("replies", "reply"), ("retweets", "retweet"), ("likes", "like"))
+
+def parse_metric_count(text):
+    """
+    Parse a metric label as rendered by Twitter: "", "7", "1,234", "1.2K", "3M".
+    """
+    if text is None:
+        return 0
+    if isinstance(text, (int, float)):
+        return int(text)
+    t = str(text).strip().replace(",", "").upper()
+    m = METRIC_COUNT_RE.match(t)
+    if not m:
+        return 0
+    scale = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}.get(m.group(2), 1)
+    return int(round(float(m.group(1)) * scale))
+
+def parse_status_href(href):
+    """
+    "https://x.com/someone/status/1790000000000000000" -> ("1790000000000000000", "someone")
+    """
+    m = STATUS_HREF_RE.search(href or "")
+    if not m:
+        return None, ""
+    return m.group(2), m.group(1)
+
+def make_record(tweet_id, username, handle, timestamp, content, likes, retweets, replies):
+    content = content or ""
+    return {
+        "tweet_id": tweet_id,
+        "username": username or "",
+        "handle": handle or "",
+        "timestamp": timestamp,
+        "content": content,
+        "likes": parse_metric_count(likes),
+        "retweets": parse_metric_count(retweets),
+        "replies": parse_metric_count(replies),
+        "hashtags": HASHTAG_RE.findall(content),
+        "mentions": MENTION_RE.findall(content)
+    }
+
+def article_tweet_id(article):
+    """
+    (tweet_id, handle) from the permalink wrapping the tweet's <time>; two round trips.
+    """
+    try:
+        link_el = article.find_element(By.XPATH, ".//a[.//time]")
+        return parse_status_href(link_el.get_attribute("href"))
+    except Exception:
+        return None, ""
+
+def extract_tweet_from_article(article, tweet_id=None, handle=""):
     try:
         content = ""
         try:
@@ -319,6 +1029,9 @@ def extract_tweet_from_article(article):
         except Exception:
             username = ""
 
+        if tweet_id is None:
+            tweet_id, handle = article_tweet_id(article)
+
         timestamp = None
         try:
             time_el = article.find_element(By.TAG_NAME, "time")
@@ -326,192 +1039,2526 @@ def extract_tweet_from_article(article):
         except Exception:
             timestamp = None
 
-        likes = retweets = replies = 0
-        try:
-            metrics = article.find_elements(By.XPATH, ".//div[@data-testid='like'] | .//div[@data-testid='retweet'] | .//div[@data-testid='reply']")
-            def _num(el_idx):
-                try:
-                    t = metrics[el_idx].text.strip()
-                    return int(t.replace(",", "")) if t and t.isdigit() else 0
-                except Exception:
-                    return 0
-            if len(metrics) > 0: likes = _num(0)
-            if len(metrics) > 1: retweets = _num(1)
-            if len(metrics) > 2: replies = _num(2)
-        except Exception:
-            pass
+        counts = {}
+        for field, tid in METRIC_TEST_IDS:
+            # looked up by test id, not position: a liked/reposted tweet shows "unlike"/"unretweet"
+            try:
+                els = article.find_elements(By.XPATH, f".//div[@data-testid='{tid}' or @data-testid='un{tid}']")
+                counts[field] = parse_metric_count(els[0].text) if els else 0
+            except Exception:
+                counts[field] = 0
 
-        hashtags_in_tweet = re.findall(r"#\w+", content)
-        mentions = re.findall(r"@\w+", content)
-
-        return {
-            "username": username,
-            "timestamp": timestamp,
-            "content": content,
-            "likes": likes,
-            "retweets": retweets,
-            "replies": replies,
-            "hashtags": hashtags_in_tweet,
-            "mentions": mentions
-        }
+        return make_record(tweet_id, username, handle, timestamp, content, **counts)
     except Exception:
         return None
 
-# =================== SCROLL & COLLECT ===================
-def scroll_and_collect(driver, hashtag, max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG):
-    tweets_data = []
-    seen = set()
-    retry_page_error = 0
+# Articles already handed to Python carry this attribute and are never queried again.
+PROCESSED_ATTR = "data-tqb-done"
+UNPROCESSED_ARTICLES = f"article:not([{PROCESSED_ATTR}])"
+
+# Marks an article processed and, depending on the prune mode, releases its media or removes its cell.
+_PRUNE_JS_FN = r"""
+const markDone = (art, mode) => {
+  art.setAttribute('data-tqb-done', '1');
+  if (mode === 'strip') {
+    for (const m of art.querySelectorAll('img, video, source')) {
+      m.removeAttribute('srcset'); m.removeAttribute('src'); m.removeAttribute('poster');
+      if (m.tagName === 'VIDEO') { try { m.load(); } catch (e) {} }
+    }
+  } else if (mode === 'detach') {
+    (art.closest('[data-testid="cellInnerDiv"]') || art).remove();
+  }
+};
+"""
+
+# arguments[0] = WebElements read by the per-element path, arguments[1] = prune mode
+MARK_ARTICLES_JS = _PRUNE_JS_FN + r"""
+for (const art of arguments[0] || []) markDone(art, arguments[1]);
+return true;
+"""
+
+# One round trip per scroll pass: pulls the fields of every article not read yet.
+# arguments[0] = ids already collected, skipped without reading their nodes.
+# arguments[1] = high-water mark; older ids come back as {tweet_id, known: true} stubs.
+# arguments[2] = prune mode applied to each article once read.
+BULK_EXTRACT_JS = _PRUNE_JS_FN + r"""
+const skip = new Set(arguments[0] || []);
+const hwm = arguments[1] || '';
+const pruneMode = arguments[2] || 'off';
+const out = [];
+for (const art of Array.from(document.querySelectorAll('article:not([data-tqb-done])'))) {
+  const timeEl = art.querySelector('time');
+  let link = timeEl ? timeEl.closest('a') : null;
+  if (!link) link = art.querySelector('a[href*="/status/"]');
+  const m = link ? (link.getAttribute('href') || '').match(/\/([^\/?#]+)\/status\/(\d+)/) : null;
+  const id = m ? m[2] : null;
+  if (id && skip.has(id)) { markDone(art, pruneMode); continue; }
+  if (id && hwm && (id.length < hwm.length || (id.length === hwm.length && id <= hwm))) {
+    out.push({tweet_id: id, known: true});
+    markDone(art, pruneMode);
+    continue;
+  }
+  const textEl = art.querySelector('[data-testid="tweetText"]');
+  const nameEl = art.querySelector('[data-testid="User-Name"] span') || art.querySelector('div[dir="auto"] span');
+  const metric = (tid) => {
+    const el = art.querySelector('[data-testid="' + tid + '"], [data-testid="un' + tid + '"]');
+    if (!el) return '';
+    const exact = (el.getAttribute('aria-label') || '').match(/^([\d,]+)\s/);
+    return exact ? exact[1] : (el.innerText || '').trim();
+  };
+  out.push({
+    tweet_id: id, handle: m ? m[1] : '',
+    username: nameEl ? nameEl.innerText : '',
+    timestamp: timeEl ? timeEl.getAttribute('datetime') : null,
+    content: textEl ? textEl.innerText : (art.innerText || ''),
+    likes: metric('like'), retweets: metric('retweet'), replies: metric('reply')
+  });
+  markDone(art, pruneMode);
+}
+return out;
+"""
 
+def scan_visible_tweets(driver, skip_ids=(), index=None, high_water=None):
+    """
+    Bulk path: one execute_script for every visible article.
+    Returns (records, known_ids): tweets at/below `high_water` or already in
+    `index` are rejected by id before their fields are parsed.
+    records is None if the script could not run.
+    """
     try:
-        search_hashtag(driver, hashtag)
+        raw = driver.execute_script(BULK_EXTRACT_JS, [i for i in skip_ids if i], high_water, PRUNE_PROCESSED)
     except Exception as e:
-        print(f"[ERROR] Searching {hashtag} failed: {e}")
-        return tweets_data
-
-    scroll_retries = 0
-    while len(tweets_data) < max_tweets:
-        page_source = driver.page_source
-        if "Something went wrong" in page_source or "Try reloading" in page_source:
-            retry_page_error += 1
-            if retry_page_error > 3:
-                print(f"[ERROR] Persistent error for {hashtag}, aborting.")
-                break
-            print(f"[WARN] Twitter error page. Sleeping {ERROR_PAUSE_SECONDS//60} mins.")
-            time.sleep(ERROR_PAUSE_SECONDS)
-            driver.refresh()
+        print(f"[WARN] Bulk extraction script failed: {e}")
+        return None, []
+    if not isinstance(raw, list):
+        return None, []
+    fresh = [r for r in raw if not r.get("known")]
+    known_ids = [r.get("tweet_id") for r in raw if r.get("known")]
+    if index is not None and fresh:
+        in_index = index.contains_many([r.get("tweet_id") for r in fresh])
+        known_ids.extend(r.get("tweet_id") for r, hit in zip(fresh, in_index) if hit)
+        fresh = [r for r, hit in zip(fresh, in_index) if not hit]
+    records = []
+    for r in fresh:
+        try:
+            records.append(make_record(r.get("tweet_id"), r.get("username"), r.get("handle"), r.get("timestamp"),
+                                       r.get("content"), r.get("likes"), r.get("retweets"), r.get("replies")))
+        except Exception:
             continue
+    return records, known_ids
 
-        articles = driver.find_elements(By.XPATH, "//article")
-        new_found = False
-        for art in articles:
-            try:
-                sig = (art.text or "")[:160]
-                if not sig or sig in seen:
-                    continue
-                extracted = extract_tweet_from_article(art)
-                if not extracted or not extracted["content"].strip():
-                    continue
-                seen.add(sig)
-                tweets_data.append(extracted)
-                new_found = True
-                if len(tweets_data) >= max_tweets:
-                    break
-            except Exception:
-                continue
+def mark_processed(driver, articles):
+    """
+    Per-element path: flag the articles just read (one round trip) so the next
+    pass only fetches new ones, and prune them per PRUNE_PROCESSED.
+    """
+    if not articles:
+        return
+    try:
+        driver.execute_script(MARK_ARTICLES_JS, list(articles), PRUNE_PROCESSED)
+    except Exception:
+        pass
 
-        if len(tweets_data) >= max_tweets:
-            break
+def extract_visible_tweets(driver, skip_ids=()):
+    """
+    Records for every visible article from a single execute_script.
+    Returns None if the script could not run so callers can fall back to
+    extract_tweet_from_article.
+    """
+    records, _ = scan_visible_tweets(driver, skip_ids)
+    return records
 
-        if not new_found:
-            scroll_retries += 1
-            if scroll_retries > SCROLL_RETRY_LIMIT:
-                if len(tweets_data) >= min_tweets:
-                    print(f"[INFO] Min {min_tweets} tweets reached for {hashtag}.")
-                    break
-                else:
-                    print(f"[WARN] Could not load enough tweets for {hashtag}. Final retry sequence...")
-                    time.sleep(30)
-                    for strategy in SCROLL_STRATEGIES:
-                        try:
-                            strategy(driver)
-                            time.sleep(random.uniform(1.5, 3.2))
-                        except Exception:
-                            pass
-                    break
-            strategy = SCROLL_STRATEGIES[scroll_retries % len(SCROLL_STRATEGIES)]
-            try:
-                strategy(driver)
-            except Exception:
-                pass
-            time.sleep(random.uniform(2, 4))
+# =================== TWEET ID INDEX ===================
+def _as_id_array(ids):
+    """
+    Status ids (str/int) -> uint64 array; anything unparsable becomes 0.
+    """
+    out = np.zeros(len(ids), dtype=np.uint64)
+    for i, v in enumerate(ids):
+        try:
+            out[i] = int(v)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return out
+
+def _splitmix64(x):
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over uint64 ids (double hashing on splitmix64).
+    """
+    def __init__(self, capacity=BLOOM_CAPACITY, fp_rate=BLOOM_FP_RATE, bits=None, k=None):
+        m = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.m = (m + 7) // 8 * 8
+        self.k = k or max(1, int(round(self.m / capacity * math.log(2))))
+        self.bits = bits if bits is not None else np.zeros(self.m // 8, dtype=np.uint8)
+        self.m = len(self.bits) * 8
+
+    def _positions(self, ids):
+        h1 = _splitmix64(ids)
+        h2 = _splitmix64(h1) | np.uint64(1)
+        steps = np.arange(self.k, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.m)
+
+    def add_many(self, ids):
+        if len(ids) == 0:
+            return
+        pos = self._positions(ids).ravel()
+        np.bitwise_or.at(self.bits, (pos >> np.uint64(3)).astype(np.int64),
+                         np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+
+    def contains_many(self, ids):
+        if len(ids) == 0:
+            return np.zeros(0, dtype=bool)
+        pos = self._positions(ids)
+        bits = self.bits[(pos >> np.uint64(3)).astype(np.int64)] >> (pos & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).astype(bool).all(axis=1)
+
+class TweetIdIndex:
+    """
+    On-disk index of every status id we have stored, shared across runs.
+
+    - ids.u64: sorted little-endian uint64 ids, memory-mapped for exact lookups
+    - bloom.bin: bloom filter that answers most "never seen" lookups from RAM
+    - hwm.json: newest id collected per hashtag (the scroller stops below it)
+
+    New ids sit in a small pending set until flush() merges them into the file.
+    """
+    def __init__(self, directory=TWEET_INDEX_DIR, capacity=BLOOM_CAPACITY, fp_rate=BLOOM_FP_RATE,
+                 flush_every=50_000):
+        self.directory = directory
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+        self._ids_path = os.path.join(directory, "ids.u64")
+        self._bloom_path = os.path.join(directory, "bloom.bin")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._hwm_path = os.path.join(directory, "hwm.json")
+        self._lock = threading.RLock()
+        self._pending = set()
+        self._ids = self._open_ids()
+        self._hwm = {}
+        if os.path.exists(self._hwm_path):
+            with open(self._hwm_path, "r", encoding="utf-8") as f:
+                self._hwm = json.load(f)
+
+        meta = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta.get("capacity") == capacity and meta.get("count") == len(self._ids) and os.path.exists(self._bloom_path):
+            bits = np.fromfile(self._bloom_path, dtype=np.uint8)
+            self._bloom = BloomFilter(capacity, fp_rate, bits=bits, k=meta.get("k"))
+        else:
+            # missing or stale filter: rebuild from the id file in chunks
+            self._bloom = BloomFilter(capacity, fp_rate)
+            for i in range(0, len(self._ids), 1 << 20):
+                self._bloom.add_many(np.asarray(self._ids[i:i + (1 << 20)]))
+        self._capacity = capacity
+        if len(self._ids) > capacity:
+            print(f"[WARN] Tweet index holds {len(self._ids)} ids, above BLOOM_CAPACITY={capacity}; "
+                  "false positives will rise (exact lookups stay correct).")
+
+    def _open_ids(self):
+        if os.path.exists(self._ids_path) and os.path.getsize(self._ids_path) >= 8:
+            return np.memmap(self._ids_path, dtype="<u8", mode="r")
+        return np.zeros(0, dtype=np.uint64)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids) + len(self._pending)
+
+    def __contains__(self, tweet_id):
+        return bool(self.contains_many([tweet_id])[0])
+
+    def contains_many(self, tweet_ids):
+        arr = _as_id_array(tweet_ids)
+        with self._lock:
+            hits = self._bloom.contains_many(arr) & (arr != 0)
+            for i in np.flatnonzero(hits):
+                v = int(arr[i])
+                if v in self._pending:
+                    continue
+                j = np.searchsorted(self._ids, arr[i])
+                hits[i] = j < len(self._ids) and int(self._ids[j]) == v
+        return hits
+
+    def high_water_mark(self, hashtag):
+        with self._lock:
+            return self._hwm.get(hashtag)
+
+    def add_many(self, tweet_ids, hashtag=None):
+        arr = _as_id_array(tweet_ids)
+        arr = arr[arr != 0]
+        if not len(arr):
+            return
+        with self._lock:
+            self._bloom.add_many(arr)
+            self._pending.update(int(v) for v in arr)
+            if hashtag:
+                newest = int(arr.max())
+                if newest > int(self._hwm.get(hashtag) or 0):
+                    self._hwm[hashtag] = str(newest)
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        """
+        Merge pending ids into the sorted file (streamed, never loads it whole)
+        and persist the bloom filter and high-water marks atomically.
+        """
+        with self._lock:
+            if self._pending:
+                new = np.array(sorted(self._pending), dtype=np.uint64)
+                old = self._ids
+                pos = np.searchsorted(old, new) if len(old) else np.zeros(len(new), dtype=np.int64)
+                if len(old):
+                    dup = (pos < len(old)) & (np.asarray(old[np.minimum(pos, len(old) - 1)]) == new)
+                    new, pos = new[~dup], pos[~dup]
+                tmp = self._ids_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    prev = 0
+                    cuts, first = np.unique(pos, return_index=True)
+                    ends = list(first[1:]) + [len(new)]
+                    for cut, a, b in zip(cuts, first, ends):
+                        self._copy_ids(old, prev, int(cut), f)
+                        new[a:b].astype("<u8").tofile(f)
+                        prev = int(cut)
+                    self._copy_ids(old, prev, len(old), f)
+                # drop the mapping before replacing the file (required on Windows)
+                self._ids = old = None
+                os.replace(tmp, self._ids_path)
+                self._ids = self._open_ids()
+                self._pending.clear()
+
+            _atomic_write_bytes(self._bloom_path, self._bloom.bits.tobytes())
+            _atomic_write_bytes(self._meta_path, json.dumps(
+                {"capacity": self._capacity, "k": self._bloom.k, "count": len(self._ids)}).encode("utf-8"))
+            _atomic_write_bytes(self._hwm_path, json.dumps(self._hwm, indent=2).encode("utf-8"))
+
+    @staticmethod
+    def _copy_ids(src, start, stop, f, chunk=1 << 20):
+        for i in range(start, stop, chunk):
+            np.asarray(src[i:min(stop, i + chunk)]).astype("<u8").tofile(f)
+
+def _atomic_write_bytes(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+# =================== PARTITIONED STORE ===================
+@functools.lru_cache(maxsize=None)
+def tweet_schema():
+    return pa.schema([
+        ("tweet_id", pa.string()),
+        ("username", pa.string()),
+        ("handle", pa.string()),
+        ("timestamp", pa.string()),
+        ("content", pa.string()),
+        ("likes", pa.int64()),
+        ("retweets", pa.int64()),
+        ("replies", pa.int64()),
+        ("hashtags", pa.list_(pa.string())),
+        ("mentions", pa.list_(pa.string())),
+        ("query", pa.string()),   # hashtag searched when the tweet was collected
+    ])
+
+def tag_dirname(hashtag):
+    return re.sub(r"[^\w-]", "_", (hashtag or "").lstrip("#").lower()) or "_"
+
+def records_to_table(records, hashtag=None):
+    """
+    List of extractor records -> Arrow table in tweet_schema().
+    """
+    cols = {name: [] for name in tweet_schema().names}
+    for r in records:
+        for name in tweet_schema().names:
+            cols[name].append(r.get(name))
+    if hashtag is not None:
+        cols["query"] = [hashtag] * len(records)
+    for name in ("likes", "retweets", "replies"):
+        cols[name] = [int(v) if v is not None and v == v else 0 for v in cols[name]]
+    for name in ("hashtags", "mentions"):
+        cols[name] = [list(v) if v is not None and not isinstance(v, float) else [] for v in cols[name]]
+    for name in ("tweet_id", "timestamp"):
+        cols[name] = [None if v is None or v != v else str(v) for v in cols[name]]
+    return pa.Table.from_pydict(cols, schema=tweet_schema())
+
+class PartitionedTweetStore:
+    """
+    Append-only Parquet store partitioned by tweet date and search hashtag.
+
+    Every append writes small new part files (temp file + os.replace, so a
+    reader never sees a half-written part); history is never rewritten on
+    the hot path. compact() merges a partition's parts into one file and can
+    run on demand or on a background thread. read()/dataset() prune whole
+    partitions by date range and hashtag before touching any file.
+    `schema` defaults to tweet_schema(); any superset of it works (see scored_schema).
+    """
+    def __init__(self, root=STORE_DIR, schema=None):
+        self.root = root
+        self._schema = schema
+        os.makedirs(root, exist_ok=True)
+        self._compact_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def append(self, records, hashtag):
+        """
+        Write one batch; returns the part files written (one per tweet date).
+        """
+        if records is None or len(records) == 0:
+            return []
+        if isinstance(records, pa.Table):
+            table = records
+        elif isinstance(records, TweetBuffer):
+            table = records.to_arrow(hashtag)
+        else:
+            table = records_to_table(records, hashtag)
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        dates = [ts[:10] if isinstance(ts, str) and re.match(r"\d{4}-\d{2}-\d{2}", ts) else today
+                 for ts in table.column("timestamp").to_pylist()]
+        written = []
+        for date in sorted(set(dates)):
+            mask = pa.array([d == date for d in dates])
+            part = table.filter(mask)
+            directory = os.path.join(self.root, f"date={date}", f"tag={tag_dirname(hashtag)}")
+            os.makedirs(directory, exist_ok=True)
+            name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+            written.append(self._commit(part, os.path.join(directory, name)))
+        return written
+
+    @property
+    def schema(self):
+        return self._schema if self._schema is not None else tweet_schema()
+
+    @staticmethod
+    def _commit(table, path):
+        tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+        return path
+
+    def partitions(self, start=None, end=None, hashtags=None):
+        """
+        [(date, tag, directory)] for partitions overlapping [start, end] (datetimes or dates).
+        """
+        start_d = start.strftime("%Y-%m-%d") if start is not None else None
+        end_d = end.strftime("%Y-%m-%d") if end is not None else None
+        tags = {tag_dirname(h) for h in hashtags} if hashtags else None
+        out = []
+        for date_dir in sorted(glob.glob(os.path.join(self.root, "date=*"))):
+            date = os.path.basename(date_dir)[len("date="):]
+            if (start_d and date < start_d) or (end_d and date > end_d):
+                continue
+            for tag_dir in sorted(glob.glob(os.path.join(date_dir, "tag=*"))):
+                tag = os.path.basename(tag_dir)[len("tag="):]
+                if tags is None or tag in tags:
+                    out.append((date, tag, tag_dir))
+        return out
+
+    def files(self, start=None, end=None, hashtags=None):
+        return [f for _, _, d in self.partitions(start, end, hashtags)
+                for f in sorted(glob.glob(os.path.join(d, "*.parquet")))]
+
+    def dataset(self, start=None, end=None, hashtags=None):
+        return ds.dataset(self.files(start, end, hashtags), schema=self.schema, format="parquet")
+
+    def read(self, start=None, end=None, hashtags=None, columns=None):
+        """
+        DataFrame of stored tweets, scanning only partitions inside the range.
+        """
+        dataset = self.dataset(start, end, hashtags)
+        flt = None
+        if start is not None:
+            flt = ds.field("timestamp") >= _iso_utc(start)
+        if end is not None:
+            cond = ds.field("timestamp") <= _iso_utc(end)
+            flt = cond if flt is None else flt & cond
+        return dataset.to_table(columns=columns, filter=flt).to_pandas()
+
+    def compact(self, min_files=COMPACT_MIN_FILES, start=None, end=None):
+        """
+        Merge partitions holding >= min_files parts into one file each,
+        dropping duplicate tweet ids. Parts appended meanwhile are left alone.
+        """
+        merged = 0
+        with self._compact_lock:
+            for date, tag, directory in self.partitions(start, end):
+                parts = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+                if len(parts) < max(2, min_files):
+                    continue
+                table = pq.read_table(parts, schema=self.schema)
+                table = _drop_duplicate_ids(table)
+                name = f"compacted-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+                self._commit(table, os.path.join(directory, name))
+                for f in parts:
+                    try:
+                        os.remove(f)
+                    except OSError:
+                        pass
+                merged += 1
+        if merged:
+            print(f"[INFO] Compacted {merged} partitions in {self.root}.")
+        return merged
+
+    def start_background_compaction(self, interval=600, min_files=COMPACT_MIN_FILES):
+        if self._compactor is not None:
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact(min_files=min_files)
+                except Exception as e:
+                    print(f"[WARN] Background compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=_loop, name="store-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop_background_compaction(self):
+        if self._compactor is None:
+            return
+        self._stop.set()
+        self._compactor.join()
+        self._compactor = None
+
+def _iso_utc(dt):
+    """
+    Datetime -> the ISO-8601 'Z' form Twitter uses, so string timestamps compare correctly.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def _drop_duplicate_ids(table):
+    ids = table.column("tweet_id").to_pylist()
+    seen = set()
+    keep = []
+    for tid in ids:
+        keep.append(tid is None or tid not in seen)
+        if tid is not None:
+            seen.add(tid)
+    return table.filter(pa.array(keep)) if not all(keep) else table
+
+# The original extractor read the metric buttons positionally as like, retweet,
+# reply, but the page lists them reply, retweet, like: DATA_FILE holds each
+# tweet's reply count under "likes" and its like count under "replies".
+LEGACY_SWAPPED_METRICS = {"likes": "replies", "replies": "likes"}
+
+def import_legacy_data_file(store, path=DATA_FILE):
+    """
+    One-time move of the old single-file DATA_FILE into the partitioned store,
+    column by column (the history is never expanded into Python records),
+    swapping likes/replies back into place. The original file is kept,
+    renamed to <path>.imported.
+    """
+    if not os.path.exists(path):
+        return 0
+    try:
+        prev = pq.read_table(path)
+        columns = []
+        for field in tweet_schema():
+            if field.name == "query":
+                col = pa.array(["legacy"] * prev.num_rows, type=field.type)
+            elif LEGACY_SWAPPED_METRICS.get(field.name) in prev.column_names:
+                col = pc.fill_null(prev.column(LEGACY_SWAPPED_METRICS[field.name]), 0).cast(field.type, safe=False)
+            elif field.name in prev.column_names:
+                col = prev.column(field.name)
+                if field.name in ("likes", "retweets", "replies"):
+                    col = pc.fill_null(col, 0)
+                col = col.cast(field.type, safe=False)
+            else:
+                col = pa.nulls(prev.num_rows, field.type)
+            columns.append(col)
+        table = pa.Table.from_arrays(columns, schema=tweet_schema())
+    except Exception as e:
+        print(f"[WARN] Failed to read legacy data file {path}: {e}")
+        return 0
+    store.append(table, "legacy")
+    os.replace(path, path + ".imported")
+    print(f"[INFO] Imported {table.num_rows} tweets from {path} into {store.root}.")
+    return table.num_rows
+
+# =================== TWEET BUFFER ===================
+class TweetBuffer:
+    """
+    Column-oriented, append-only buffer of extractor records.
+
+    Text fields are kept one list per column and counts in typed arrays.
+    Usernames, handles, the query tag and every hashtag/mention are interned
+    once and stored as int32 codes; the hashtags/mentions lists are one flat
+    code array plus Arrow-style offsets. to_arrow() builds a tweet_schema()
+    table straight from these buffers, copying each once (a table holding
+    views would pin the arrays and make every later append fail);
+    to_pandas() goes through it.
+    It still reads as a sequence of record dicts (len, iteration, indexing)
+    for code that wants one tweet at a time.
+    """
+    TEXT = ("tweet_id", "timestamp", "content")
+    INTERNED = ("username", "handle", "query")
+    COUNTS = ("likes", "retweets", "replies")
+    LISTS = ("hashtags", "mentions")
+
+    def __init__(self, records=None):
+        self._strings = []
+        self._codes_of = {}
+        self._text = {name: [] for name in self.TEXT}
+        self._codes = {name: array.array("i") for name in self.INTERNED}
+        self._counts = {name: array.array("q") for name in self.COUNTS}
+        self._offsets = {name: array.array("i", [0]) for name in self.LISTS}
+        self._values = {name: array.array("i") for name in self.LISTS}
+        if records is not None:
+            self.extend(records)
+
+    def _intern(self, value):
+        if value is None:
+            return -1
+        code = self._codes_of.get(value)
+        if code is None:
+            code = self._codes_of[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def __len__(self):
+        return len(self._text["content"])
+
+    def append(self, record):
+        for name in self.TEXT:
+            v = record.get(name)
+            self._text[name].append(None if v is None or v != v else str(v))
+        for name in self.INTERNED:
+            self._codes[name].append(self._intern(record.get(name)))
+        for name in self.COUNTS:
+            v = record.get(name)
+            self._counts[name].append(int(v) if v is not None and v == v else 0)
+        for name in self.LISTS:
+            values = record.get(name)
+            if values is not None and not isinstance(values, float):
+                self._values[name].extend(self._intern(v) for v in values)
+            self._offsets[name].append(len(self._values[name]))
+
+    def extend(self, records):
+        if not isinstance(records, TweetBuffer):
+            for r in records:
+                self.append(r)
+            return
+        # re-code the other buffer's strings into this one's pool, column by column
+        remap = np.array([self._intern(s) for s in records._strings] + [-1], dtype=np.int32)
+        for name in self.TEXT:
+            self._text[name].extend(records._text[name])
+        for name in self.INTERNED:
+            self._codes[name].frombytes(remap[_int32s(records._codes[name])].tobytes())
+        for name in self.COUNTS:
+            self._counts[name].extend(records._counts[name])
+        for name in self.LISTS:
+            base = len(self._values[name])
+            self._values[name].frombytes(remap[_int32s(records._values[name])].tobytes())
+            self._offsets[name].frombytes((_int32s(records._offsets[name])[1:] + base).astype(np.int32).tobytes())
+
+    def column(self, name):
+        """One column as a list (text and interned fields) or int64 array (counts)."""
+        if name in self._text:
+            return list(self._text[name])
+        if name in self._counts:
+            return np.frombuffer(self._counts[name], dtype=np.int64).copy()
+        return [self._strings[c] if c >= 0 else None for c in self._codes[name]]
+
+    def record(self, i):
+        rec = {name: self._text[name][i] for name in self.TEXT}
+        for name in self.INTERNED:
+            code = self._codes[name][i]
+            rec[name] = self._strings[code] if code >= 0 else None
+        for name in self.COUNTS:
+            rec[name] = self._counts[name][i]
+        for name in self.LISTS:
+            lo, hi = self._offsets[name][i], self._offsets[name][i + 1]
+            rec[name] = [self._strings[c] for c in self._values[name][lo:hi]]
+        return rec
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.take(range(*key.indices(len(self))))
+        return self.record(range(len(self))[key])
+
+    def __iter__(self):
+        return (self.record(i) for i in range(len(self)))
+
+    def take(self, indices):
+        """New buffer with the rows at `indices` (sharing nothing with this one)."""
+        idx = np.asarray(indices, dtype=np.int64)
+        out = TweetBuffer()
+        out._strings = list(self._strings)
+        out._codes_of = dict(self._codes_of)
+        for name in self.TEXT:
+            column = self._text[name]
+            out._text[name] = [column[i] for i in idx]
+        for name in self.INTERNED:
+            out._codes[name].frombytes(_int32s(self._codes[name])[idx].tobytes())
+        for name in self.COUNTS:
+            out._counts[name].frombytes(np.frombuffer(self._counts[name], dtype=np.int64)[idx].tobytes())
+        for name in self.LISTS:
+            offsets = _int32s(self._offsets[name])
+            starts, lengths = offsets[idx], offsets[idx + 1] - offsets[idx]
+            new_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+            positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+            out._offsets[name] = array.array("i", new_offsets.tobytes())
+            out._values[name].frombytes(_int32s(self._values[name])[positions].tobytes())
+        return out
+
+    def unique(self):
+        """Rows with a new status id (or, without one, new leading content), in order."""
+        keep, seen = [], set()
+        for i, (tid, content) in enumerate(zip(self._text["tweet_id"], self._text["content"])):
+            key = tid or (content or "")[:160]
+            if key not in seen:
+                seen.add(key)
+                keep.append(i)
+        return self if len(keep) == len(self) else self.take(keep)
+
+    def to_arrow(self, hashtag=None):
+        """Table in tweet_schema(); `hashtag` overrides the query column like records_to_table."""
+        schema = tweet_schema()
+        strings = pa.array(self._strings, type=pa.string())
+
+        def decode(codes):
+            idx = _int32s(codes).copy()
+            return strings.take(pa.array(idx, mask=idx < 0))
+
+        columns = {}
+        for name in self.TEXT:
+            columns[name] = pa.array(self._text[name], type=pa.string())
+        for name in self.INTERNED:
+            columns[name] = decode(self._codes[name])
+        if hashtag is not None:
+            columns["query"] = pa.array([hashtag] * len(self), type=pa.string())
+        for name in self.COUNTS:
+            columns[name] = pa.array(np.frombuffer(self._counts[name], dtype=np.int64).copy(), type=pa.int64())
+        for name in self.LISTS:
+            columns[name] = pa.ListArray.from_arrays(pa.array(_int32s(self._offsets[name]).copy(), type=pa.int32()),
+                                                     decode(self._values[name]))
+        return pa.Table.from_arrays([columns[f.name] for f in schema], schema=schema)
+
+    def to_pandas(self, hashtag=None):
+        return self.to_arrow(hashtag).to_pandas()
+
+def _int32s(buf):
+    return np.frombuffer(buf, dtype=np.int32) if len(buf) else np.zeros(0, dtype=np.int32)
+
+# =================== THROTTLING ===================
+class TwitterErrorPage(RuntimeError):
+    """
+    The timeline kept showing "Something went wrong" (or the timeline API
+    answered with an error). Carries the tweets collected before it appeared.
+    """
+    def __init__(self, hashtag, tweets=(), message="Something went wrong"):
+        super().__init__(f"{message} ({hashtag})")
+        self.hashtag = hashtag
+        self.tweets = TweetBuffer(tweets)
+
+class TokenBucket:
+    """
+    `rate` tokens per second up to `capacity`; one search costs one token.
+    """
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            return self.updated
+        if self.rate <= 0:
+            return math.inf
+        return self.updated + (tokens - self.tokens) / self.rate
+
+    def try_take(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS, rng=random):
+    """
+    Exponential backoff with equal jitter: half of min(cap, base * 2**attempt)
+    is fixed, the other half random, so retries never line up.
+    """
+    ceiling = min(cap, base * (2 ** attempt))
+    return ceiling / 2 + rng.uniform(0, ceiling / 2)
+
+class CircuitBreaker:
+    """
+    closed --(threshold consecutive failures)--> open for backoff_delay(n)
+    --> half-open once the cool-down passes: the next call is a trial; success
+    closes the breaker, failure re-opens it for twice as long.
+    """
+    def __init__(self, threshold, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS, clock=time.monotonic,
+                 rng=random):
+        self.threshold = max(1, threshold)
+        self.base = base
+        self.cap = cap
+        self.clock = clock
+        self.rng = rng
+        self.failures = 0
+        self.opens = 0
+        self.open_until = None
+
+    @property
+    def state(self):
+        if self.open_until is None:
+            return "closed"
+        return "open" if self.clock() < self.open_until else "half-open"
+
+    def ready_at(self):
+        return self.open_until if self.state == "open" else self.clock()
+
+    def record_success(self):
+        self.failures = 0
+        self.opens = 0
+        self.open_until = None
+
+    def record_failure(self):
+        """Returns the cool-down started by this failure (0 if the breaker stays closed)."""
+        self.failures += 1
+        if self.open_until is None and self.failures < self.threshold:
+            return 0.0
+        delay = backoff_delay(self.opens, self.base, self.cap, self.rng)
+        self.open_until = self.clock() + delay
+        self.opens += 1
+        self.failures = 0
+        return delay
+
+class Throttle:
+    """
+    Scheduler-level rate limiting shared by every collection loop.
+
+    Each session has a token bucket, a pacing deadline and a circuit breaker
+    (tripped by error pages); each hashtag has its own breaker. ready_at()
+    says when a (hashtag, session) pair may start and what holds it back, so
+    the caller can work on something else meanwhile. Time actually spent
+    waiting goes through wait() and is reported per reason.
+    """
+    def __init__(self, searches_per_minute=SESSION_SEARCHES_PER_MINUTE, burst=SESSION_BURST,
+                 tag_failures=TAG_BREAKER_FAILURES, session_failures=SESSION_BREAKER_FAILURES,
+                 base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS, clock=time.monotonic, rng=None):
+        self.rate = searches_per_minute / 60.0
+        self.burst = burst
+        self.tag_failures = tag_failures
+        self.session_failures = session_failures
+        self.base = base
+        self.cap = cap
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._lock = threading.RLock()
+        self._buckets = {}
+        self._paced = {}
+        self._session_breakers = {}
+        self._tag_breakers = {}
+        self.waited = {}   # reason -> seconds spent waiting
+
+    def _bucket(self, session):
+        if session not in self._buckets:
+            self._buckets[session] = TokenBucket(self.rate, self.burst, clock=self.clock)
+        return self._buckets[session]
+
+    def _breaker(self, table, key, threshold):
+        if key not in table:
+            table[key] = CircuitBreaker(threshold, self.base, self.cap, clock=self.clock, rng=self.rng)
+        return table[key]
+
+    def ready_at(self, hashtag, session="main"):
+        """(time the pair may start, reason it has to wait or None)."""
+        with self._lock:
+            holds = [(self.clock(), None),
+                     (self._paced.get(session, -math.inf), "pacing"),
+                     (self._bucket(session).ready_at(), "rate_limit"),
+                     (self._breaker(self._session_breakers, session, self.session_failures).ready_at(),
+                      "session_backoff"),
+                     (self._breaker(self._tag_breakers, hashtag, self.tag_failures).ready_at(), "tag_backoff")]
+            return max(holds, key=lambda h: h[0])
+
+    def acquire(self, hashtag, session="main"):
+        with self._lock:
+            self._bucket(session).try_take()
+
+    def pace(self, session, seconds):
+        with self._lock:
+            self._paced[session] = self.clock() + seconds
+
+    def success(self, hashtag, session="main"):
+        with self._lock:
+            self._breaker(self._tag_breakers, hashtag, self.tag_failures).record_success()
+            self._breaker(self._session_breakers, session, self.session_failures).record_success()
+
+    def failure(self, hashtag, session="main", session_wide=False):
+        """
+        Count a failed attempt against the hashtag (and the session too for
+        error pages, which are usually the account being throttled).
+        """
+        with self._lock:
+            delay = self._breaker(self._tag_breakers, hashtag, self.tag_failures).record_failure()
+            if delay:
+                print(f"[WARN] {hashtag} cooling down for {int(delay)}s.")
+            if session_wide:
+                delay = self._breaker(self._session_breakers, session, self.session_failures).record_failure()
+                if delay:
+                    print(f"[WARN] Session {session} cooling down for {int(delay)}s.")
+
+    def wait(self, seconds, reason=None, sleep=time.sleep):
+        if seconds <= 0:
+            return
+        self.record_wait(seconds, reason)
+        sleep(seconds)
+
+    def record_wait(self, seconds, reason):
+        """Account `seconds` spent held back by `reason` (waited out elsewhere)."""
+        if reason and seconds > 0:
+            with self._lock:
+                self.waited[reason] = self.waited.get(reason, 0.0) + seconds
+            METRICS.inc("throttled_seconds", seconds, reason=reason)
+
+    def report(self):
+        with self._lock:
+            throttled = sum(v for k, v in self.waited.items() if k != "pacing")
+            return {"throttled_seconds": throttled, "waited": dict(self.waited),
+                    "open_tags": sorted(t for t, b in self._tag_breakers.items() if b.state == "open"),
+                    "open_sessions": sorted(s for s, b in self._session_breakers.items() if b.state == "open")}
+
+    def print_summary(self):
+        rep = self.report()
+        detail = ", ".join(f"{k} {v:.0f}s" for k, v in sorted(rep["waited"].items()))
+        print(f"[INFO] Time lost to throttling: {rep['throttled_seconds']:.0f}s" + (f" ({detail})" if detail else ""))
+
+class TagQueue:
+    """
+    Hashtags still to collect in this run, shared by every session. A session
+    claims whichever tag the Throttle lets it start soonest, so a cooling tag
+    or session never holds up the rest; failed tags go back in the queue
+    until they have had max_attempts tries. Idle sessions block on a
+    condition that is notified whenever a tag settles or is handed back.
+    """
+    def __init__(self, hashtags, throttle, max_attempts=TAG_MAX_ATTEMPTS):
+        self.throttle = throttle
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._pending = list(dict.fromkeys(hashtags))
+        self._in_flight = set()
+        self.attempts = {}
+        self.completed = []
+        self.given_up = []
+
+    def _claim(self, session, sleep=None):
+        """
+        (tag, None) once a tag may start, (None, None) when the queue is
+        drained, or with an injected `sleep` (None, (seconds, reason)) for
+        the caller to sleep through a throttle hold.
+        """
+        with self._changed:
+            while True:
+                if not self._pending:
+                    if not self._in_flight:
+                        return None, None
+                    # other sessions may still hand a failed tag back
+                    self._changed.wait()
+                    continue
+                when, reason, tag = min(((*self.throttle.ready_at(t, session), t) for t in self._pending),
+                                        key=lambda c: c[0])
+                wait = when - self.throttle.clock()
+                if wait <= 0:
+                    break
+                if sleep is not None:
+                    return None, (wait, reason)
+                # until the hold lifts, or sooner if a tag comes back
+                t0 = self.throttle.clock()
+                self._changed.wait(wait)
+                self.throttle.record_wait(self.throttle.clock() - t0, reason)
+            self._pending.remove(tag)
+            self._in_flight.add(tag)
+            self.attempts[tag] = self.attempts.get(tag, 0) + 1
+            self.throttle.acquire(tag, session)
+            return tag, None
+
+    def _settle(self, tag, ok):
+        with self._changed:
+            self._in_flight.discard(tag)
+            self._changed.notify_all()
+            if ok:
+                self.completed.append(tag)
+                return True
+            if self.attempts[tag] >= self.max_attempts:
+                self.given_up.append(tag)
+                return False
+            self._pending.append(tag)
+            return True
+
+    def run(self, session, work, on_give_up=None, sleep=None):
+        """
+        Call work(tag) for claimed tags until the queue is drained.
+        work raises TwitterErrorPage (cools the tag and the session) or any
+        other exception (cools the tag) to hand the tag back. Throttle holds
+        are waited out on the queue's condition, or with `sleep` if given
+        (e.g. a FakeClock's).
+        """
+        while True:
+            tag, hold = self._claim(session, sleep)
+            if tag is None:
+                if hold is None:
+                    return
+                self.throttle.wait(*hold, sleep)
+                continue
+            try:
+                work(tag)
+            except TwitterErrorPage as e:
+                print(f"[WARN] {e}; moving on to other tags.")
+                self.throttle.failure(tag, session, session_wide=True)
+                ok = False
+            except Exception as e:
+                print(f"[ERROR] Error on {tag}: {e}", file=sys.stderr)
+                self.throttle.failure(tag, session)
+                ok = False
+            else:
+                self.throttle.success(tag, session)
+                ok = True
+            if not self._settle(tag, ok):
+                print(f"[ERROR] Giving up on {tag} after {self.attempts[tag]} attempts.", file=sys.stderr)
+                if on_give_up is not None:
+                    on_give_up(tag)
+
+# =================== SCROLL & COLLECT ===================
+def _at_or_below(tweet_id, high_water):
+    try:
+        return bool(high_water) and int(tweet_id) <= int(high_water)
+    except (TypeError, ValueError):
+        return False
+
+def _batch_emitter(hashtag, tweets_data, on_batch):
+    """
+    Returns a callable that hands the tweets appended since its last call to
+    on_batch(hashtag, TweetBuffer); a no-op without on_batch.
+    """
+    emitted = 0
+
+    def _emit():
+        nonlocal emitted
+        if on_batch is not None and len(tweets_data) > emitted:
+            batch = tweets_data[emitted:]
+            emitted = len(tweets_data)
+            on_batch(hashtag, batch)
+    return _emit
+
+def scroll_and_collect(driver, hashtag, max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG,
+                       index=None, on_batch=None):
+    """
+    Scrape the Latest timeline of `hashtag`. With a TweetIdIndex, tweets we
+    already stored are rejected by id before extraction and scrolling stops
+    once the timeline reaches the hashtag's high-water mark. `on_batch` gets
+    the new tweets of every scroll pass as soon as they are extracted.
+    Returns a TweetBuffer.
+    """
+    tweets_data = TweetBuffer()
+    emit = _batch_emitter(hashtag, tweets_data, on_batch)
+    seen = set()
+    retry_page_error = 0
+    use_bulk = BULK_EXTRACTION
+    high_water = index.high_water_mark(hashtag) if index is not None else None
+    known_seen = 0
+
+    try:
+        with METRICS.phase("search"):
+            search_hashtag(driver, hashtag)
+    except Exception as e:
+        print(f"[ERROR] Searching {hashtag} failed: {e}")
+        return tweets_data
+
+    scroll_retries = 0
+    final_retry = False
+    while len(tweets_data) < max_tweets:
+        with METRICS.phase("error_check"):
+            has_error = page_has_error(driver)
+        if has_error:
+            retry_page_error += 1
+            if retry_page_error > ERROR_PAGE_REFRESHES:
+                # let the scheduler cool this tag down and move on instead of sleeping here
+                raise TwitterErrorPage(hashtag, tweets_data)
+            print(f"[WARN] Twitter error page for {hashtag}. Refreshing.")
+            driver.refresh()
+            wait_for_timeline(driver, min_count=0, legacy=(2.5, 4))
+            continue
+        retry_page_error = 0
+
+        new_found = False
+        with METRICS.phase("extract"):
+            records = None
+            if use_bulk:
+                # read articles are flagged in-page, so no need to ship the growing `seen` set
+                records, known_ids = scan_visible_tweets(driver, index=index, high_water=high_water)
+                seen.update(known_ids)
+                known_seen += len(known_ids)
+                if records is None:
+                    print("[WARN] Falling back to per-element extraction.")
+                    use_bulk = False
+
+            if records is not None:
+                for extracted in records:
+                    sig = extracted["tweet_id"] or extracted["content"][:160]
+                    if not sig or sig in seen or not extracted["content"].strip():
+                        continue
+                    seen.add(sig)
+                    tweets_data.append(extracted)
+                    new_found = True
+                    if len(tweets_data) >= max_tweets:
+                        break
+            else:
+                articles = driver.find_elements(By.CSS_SELECTOR, UNPROCESSED_ARTICLES)
+                for art in articles:
+                    try:
+                        tweet_id, handle = article_tweet_id(art)
+                        if tweet_id:
+                            sig = tweet_id
+                            if sig in seen:
+                                continue
+                            if index is not None and (_at_or_below(tweet_id, high_water) or tweet_id in index):
+                                seen.add(sig)
+                                known_seen += 1
+                                continue
+                        else:
+                            sig = (art.text or "")[:160]
+                            if not sig or sig in seen:
+                                continue
+                        extracted = extract_tweet_from_article(art, tweet_id, handle)
+                        if not extracted or not extracted["content"].strip():
+                            continue
+                        seen.add(sig)
+                        tweets_data.append(extracted)
+                        new_found = True
+                        if len(tweets_data) >= max_tweets:
+                            break
+                    except Exception:
+                        continue
+                mark_processed(driver, articles)
+        emit()
+
+        if len(tweets_data) >= max_tweets:
+            break
+
+        if known_seen >= HWM_STOP_AFTER:
+            print(f"[INFO] Reached already-collected tweets for {hashtag}; stopping.")
+            break
+
+        if not new_found:
+            scroll_retries += 1
+            if scroll_retries > SCROLL_RETRY_LIMIT:
+                if len(tweets_data) >= min_tweets:
+                    print(f"[INFO] Min {min_tweets} tweets reached for {hashtag}.")
+                    break
+                if final_retry:
+                    break
+                print(f"[WARN] Could not load enough tweets for {hashtag}. Final retry sequence...")
+                final_retry = True
+                loaded = False
+                with METRICS.phase("scroll"):
+                    for strategy in SCROLL_STRATEGIES:
+                        try:
+                            strategy(driver)
+                        except Exception:
+                            pass
+                        # returns as soon as more of the timeline renders
+                        state = wait_for_timeline(driver, legacy=(1.5, 3.2))
+                        if state and state.get("added"):
+                            loaded = True
+                            break
+                if not loaded:
+                    break
+                scroll_retries = 0
+                continue
+            strategy = SCROLL_STRATEGIES[scroll_retries % len(SCROLL_STRATEGIES)]
+            with METRICS.phase("scroll"):
+                try:
+                    strategy(driver)
+                except Exception:
+                    pass
+                wait_for_timeline(driver, legacy=(2, 4))
+        else:
+            scroll_retries = 0
+            with METRICS.phase("scroll"):
+                if EVENT_DRIVEN_WAITS:
+                    # keep the timeline moving; the wait returns once the next items render
+                    scroll_into_last_article(driver)
+                wait_for_timeline(driver, legacy=(1.2, 3))
+
+    footprint = browser_footprint(driver) if LEAN_BROWSER else {}
+    if footprint:
+        print(f"[INFO] Browser after {hashtag}: {footprint['js_heap_mb']} MB JS heap, {footprint['dom_nodes']} DOM nodes.")
+    print(f"[INFO] For {hashtag}: collected {len(tweets_data)} tweets.")
+    return tweets_data
+
+# =================== NETWORK CAPTURE ===================
+def _twitter_time_to_iso(created_at):
+    """
+    "Wed Oct 10 20:19:24 +0000 2018" -> "2018-10-10T20:19:24.000Z"
+    """
+    try:
+        dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+        return _iso_utc(dt)
+    except (TypeError, ValueError):
+        return None
+
+def _tweet_result_to_record(result):
+    if not isinstance(result, dict):
+        return None
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet") or {}
+    legacy = result.get("legacy") or {}
+    tweet_id = result.get("rest_id") or legacy.get("id_str")
+    if not tweet_id:
+        return None
+    user = ((result.get("core") or {}).get("user_results") or {}).get("result") or {}
+    user_core = user.get("core") or {}
+    user_legacy = user.get("legacy") or {}
+    note = (((result.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {})
+    return make_record(
+        str(tweet_id),
+        user_core.get("name") or user_legacy.get("name"),
+        user_core.get("screen_name") or user_legacy.get("screen_name"),
+        _twitter_time_to_iso(legacy.get("created_at")),
+        note.get("text") or legacy.get("full_text") or legacy.get("text"),
+        legacy.get("favorite_count"),
+        legacy.get("retweet_count"),
+        legacy.get("reply_count"),
+    )
+
+def _find_instructions(node):
+    if isinstance(node, dict):
+        if isinstance(node.get("instructions"), list):
+            return node["instructions"]
+        for v in node.values():
+            found = _find_instructions(v)
+            if found is not None:
+                return found
+    return None
+
+def parse_timeline_payload(payload):
+    """
+    Decode one timeline API response (GraphQL SearchTimeline/HomeTimeline or
+    the legacy adaptive.json) into extractor records.
+    Returns (records, bottom_cursor).
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    records, cursor = [], None
+
+    if isinstance(payload, dict) and "globalObjects" in payload:
+        users = payload["globalObjects"].get("users") or {}
+        for tid, t in (payload["globalObjects"].get("tweets") or {}).items():
+            u = users.get(str(t.get("user_id_str"))) or {}
+            records.append(make_record(str(t.get("id_str") or tid), u.get("name"), u.get("screen_name"),
+                                       _twitter_time_to_iso(t.get("created_at")), t.get("full_text") or t.get("text"),
+                                       t.get("favorite_count"), t.get("retweet_count"), t.get("reply_count")))
+        records.sort(key=lambda r: int(r["tweet_id"]), reverse=True)
+
+    for ins in _find_instructions(payload) or []:
+        entries = ins.get("entries") or ([ins["entry"]] if ins.get("entry") else [])
+        for entry in entries:
+            content = entry.get("content") or {}
+            if content.get("cursorType") == "Bottom":
+                cursor = content.get("value")
+                continue
+            items = [content.get("itemContent")] + [(i.get("item") or {}).get("itemContent") for i in content.get("items") or []]
+            for item in items:
+                if not item:
+                    continue
+                rec = _tweet_result_to_record((item.get("tweet_results") or {}).get("result"))
+                if rec:
+                    records.append(rec)
+    return records, cursor
+
+class NetworkCapture:
+    """
+    Reads timeline API responses the page already fetched, from the Chrome
+    performance log (init_driver(capture_network=True)).
+    Response bodies that are not finished yet are retried on the next drain().
+    """
+    def __init__(self, driver, markers=TIMELINE_URL_MARKERS, record_path=None):
+        self.driver = driver
+        self.markers = markers
+        self.record_path = record_path
+        self._pending = {}
+
+    def drain(self):
+        """
+        Raw JSON payloads of every timeline response seen since the last call.
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            print(f"[WARN] Performance log unavailable: {e}")
+            entries = []
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            if msg.get("method") != "Network.responseReceived":
+                continue
+            params = msg.get("params") or {}
+            url = (params.get("response") or {}).get("url", "")
+            if any(m in url for m in self.markers):
+                self._pending[params.get("requestId")] = url
+
+        payloads = []
+        for request_id in list(self._pending):
+            try:
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception:
+                continue  # still loading; next drain
+            self._pending.pop(request_id, None)
+            text = body.get("body") or ""
+            if body.get("base64Encoded"):
+                import base64
+                text = base64.b64decode(text).decode("utf-8", "replace")
+            try:
+                payload = json.loads(text)
+            except ValueError:
+                continue
+            payloads.append(payload)
+            if self.record_path:
+                with open(self.record_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload) + "\n")
+        return payloads
+
+def take_timeline_records(records, tweets_data, seen, index=None, high_water=None, max_tweets=MAX_TWEETS_PER_HASHTAG):
+    """
+    Append the decoded records that are new (not in `seen`, not in the
+    index, above the high-water mark, not empty) to tweets_data, up to
+    max_tweets. Returns (any_new, number_already_collected).
+    """
+    ids = [r["tweet_id"] for r in records]
+    in_index = index.contains_many(ids) if index is not None else [False] * len(ids)
+    new_found, known_seen = False, 0
+    for rec, known in zip(records, in_index):
+        if rec["tweet_id"] in seen:
+            continue
+        seen.add(rec["tweet_id"])
+        if known or _at_or_below(rec["tweet_id"], high_water):
+            known_seen += 1
+            continue
+        if not rec["content"].strip():
+            continue
+        tweets_data.append(rec)
+        new_found = True
+        if len(tweets_data) >= max_tweets:
+            break
+    return new_found, known_seen
+
+def scroll_and_collect_network(driver, hashtag, max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG,
+                               index=None, record_path=None, on_batch=None):
+    """
+    Same contract as scroll_and_collect, but each scroll yields complete
+    tweet batches decoded from the SearchTimeline responses instead of DOM queries.
+    """
+    tweets_data = TweetBuffer()
+    emit = _batch_emitter(hashtag, tweets_data, on_batch)
+    seen = set()
+    high_water = index.high_water_mark(hashtag) if index is not None else None
+    known_seen = 0
+    capture = NetworkCapture(driver, record_path=record_path)
+    capture.drain()  # discard responses from earlier pages
+
+    try:
+        with METRICS.phase("search"):
+            search_hashtag(driver, hashtag)
+    except Exception as e:
+        print(f"[ERROR] Searching {hashtag} failed: {e}")
+        return tweets_data
+
+    scroll_retries = 0
+    while len(tweets_data) < max_tweets:
+        new_found = False
+        with METRICS.phase("extract"):
+            payloads = capture.drain()
+        for payload in payloads:
+            if isinstance(payload, dict) and payload.get("errors") and not payload.get("data"):
+                emit()
+                raise TwitterErrorPage(hashtag, tweets_data,
+                                       f"Timeline API error: {payload['errors'][0].get('message', '')}")
+            records, _ = parse_timeline_payload(payload)
+            found, known = take_timeline_records(records, tweets_data, seen, index, high_water, max_tweets)
+            new_found = new_found or found
+            known_seen += known
+            if len(tweets_data) >= max_tweets:
+                break
+        emit()
+
+        if len(tweets_data) >= max_tweets:
+            break
+        if known_seen >= HWM_STOP_AFTER:
+            print(f"[INFO] Reached already-collected tweets for {hashtag}; stopping.")
+            break
+
+        if not new_found:
+            scroll_retries += 1
+            if scroll_retries > SCROLL_RETRY_LIMIT:
+                if len(tweets_data) < min_tweets:
+                    print(f"[WARN] Could not load enough tweets for {hashtag} from timeline responses.")
+                break
         else:
             scroll_retries = 0
-            time.sleep(random.uniform(1.2, 3))
+        strategy = SCROLL_STRATEGIES[scroll_retries % len(SCROLL_STRATEGIES)]
+        with METRICS.phase("scroll"):
+            try:
+                strategy(driver)
+            except Exception:
+                pass
+            wait_for_timeline(driver, legacy=(1.2, 3))
+
+    print(f"[INFO] For {hashtag}: collected {len(tweets_data)} tweets (network).")
+    return tweets_data[:max_tweets]
+
+def collect_tag(driver, hashtag, **kwargs):
+    """
+    Scrape one hashtag with a CollectorBackend, or with a WebDriver in the
+    configured COLLECT_MODE, recording its throughput and WebDriver round
+    trips in METRICS.
+    """
+    backend = driver if isinstance(driver, CollectorBackend) else SeleniumCollector(driver, login=None)
+    commands_before = METRICS.thread_commands()
+    t0 = time.perf_counter()
+    with METRICS.phase("collect"):
+        tweets = backend.collect(hashtag, **kwargs)
+    METRICS.record_hashtag(hashtag, len(tweets), time.perf_counter() - t0,
+                           METRICS.thread_commands() - commands_before)
+    return tweets
+
+def replay_timeline_fixture(path=NETWORK_FIXTURE):
+    """
+    Offline replay: records decoded from a file of recorded responses (one JSON payload per line).
+    """
+    records, seen = [], set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for rec in parse_timeline_payload(line)[0]:
+                if rec["tweet_id"] not in seen:
+                    seen.add(rec["tweet_id"])
+                    records.append(rec)
+    return records
+
+# =================== MAIN COLLECTOR ===================
+def login_driver(driver):
+    """
+    Inject cookies into a fresh session, verify the login and save the
+    browser's cookies (as rotated by the server) to COOKIES_FILE_PKL.
+    Quits the driver and raises SystemExit if no usable cookies are found.
+    A warm CHROME_PROFILE_DIR that is still logged in skips the injection.
+    """
+    with METRICS.phase("login"):
+        _login_driver(driver)
+
+def _login_driver(driver):
+    # a profile init_driver just created cannot be logged in yet: skip the /home round trip
+    if CHROME_PROFILE_DIR and not getattr(driver, "profile_is_new", False):
+        with startup_phase("session check"):
+            valid = session_is_valid(driver)
+        if valid:
+            print("[INFO] Browser profile is still logged in; skipping cookie injection.")
+            save_session_cookies(driver)
+            return
+
+    with startup_phase("cookie injection"):
+        _inject_saved_cookies(driver)
+
+    # After injecting cookies, verify that we're logged in by checking the search input presence
+    with startup_phase("login verify"):
+        try:
+            driver.get(f"{TWITTER_BASE_URL}/home")
+            human_pause((3, 3))
+            # if logged in, search box should be present
+            WebDriverWait(driver, 8).until(EC.presence_of_element_located((By.XPATH, '//input[@aria-label="Search query"]')))
+            print("[INFO] Login appears successful (search box found). Proceeding.")
+        except Exception:
+            print("[WARN] Could not verify login. Twitter may have rejected cookies or cookies expired.")
+            driver.quit()
+            raise SystemExit("Login verification failed. Update cookies and retry.")
+    save_session_cookies(driver)
+
+def _inject_saved_cookies(driver):
+    # 1) Try the cookies saved by the last successful login
+    if try_load_pickle(driver, COOKIES_FILE_PKL):
+        return
+    # 2) If user provided a JSON string in script, use it
+    if COOKIES_JSON:
+        print("[INFO] Using COOKIES_JSON provided in script to inject cookies.")
+        if load_cookies_from_json_string(driver, COOKIES_JSON):
+            return
+        print("[WARN] Provided COOKIES_JSON failed to inject. Trying JSON file next.")
+    # 3) If there's a JSON file in working dir, use it
+    if os.path.exists(COOKIES_JSON_FILE):
+        print(f"[INFO] Loading cookie JSON from {COOKIES_JSON_FILE}.")
+        load_cookies_from_file(driver, COOKIES_JSON_FILE)
+    else:
+        print("[WARN] No cookie pickle or json provided. Please place exported cookie JSON at"
+              f" {COOKIES_JSON_FILE} or set COOKIES_JSON variable, then re-run.")
+        driver.quit()
+        raise SystemExit("No cookies provided; aborting to prevent login attempts.")
+
+def save_batch(store, tweets, tag):
+    try:
+        with METRICS.phase("save"):
+            written = store.append(tweets, tag)
+        print(f"[INFO] Saved {len(tweets)} tweets for {tag} to {store.root} ({len(written)} part files).")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed saving data for {tag}: {e}")
+        return False
+
+def collect_tag_resumable(driver, hashtag, partial, **kwargs):
+    """
+    collect_tag, but tweets gathered before an error page are parked in
+    `partial` and merged into the hashtag's next attempt instead of being lost.
+    """
+    try:
+        tweets = collect_tag(driver, hashtag, **kwargs)
+    except TwitterErrorPage as e:
+        partial.setdefault(hashtag, TweetBuffer()).extend(e.tweets)
+        raise
+    held = partial.pop(hashtag, None)
+    if held is None:
+        return tweets
+    held.extend(tweets)
+    return held.unique()
+
+def collect_all_hashtags(concurrent=CONCURRENT_COLLECTION, throttle=None, sleep=None, pipeline=None):
+    """
+    Scrape every hashtag and save it. With a StreamingPipeline, each scroll
+    batch is submitted to it instead and the pipeline saves, cleans and
+    scores it while the next batch is scraped.
+    """
+    if concurrent:
+        return collect_hashtags_pooled(throttle=throttle, sleep=sleep, pipeline=pipeline)
+
+    driver = open_collector()
+    report_startup()
+    store = pipeline.store if pipeline is not None else PartitionedTweetStore()
+    import_legacy_data_file(store)
+    all_tweets = TweetBuffer()
+    if pipeline is not None:
+        index = pipeline.index
+    else:
+        index = TweetIdIndex() if USE_TWEET_INDEX else None
+    on_batch = pipeline.submit if pipeline is not None else None
+    throttle = throttle or Throttle()
+    partial = {}
+
+    def _keep(tag, tweets):
+        all_tweets.extend(tweets)
+        if pipeline is None and save_batch(store, tweets, tag) and index is not None:
+            index.add_many(tweets.column("tweet_id"), hashtag=tag)
+
+    def _work(tag):
+        print(f"[ACTION] Scraping tag: {tag}")
+        _keep(tag, collect_tag_resumable(driver, tag, partial, index=index, on_batch=on_batch))
+        throttle.pace("main", random.uniform(*WORKER_PACING_SECONDS))
+
+    TagQueue(HASHTAGS, throttle).run("main", _work, sleep=sleep,
+                                     on_give_up=lambda tag: _keep(tag, partial.pop(tag, TweetBuffer()).unique()))
+
+    driver.quit()
+    if pipeline is None:
+        # with a pipeline, close() flushes and compacts once its queues have drained
+        if index is not None:
+            index.flush()
+        store.compact()
+    throttle.print_summary()
+    return all_tweets
+
+# =================== SESSION POOL ===================
+class TweetSink:
+    """
+    Thread-safe TweetBuffer that pool workers push their tweets into.
+    """
+    def __init__(self, initial=None):
+        self._lock = threading.Lock()
+        self._tweets = TweetBuffer(initial)
+
+    def extend(self, tweets):
+        with self._lock:
+            self._tweets.extend(tweets)
+            return len(self._tweets)
+
+    def snapshot(self):
+        with self._lock:
+            return TweetBuffer(self._tweets)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tweets)
+
+class DriverPool:
+    """
+    Bounded pool of WebDriver sessions. Sessions are created (and logged in)
+    lazily, so a pool of 4 serving 2 tags only ever opens 2 browsers. A
+    session released as broken is quit and replaced on the next acquire().
+    """
+    def __init__(self, size=POOL_SIZE, driver_factory=init_driver, login=login_driver):
+        self.size = max(1, int(size))
+        self.driver_factory = driver_factory
+        self.login = login
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._drivers = []
+
+    def acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                # reserve the slot before the (slow) browser launch
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue  # re-check: a slot may have been freed by a failed launch
+        driver = None
+        try:
+            driver = self.driver_factory()
+            if self.login:
+                self.login(driver)
+        except BaseException:
+            with self._lock:
+                self._opened -= 1
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def release(self, driver, broken=False):
+        if not broken:
+            self._idle.put(driver)
+            return
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._opened -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+def pool_driver_factory():
+    """
+    init_driver for pool sessions: Chrome locks a user-data-dir to one process,
+    so each session gets its own warm profile (chrome_profile-1, -2, ...).
+    """
+    slots = iter(range(1, 1_000_000))
+    lock = threading.Lock()
+
+    def _factory():
+        with lock:
+            slot = next(slots)
+        return init_driver(profile_dir=f"{CHROME_PROFILE_DIR}-{slot}" if CHROME_PROFILE_DIR else None)
+    return _factory
+
+def collect_hashtags_pooled(hashtags=None, pool_size=POOL_SIZE, pacing=WORKER_PACING_SECONDS,
+                            driver_factory=None, login=login_driver, sink=None,
+                            max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG,
+                            save=True, index=None, store=None, throttle=None, sleep=None, pipeline=None):
+    """
+    Scrape the hashtags with at most `pool_size` browser sessions alive at
+    once. Every session runs on its own worker thread and takes tags from a
+    shared TagQueue, so a tag or session that is cooling down never stalls
+    the others. Results are pushed into the shared `sink`; with a
+    StreamingPipeline every scroll batch is also submitted to it, and the
+    pipeline (not the workers) saves them.
+    Pass a fake `driver_factory` and `login=None` to run it offline.
+    """
+    hashtags = list(HASHTAGS if hashtags is None else hashtags)
+    if pipeline is not None:
+        store, index, save = pipeline.store, pipeline.index, False
+        import_legacy_data_file(store)
+    if save and store is None:
+        store = PartitionedTweetStore()
+        import_legacy_data_file(store)
+    if index is None and save and USE_TWEET_INDEX:
+        index = TweetIdIndex()
+    if sink is None:
+        sink = TweetSink()
+    throttle = throttle or Throttle()
+    tags = TagQueue(hashtags, throttle)
+    partial = {}
+    if driver_factory is None and COLLECTOR_BACKEND == "http":
+        driver_factory, login = HttpCollector, HttpCollector.login
+    pool = DriverPool(pool_size, driver_factory=driver_factory or pool_driver_factory(), login=login)
+
+    on_batch = pipeline.submit if pipeline is not None else None
+
+    def _keep(tag, tweets):
+        sink.extend(tweets)
+        if pipeline is not None:
+            return
+        saved = save_batch(store, tweets, tag) if save else True
+        if saved and index is not None:
+            index.add_many(tweets.column("tweet_id"), hashtag=tag)
+
+    def _session(n):
+        session = f"session-{n}"
+        driver = pool.acquire()
+        try:
+            def _work(tag):
+                nonlocal driver
+                if driver is None:
+                    driver = pool.acquire()
+                print(f"[ACTION] Scraping tag: {tag}")
+                try:
+                    tweets = collect_tag_resumable(driver, tag, partial, max_tweets=max_tweets,
+                                                   min_tweets=min_tweets, index=index, on_batch=on_batch)
+                except TwitterErrorPage:
+                    raise
+                except Exception:
+                    if session_lost(driver):
+                        print(f"[WARN] {session} is no longer logged in; replacing it with a fresh session.")
+                        pool.release(driver, broken=True)
+                        driver = None
+                    raise
+                _keep(tag, tweets)
+                print(f"[INFO] Worker finished {tag} ({len(tweets)} tweets).")
+                if pacing and pacing[1] > 0:
+                    # pace this session before it serves another tag
+                    throttle.pace(session, random.uniform(*pacing))
+
+            tags.run(session, _work, sleep=sleep,
+                     on_give_up=lambda tag: _keep(tag, partial.pop(tag, TweetBuffer()).unique()))
+        finally:
+            if driver is not None:
+                pool.release(driver)
+
+    sessions = min(pool.size, max(1, len(hashtags)))
+    try:
+        with ThreadPoolExecutor(max_workers=sessions) as ex:
+            futures = [ex.submit(_session, n + 1) for n in range(sessions)]
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                except SystemExit:
+                    raise
+                except Exception as e:
+                    print(f"[ERROR] Session worker failed: {e}", file=sys.stderr)
+    finally:
+        pool.close()
+        if pipeline is None:
+            if index is not None:
+                index.flush()
+            if store is not None:
+                store.compact()
+        throttle.print_summary()
+    return sink.snapshot()
+
+# =================== COLLECTOR BACKENDS ===================
+def process_tree_rss_mb(pid=None):
+    """
+    Resident memory (MB) of `pid` (default: this process) plus all of its
+    descendants, read from /proc; None where /proc is not available.
+    """
+    pid = os.getpid() if pid is None else pid
+    if not os.path.exists(f"/proc/{pid}/status"):
+        return None
+    total, stack = 0.0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/status", "r") as f:
+                total += next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), 0) / 1024
+            for children in glob.glob(f"/proc/{p}/task/*/children"):
+                with open(children, "r") as f:
+                    stack.extend(int(c) for c in f.read().split())
+        except (OSError, ValueError):
+            continue  # exited while we walked the tree
+    return round(total, 1)
+
+class CollectorBackend(abc.ABC):
+    """
+    Where a hashtag's tweets come from. collect() has the scroll_and_collect
+    contract: a TweetBuffer of new tweets, TwitterErrorPage when the site
+    errors or rate-limits (so the Throttle cools the tag), `index` and
+    `on_batch` honoured. login() and quit() bracket a session (quit() so
+    DriverPool can close backends like WebDrivers); footprint() reports
+    what the session costs. collect_tag() takes a backend wherever it takes
+    a WebDriver.
+    """
+    name = "backend"
+
+    def login(self):
+        pass
+
+    @abc.abstractmethod
+    def collect(self, hashtag, max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG, index=None,
+                on_batch=None):
+        """A TweetBuffer of the hashtag's new tweets (see the class docstring)."""
+
+    def footprint(self):
+        return {}
+
+    def quit(self):
+        pass
+
+class SeleniumCollector(CollectorBackend):
+    """
+    The browser backend: scroll_and_collect (or, with COLLECT_MODE="network",
+    the timeline-response decoder) on a logged-in Chrome session.
+    """
+    name = "selenium"
+
+    def __init__(self, driver=None, driver_factory=init_driver, login=login_driver):
+        self.driver = driver
+        self.driver_factory = driver_factory
+        self._login = login
+
+    def login(self):
+        if self.driver is None:
+            self.driver = self.driver_factory()
+        if self._login is not None:
+            self._login(self.driver)
+
+    def collect(self, hashtag, **kwargs):
+        if self.driver is None:
+            self.login()
+        if COLLECT_MODE == "network":
+            return scroll_and_collect_network(self.driver, hashtag, **kwargs)
+        return scroll_and_collect(self.driver, hashtag, **kwargs)
+
+    def footprint(self):
+        if self.driver is None:
+            return {}
+        out = dict(browser_footprint(self.driver))
+        try:
+            out["rss_mb"] = process_tree_rss_mb(self.driver.service.process.pid)  # chromedriver + Chrome
+        except Exception:
+            pass
+        return out
+
+    def quit(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+class HttpCollector(CollectorBackend):
+    """
+    The browserless backend: a requests.Session with a keep-alive connection
+    pool carries the saved login cookies (ct0 doubles as the csrf header)
+    and calls the search timeline endpoint directly. Each page is decoded
+    with parse_timeline_payload into the usual records and its Bottom cursor
+    is followed for the next page, the way the browser does when scrolled.
+    A few MB per session instead of a Chrome process tree.
+    """
+    name = "http"
+
+    def __init__(self, search_url=None, bearer_token=None, cookies=None, features=None, page_size=HTTP_PAGE_SIZE,
+                 pool_connections=HTTP_POOL_CONNECTIONS, timeout=HTTP_TIMEOUT_SECONDS, page_pause=HTTP_PAGE_PAUSE):
+        self.search_url = search_url or HTTP_SEARCH_URL
+        self.bearer_token = HTTP_BEARER_TOKEN if bearer_token is None else bearer_token
+        self.cookies = cookies
+        self.features = HTTP_SEARCH_FEATURES if features is None else features
+        self.page_size = page_size
+        self.pool_connections = pool_connections
+        self.timeout = timeout
+        self.page_pause = page_pause
+        self.session = None
+        self.requests_sent = 0
+        self._cookie_domain = None
+
+    def login(self):
+        """
+        Open the pooled session with the saved cookies. Raises SystemExit
+        (like login_driver) if the endpoint or the login cookies are missing.
+        """
+        if not self.search_url:
+            raise SystemExit("HTTP backend needs the search timeline URL: set TQB_SEARCH_URL (HTTP_SEARCH_URL).")
+        cookies = load_saved_cookies() if self.cookies is None else self.cookies
+        values = {c["name"]: c["value"] for c in cookies if c}
+        if "auth_token" not in values or "ct0" not in values:
+            raise SystemExit(f"HTTP backend needs the auth_token and ct0 cookies ({COOKIES_FILE_PKL} or "
+                             f"{COOKIES_JSON_FILE}); export them from a logged-in browser and retry.")
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_connections)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # scope the cookies to the endpoint's host: exports are often for .twitter.com while the API lives on x.com
+        host = urlsplit(self.search_url).hostname
+        for name, value in values.items():
+            session.cookies.set(name, value, domain=host, path="/")
+        self._cookie_domain = host
+        session.headers.update({
+            "authorization": f"Bearer {self.bearer_token}",
+            "x-twitter-auth-type": "OAuth2Session",
+            "x-twitter-active-user": "yes",
+            "x-twitter-client-language": "en",
+            "content-type": "application/json",
+            "user-agent": HTTP_USER_AGENT,
+            "referer": f"{TWITTER_BASE_URL}/search",
+        })
+        self.session = session
+        print(f"[INFO] HTTP collector ready ({len(values)} cookies, {self.pool_connections} pooled connections).")
+
+    def _csrf_token(self):
+        """
+        The current ct0. login() sets it on the endpoint's host, but a
+        rotating Set-Cookie usually scopes it to the parent domain (.x.com),
+        leaving two ct0 cookies in the jar (cookies.get("ct0") then raises
+        CookieConflictError). The server's copy is the newer one: it wins and
+        the login copy is dropped.
+        """
+        tokens = [c for c in self.session.cookies if c.name == "ct0"]
+        rotated = [c for c in tokens if c.domain != self._cookie_domain]
+        if rotated:
+            for c in tokens:
+                if c.domain == self._cookie_domain:
+                    self.session.cookies.clear(c.domain, c.path, c.name)
+            tokens = rotated
+        return tokens[-1].value if tokens else ""
+
+    def _fetch(self, hashtag, cursor, tweets):
+        variables = {"rawQuery": hashtag, "count": self.page_size, "querySource": "typed_query", "product": "Latest"}
+        if cursor:
+            variables["cursor"] = cursor
+        params = {"variables": json.dumps(variables, separators=(",", ":"))}
+        if self.features:
+            params["features"] = json.dumps(self.features, separators=(",", ":"))
+        # ct0 can be rotated by a Set-Cookie; the csrf header must always follow it
+        self.session.headers["x-csrf-token"] = self._csrf_token()
+        try:
+            resp = self.session.get(self.search_url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TwitterErrorPage(hashtag, tweets, f"Search request failed: {e}")
+        self.requests_sent += 1
+        METRICS.inc("http_requests", status=resp.status_code)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise TwitterErrorPage(hashtag, tweets, f"Search timeline returned HTTP {resp.status_code}")
+        if resp.status_code in (401, 403):
+            raise RuntimeError(f"Search timeline rejected the session (HTTP {resp.status_code}); refresh the cookies.")
+        resp.raise_for_status()
+        payload = resp.json()
+        if isinstance(payload, dict) and payload.get("errors") and not payload.get("data"):
+            raise TwitterErrorPage(hashtag, tweets, f"Timeline API error: {payload['errors'][0].get('message', '')}")
+        return payload
+
+    def collect(self, hashtag, max_tweets=MAX_TWEETS_PER_HASHTAG, min_tweets=MIN_TWEETS_PER_HASHTAG, index=None,
+                on_batch=None):
+        if self.session is None:
+            self.login()
+        tweets_data = TweetBuffer()
+        emit = _batch_emitter(hashtag, tweets_data, on_batch)
+        seen = set()
+        high_water = index.high_water_mark(hashtag) if index is not None else None
+        known_seen = 0
+        cursor = None
+        empty_pages = 0
+        while len(tweets_data) < max_tweets:
+            with METRICS.phase("search" if cursor is None else "scroll"):
+                payload = self._fetch(hashtag, cursor, tweets_data)
+            with METRICS.phase("extract"):
+                records, next_cursor = parse_timeline_payload(payload)
+                new_found, known = take_timeline_records(records, tweets_data, seen, index, high_water, max_tweets)
+            known_seen += known
+            emit()
+            if len(tweets_data) >= max_tweets:
+                break
+            if known_seen >= HWM_STOP_AFTER:
+                print(f"[INFO] Reached already-collected tweets for {hashtag}; stopping.")
+                break
+            if not next_cursor or next_cursor == cursor:
+                break  # end of the timeline
+            empty_pages = 0 if new_found else empty_pages + 1
+            if empty_pages > SCROLL_RETRY_LIMIT:
+                break
+            cursor = next_cursor
+            if self.page_pause and self.page_pause[1] > 0:
+                time.sleep(random.uniform(*self.page_pause))
+        if len(tweets_data) < min_tweets:
+            print(f"[WARN] Could not load enough tweets for {hashtag} from the search timeline.")
+        print(f"[INFO] For {hashtag}: collected {len(tweets_data)} tweets (http, {self.requests_sent} requests).")
+        return tweets_data
+
+    def footprint(self):
+        return {"rss_mb": process_tree_rss_mb(), "requests": self.requests_sent}
+
+    def quit(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+def open_collector(backend=None):
+    """
+    A logged-in session of the configured COLLECTOR_BACKEND: an HttpCollector,
+    or (for "selenium") a plain WebDriver, which collect_tag and the daemon use as is.
+    """
+    backend = backend or COLLECTOR_BACKEND
+    if backend == "http":
+        collector = HttpCollector()
+        collector.login()
+        return collector
+    if backend != "selenium":
+        raise ValueError(f"Unknown collector backend: {backend}")
+    driver = init_driver()
+    login_driver(driver)
+    return driver
 
-    print(f"[INFO] For {hashtag}: collected {len(tweets_data)} tweets.")
-    return tweets_data
+# =================== NEAR-DUPLICATES ===================
+def _word_hash(word):
+    raw = word.encode("utf-8")
+    return (zlib.crc32(raw) << 32) | zlib.adler32(raw)
 
-# =================== MAIN COLLECTOR ===================
-def collect_all_hashtags():
-    driver = init_driver()
+def shingle_hashes(texts, shingle=NEAR_DUP_SHINGLE):
+    """
+    Word shingles of every text as uint64 hashes, plus the row each belongs to.
+
+    Texts are lower-cased, links dropped and everything but letters and
+    digits removed, so copies that differ by a URL, emoji or punctuation
+    shingle the same. Each word position yields one shingle (the word and the
+    shingle-1 words before it, padded at the start of the text). Only the
+    distinct words of the batch are hashed in Python.
+    """
+    arr = texts if isinstance(texts, (pa.Array, pa.ChunkedArray)) else pa.array(texts, type=pa.string(),
+                                                                                 from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    tokens = pc.utf8_split_whitespace(pc.utf8_lower(arr.fill_null("")))
+    flat = pc.list_flatten(tokens)
+    words = pc.replace_substring_regex(flat, r"[^\p{L}\p{N}]+", "")
+    keep = pc.and_(pc.not_equal(words, ""), pc.invert(pc.starts_with(flat, "http")))
+    words = words.filter(keep)
+    rows = pc.list_parent_indices(tokens).to_numpy()[keep.to_numpy(zero_copy_only=False)]
+    if not len(words):
+        return np.zeros(0, dtype=np.uint64), rows
+    encoded = words.dictionary_encode()
+    vocab = encoded.dictionary.to_pylist()
+    h = np.fromiter((_word_hash(w) for w in vocab), dtype=np.uint64, count=len(vocab))[encoded.indices.to_numpy()]
+    out = h
+    with np.errstate(over="ignore"):
+        for k in range(1, shingle):
+            prev = np.full(len(h), np.uint64(k), dtype=np.uint64)
+            same = np.flatnonzero(rows[k:] == rows[:-k])
+            prev[same + k] = h[same]
+            out = out * np.uint64(0x100000001B3) ^ prev
+    return _splitmix64(out), rows
+
+def minhash_signatures(texts, num_perm=NEAR_DUP_NUM_PERM, shingle=NEAR_DUP_SHINGLE):
+    """
+    One-permutation MinHash: every shingle hash picks one of `num_perm` bins
+    and each bin keeps its minimum, so a signature costs one pass over the
+    shingles instead of num_perm. Empty bins borrow the next non-empty bin to
+    their right (rotation densification), which keeps P(a[i] == b[i]) equal
+    to the Jaccard similarity of the two shingle sets.
+    Returns (n, num_perm) uint32 signatures and the mask of texts without words.
+    """
+    n = len(texts)
+    h, rows = shingle_hashes(texts, shingle)
+    unset = np.uint32(0xFFFFFFFF)
+    sig = np.full(n * num_perm, unset, dtype=np.uint32)
+    slots = rows.astype(np.int64) * num_perm + (h % np.uint64(num_perm)).astype(np.int64)
+    np.minimum.at(sig, slots, (h >> np.uint64(32)).astype(np.uint32))
+    sig = sig.reshape(n, num_perm)
+    filled = sig != unset
+    empty = ~filled.any(axis=1)
+    if not filled[~empty].all():
+        cols = np.arange(2 * num_perm)
+        nearest = np.where(np.tile(filled, 2), cols, 2 * num_perm)
+        nearest = np.minimum.accumulate(nearest[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        distance = (nearest - cols[:num_perm]).astype(np.uint32)
+        borrowed = np.take_along_axis(sig, nearest % num_perm, axis=1)
+        with np.errstate(over="ignore"):
+            borrowed = borrowed + distance * np.uint32(0x9E3779B1)
+        sig = np.where(filled | empty[:, None], sig, borrowed)
+    return sig, empty
+
+def lsh_bands(threshold, num_perm):
+    """
+    (bands, rows per band) with bands * rows <= num_perm whose S-curve
+    1 - (1 - s^rows)^bands best separates pairs above and below `threshold`
+    (least false-positive plus false-negative area).
+    """
+    s = np.linspace(0.0, 1.0, 501)
+    below = s < threshold
+    best, best_err = (1, num_perm), None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        p = 1.0 - (1.0 - s ** rows) ** bands
+        err = p[below].sum() + (1.0 - p[~below]).sum()
+        if best_err is None or err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+class NearDuplicateIndex:
+    """
+    Persistent LSH index of near-duplicate clusters, shared across runs.
+
+    Every cluster keeps the MinHash signature and status id of its first
+    tweet (its representative). A new signature is cut into bands, each band
+    hashed to one uint64 key and looked up in the sorted key runs, so a batch
+    is checked against all history in O(log n) per band; only the clusters it
+    collides with are compared signature by signature. Tweets matching no
+    stored cluster are clustered among themselves and become new clusters.
 
-    # 1) Try loading previously-saved pickle cookies for convenience
-    loaded = try_load_pickle(driver, COOKIES_FILE_PKL)
-    if not loaded:
-        # 2) If user provided a JSON string in script, use it
-        if COOKIES_JSON:
-            print("[INFO] Using COOKIES_JSON provided in script to inject cookies.")
-            ok = load_cookies_from_json_string(driver, COOKIES_JSON)
-            if not ok:
-                print("[WARN] Provided COOKIES_JSON failed to inject. Trying JSON file next.")
-        # 3) If there's a JSON file in working dir, use it
-        if not os.path.exists(COOKIES_FILE_PKL):
-            if os.path.exists(COOKIES_JSON_FILE):
-                print(f"[INFO] Loading cookie JSON from {COOKIES_JSON_FILE}.")
-                load_cookies_from_file(driver, COOKIES_JSON_FILE)
+    - keys-<run>.u64 / key_clusters-<run>.i64: sorted runs of band keys and the
+      cluster of each, memory-mapped; every flush writes one new run and
+      merges runs of similar size (see _compact_runs)
+    - signatures.u32 / reps.u64: representative signature and status id per cluster, append-only
+    - meta.json: MinHash / banding parameters, the cluster count and the live runs
+
+    New clusters sit in memory until flush(); directory=None never persists.
+    """
+    def __init__(self, directory=NEAR_DUP_DIR, threshold=NEAR_DUP_THRESHOLD, num_perm=NEAR_DUP_NUM_PERM,
+                 shingle=NEAR_DUP_SHINGLE, flush_every=50_000):
+        self.directory = directory
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.flush_every = flush_every
+        self._lock = threading.RLock()
+        self._meta = {"num_perm": num_perm, "bands": self.bands, "rows": self.rows, "shingle": shingle,
+                      "layout": "runs"}
+        self._pending = {"signatures": [], "reps": []}
+        self._runs = []       # sorted (band keys, clusters) of the clusters added since the last flush
+        self._key_runs = []   # [run number, keys] of the runs on disk, oldest first
+        self._flushed = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            meta = {}
+            if os.path.exists(self._path("meta.json")):
+                with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            if meta and any(meta.get(k) != v for k, v in self._meta.items()):
+                print(f"[WARN] Near-duplicate index in {directory} was built with {meta}; starting a new one.")
+                meta = {}
+                for name in ("keys.u64", "key_clusters.i64", "signatures.u32", "reps.u64"):
+                    if os.path.exists(self._path(name)):
+                        os.remove(self._path(name))
+            self._flushed = int(meta.get("clusters", 0))
+            self._key_runs = [list(run) for run in meta.get("runs", [])]
+            # runs an interrupted flush or merge wrote but never listed
+            live = {name for run, _ in self._key_runs for name in self._run_files(run)}
+            for path in glob.glob(self._path("keys-*.u64")) + glob.glob(self._path("key_clusters-*.i64")):
+                if os.path.basename(path) not in live:
+                    os.remove(path)
+            # drop anything an interrupted flush appended after the last meta.json
+            for name, width in (("signatures.u32", 4 * num_perm), ("reps.u64", 8)):
+                if os.path.exists(self._path(name)) and os.path.getsize(self._path(name)) > self._flushed * width:
+                    os.truncate(self._path(name), self._flushed * width)
+        self._next_run = max((run for run, _ in self._key_runs), default=0) + 1
+        self._count = self._flushed
+        self._open()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _run_files(run):
+        return f"keys-{run:06d}.u64", f"key_clusters-{run:06d}.i64"
+
+    def _open(self):
+        def mapped(name, dtype, shape):
+            if self.directory and shape[0] and os.path.exists(self._path(name)):
+                return np.memmap(self._path(name), dtype=dtype, mode="r", shape=shape)
+            return np.zeros(shape, dtype=dtype)
+        self._disk_runs = []
+        for run, n_keys in self._key_runs:
+            keys, clusters = self._run_files(run)
+            self._disk_runs.append((mapped(keys, "<u8", (n_keys,)), mapped(clusters, "<i8", (n_keys,))))
+        self._signatures = mapped("signatures.u32", "<u4", (self._flushed, self.num_perm))
+        self._reps = mapped("reps.u64", "<u8", (self._flushed,))
+
+    def __len__(self):
+        return self._count
+
+    def band_keys(self, signatures):
+        keys = np.empty((len(signatures), self.bands), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for b in range(self.bands):
+                key = np.full(len(signatures), np.uint64(b + 1), dtype=np.uint64)
+                for col in range(b * self.rows, (b + 1) * self.rows):
+                    key = _splitmix64(key * np.uint64(0x100000001B3) ^ signatures[:, col].astype(np.uint64))
+                keys[:, b] = key
+        return keys
+
+    @staticmethod
+    def _merge_runs(runs):
+        keys = np.concatenate([k for k, _ in runs])
+        clusters = np.concatenate([c for _, c in runs])
+        order = np.argsort(keys, kind="stable")
+        return keys[order], clusters[order]
+
+    def _lookup(self, keys):
+        flat = keys.ravel()
+        found = np.full(len(flat), -1, dtype=np.int64)
+        # oldest run first, so a key shared by several clusters resolves to the oldest
+        for sorted_keys, clusters in self._disk_runs + self._runs:
+            if not len(sorted_keys):
+                continue
+            pos = np.minimum(np.searchsorted(sorted_keys, flat), len(sorted_keys) - 1)
+            hit = (found < 0) & (np.asarray(sorted_keys[pos]) == flat)
+            found[hit] = np.asarray(clusters[pos[hit]])
+        return found.reshape(keys.shape)
+
+    def _cluster_rows(self, clusters, field):
+        """Representative signatures ("signatures") or status ids ("reps") of `clusters`."""
+        stored = self._signatures if field == "signatures" else self._reps
+        out = np.empty((len(clusters),) + stored.shape[1:], dtype=stored.dtype)
+        old = clusters < self._flushed
+        out[old] = stored[clusters[old]]
+        if (~old).any():
+            out[~old] = np.concatenate(self._pending[field])[clusters[~old] - self._flushed]
+        return out
+
+    def _similar_pairs(self, pairs, signatures, other):
+        packed = np.unique((pairs[:, 0].astype(np.int64) << 32) | pairs[:, 1])
+        pairs = np.stack([packed >> 32, packed & 0xFFFFFFFF], axis=1)
+        sim = (signatures[pairs[:, 0]] == other(pairs[:, 1])).mean(axis=1)
+        good = sim >= self.threshold
+        return pairs[good], sim[good]
+
+    @staticmethod
+    def identities(signatures, tweet_ids, content_hashes=None):
+        """
+        uint64 identity per tweet: its status id, or for tweets without one
+        its content hash (else a hash of its signature) with the top bit set,
+        which no status id has. A re-cleaned tweet thus always matches the
+        representative it became.
+        """
+        ids = _as_id_array(tweet_ids)
+        missing = ids == 0
+        if missing.any():
+            if content_hashes is not None:
+                own = np.asarray(content_hashes, dtype=np.uint64)[missing]
             else:
-                print("[WARN] No cookie pickle or json provided. Please place exported cookie JSON at"
-                      f" {COOKIES_JSON_FILE} or set COOKIES_JSON variable, then re-run.")
-                driver.quit()
-                raise SystemExit("No cookies provided; aborting to prevent login attempts.")
+                own = np.zeros(int(missing.sum()), dtype=np.uint64)
+                with np.errstate(over="ignore"):
+                    for col in np.asarray(signatures)[missing].T:
+                        own = _splitmix64(own * np.uint64(0x100000001B3) ^ col.astype(np.uint64))
+            ids[missing] = own | np.uint64(1 << 63)
+        return ids
 
-    # After injecting cookies, verify that we're logged in by checking the search input presence
-    try:
-        driver.get("https://twitter.com/home")
-        time.sleep(3)
-        # if logged in, search box should be present
-        WebDriverWait(driver, 8).until(EC.presence_of_element_located((By.XPATH, '//input[@aria-label="Search query"]')))
-        print("[INFO] Login appears successful (search box found). Proceeding.")
-    except Exception:
-        print("[WARN] Could not verify login. Twitter may have rejected cookies or cookies expired.")
-        driver.quit()
-        raise SystemExit("Login verification failed. Update cookies and retry.")
+    def assign(self, signatures, tweet_ids, empty=None, content_hashes=None):
+        """
+        Cluster id per signature (-1 where `empty`) and whether the tweet is a
+        near duplicate, i.e. its cluster's representative is another tweet
+        (see identities() for tweets without a status id).
+        """
+        n = len(signatures)
+        clusters = np.full(n, -1, dtype=np.int64)
+        duplicate = np.zeros(n, dtype=bool)
+        ids = self.identities(signatures, tweet_ids, content_hashes)
+        live = np.ones(n, dtype=bool) if empty is None else ~np.asarray(empty)
+        with self._lock:
+            keys = self.band_keys(signatures)
+            found = self._lookup(keys)
+            row, band = np.nonzero((found >= 0) & live[:, None])
+            if len(row):
+                pairs, sim = self._similar_pairs(np.stack([row, found[row, band]], axis=1), signatures,
+                                                 lambda c: self._cluster_rows(c, "signatures"))
+                # best-matching stored cluster per row
+                order = np.lexsort((-sim, pairs[:, 0]))
+                pairs = pairs[order]
+                first = np.ones(len(pairs), dtype=bool)
+                first[1:] = pairs[1:, 0] != pairs[:-1, 0]
+                row, cluster = pairs[first, 0], pairs[first, 1]
+                clusters[row] = cluster
+                duplicate[row] = self._cluster_rows(cluster, "reps") != ids[row]
 
-    all_tweets = []
-    if os.path.exists(DATA_FILE):
-        try:
-            prev = pd.read_parquet(DATA_FILE)
-            all_tweets.extend(prev.to_dict(orient="records"))
-            print(f"[INFO] Loaded {len(prev)} previously saved tweets.")
-        except Exception:
-            print("[WARN] Failed to read existing data file; starting fresh.")
+            rest = np.flatnonzero(live & (clusters < 0))
+            if len(rest):
+                labels = self._connect(signatures[rest], keys[rest])
+                uniq, first = np.unique(labels, return_index=True)
+                new_ids = np.empty(len(uniq), dtype=np.int64)
+                new_ids[np.argsort(first)] = self._count + np.arange(len(uniq))
+                clusters[rest] = new_ids[np.searchsorted(uniq, labels)]
+                reps = np.sort(first)
+                duplicate[rest] = True
+                duplicate[rest[reps]] = False
+                self._add(signatures[rest[reps]], keys[rest[reps]], ids[rest[reps]])
+        return clusters, duplicate
 
-    for tag in HASHTAGS:
-        try:
-            print(f"[ACTION] Scraping tag: {tag}")
-            tweets = scroll_and_collect(driver, tag)
-            all_tweets.extend(tweets)
-            try:
-                df_partial = pd.DataFrame(all_tweets)
-                df_partial.to_parquet(DATA_FILE, index=False)
-                print(f"[INFO] Saved partial data to {DATA_FILE} (total {len(all_tweets)}).")
-            except Exception as e:
-                print(f"[ERROR] Failed saving partial data: {e}")
-            sleep_time = random.uniform(15, 180)
-            print(f"[INFO] Sleeping {int(sleep_time)}s before next tag.")
-            time.sleep(sleep_time)
-        except Exception as e:
-            print(f"[ERROR] Error on {tag}: {e}", file=sys.stderr)
-            time.sleep(random.uniform(60, 120))
-            continue
+    def _connect(self, signatures, keys):
+        # rows sharing a band key with that bucket's first row, and similar enough, are linked
+        n = len(signatures)
+        src, dst = [], []
+        for b in range(self.bands):
+            _, first, inverse = np.unique(keys[:, b], return_index=True, return_inverse=True)
+            leader = first[inverse.ravel()]
+            linked = np.flatnonzero(leader != np.arange(n))
+            src.append(linked)
+            dst.append(leader[linked])
+        pairs = np.stack([np.concatenate(src), np.concatenate(dst)], axis=1)
+        if len(pairs):
+            pairs, _ = self._similar_pairs(pairs, signatures, lambda r: signatures[r])
+        graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        return connected_components(graph, directed=False)[1]
 
-    driver.quit()
-    return all_tweets
+    def _add(self, signatures, keys, ids):
+        k = len(signatures)
+        self._runs.append(self._merge_runs([(keys.ravel(), np.repeat(self._count + np.arange(k, dtype=np.int64),
+                                                                      self.bands))]))
+        if len(self._runs) > 8:
+            self._runs = [self._merge_runs(self._runs)]
+        self._pending["signatures"].append(signatures)
+        self._pending["reps"].append(ids)
+        self._count += k
+        if self._count - self._flushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the clusters added since the last flush: their band keys become
+        one new sorted run and their signatures are appended, so a flush costs
+        what was added, not the size of the history. meta.json is written
+        last, so an interrupted flush is rolled back on load.
+        """
+        with self._lock:
+            if not self.directory or self._count == self._flushed:
+                return
+            keys, clusters = self._merge_runs(self._runs)
+            with open(self._path("signatures.u32"), "ab") as f:
+                np.concatenate(self._pending["signatures"]).astype("<u4").tofile(f)
+            with open(self._path("reps.u64"), "ab") as f:
+                np.concatenate(self._pending["reps"]).astype("<u8").tofile(f)
+            runs = self._key_runs + [self._write_run(keys, clusters)]
+            runs, merged = self._compact_runs(runs)
+            _atomic_write_bytes(self._path("meta.json"), json.dumps(
+                dict(self._meta, clusters=self._count, threshold=self.threshold, runs=runs)).encode("utf-8"))
+            # drop the mappings before files go away (required on Windows)
+            self._disk_runs = self._signatures = self._reps = None
+            for run in merged:
+                for name in self._run_files(run):
+                    os.remove(self._path(name))
+            self._key_runs = runs
+            self._flushed = self._count
+            self._pending = {"signatures": [], "reps": []}
+            self._runs = []
+            self._open()
+
+    def _write_run(self, keys, clusters):
+        run, self._next_run = self._next_run, self._next_run + 1
+        keys_file, clusters_file = self._run_files(run)
+        _atomic_write_bytes(self._path(keys_file), keys.astype("<u8").tobytes())
+        _atomic_write_bytes(self._path(clusters_file), clusters.astype("<i8").tobytes())
+        return [run, len(keys)]
+
+    def _compact_runs(self, runs):
+        """
+        Merge the newest run into the one before it while that one is no
+        bigger (like a binary counter): every key is rewritten O(log n) times
+        and a lookup searches O(log n) runs. Returns the runs and the merged-away ones.
+        """
+        merged = []
+        while len(runs) > 1 and runs[-2][1] <= runs[-1][1]:
+            parts = []
+            for run, n_keys in runs[-2:]:
+                keys_file, clusters_file = self._run_files(run)
+                parts.append((np.fromfile(self._path(keys_file), dtype="<u8", count=n_keys),
+                              np.fromfile(self._path(clusters_file), dtype="<i8", count=n_keys)))
+            merged.extend(run for run, _ in runs[-2:])
+            runs = runs[:-2] + [self._write_run(*self._merge_runs(parts))]
+        return runs, merged
+
+@functools.lru_cache(maxsize=None)
+def _near_duplicate_index(directory, threshold, num_perm, shingle):
+    return NearDuplicateIndex(directory, threshold, num_perm, shingle)
+
+def default_near_duplicate_index():
+    return _near_duplicate_index(NEAR_DUP_DIR, NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM, NEAR_DUP_SHINGLE)
+
+def mark_near_duplicates(df, index=None, chunk_rows=NEAR_DUP_CHUNK_ROWS):
+    """
+    Add `dup_cluster` (near-duplicate cluster id, -1 for tweets without words)
+    and `near_duplicate` (the cluster's first tweet is another one, from this
+    batch or any earlier) to a frame with `content` and `tweet_id`.
+    """
+    if df.empty:
+        return df.assign(dup_cluster=np.zeros(0, dtype=np.int64), near_duplicate=np.zeros(0, dtype=bool))
+    if index is None:
+        index = default_near_duplicate_index()
+    with METRICS.phase("dedup"):
+        content = pa.array(df["content"], type=pa.string(), from_pandas=True)
+        ids = df["tweet_id"].to_numpy() if "tweet_id" in df else np.full(len(df), None)
+        hashes = pd.util.hash_pandas_object(df["content"], index=False).to_numpy()
+        clusters = np.empty(len(df), dtype=np.int64)
+        duplicate = np.empty(len(df), dtype=bool)
+        for start in range(0, len(df), chunk_rows):
+            chunk = content.slice(start, chunk_rows)
+            signatures, empty = minhash_signatures(chunk, index.num_perm, index.shingle)
+            end = start + len(chunk)
+            clusters[start:end], duplicate[start:end] = index.assign(signatures, ids[start:end], empty,
+                                                                     hashes[start:end])
+    METRICS.inc("near_duplicates", int(duplicate.sum()))
+    return df.assign(dup_cluster=clusters, near_duplicate=duplicate)
 
 # =================== CLEANING & ANALYSIS ===================
-def clean_tweets(tweets):
-    if not tweets:
+def clean_tweets(tweets, near_dups=None, near_dup_mode=None):
+    """
+    Dedup, normalize and window a batch of tweets. `near_dup_mode`
+    (default NEAR_DUP_MODE) is "flag", "drop" or "off", see mark_near_duplicates.
+    """
+    if tweets is None or len(tweets) == 0:
         return pd.DataFrame()
-    df = pd.DataFrame(tweets)
+    with METRICS.phase("clean"):
+        df = tweets.to_pandas() if isinstance(tweets, TweetBuffer) else pd.DataFrame(tweets)
+        return _clean_frame(df, near_dups, near_dup_mode)
+
+def _clean_frame(df, near_dups=None, near_dup_mode=None):
+    near_dup_mode = near_dup_mode or NEAR_DUP_MODE
     df.drop_duplicates(subset=["content"], inplace=True)
-    df["content"] = df["content"].apply(lambda x: unicodedata.normalize("NFKC", x) if isinstance(x, str) else x)
+    df["content"] = nfkc_normalize(df["content"])
     df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
     now_utc = datetime.now(timezone.utc)
     df = df[df["timestamp"].notna()]
     df = df[df["timestamp"] >= (now_utc - timedelta(days=1))]
+    if near_dup_mode != "off":
+        df = mark_near_duplicates(df, near_dups)
+        if near_dup_mode == "drop":
+            df = df[~df["near_duplicate"]]
     return df
 
+def nfkc_normalize(content):
+    """
+    NFKC-normalize a string column in one Arrow kernel call; non-string
+    values pass through untouched (per-row fallback for mixed columns).
+    """
+    try:
+        arr = pa.array(content, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return content.apply(lambda x: unicodedata.normalize("NFKC", x) if isinstance(x, str) else x)
+    out = pc.utf8_normalize(arr, form="NFKC")
+    return pd.Series(out.to_numpy(zero_copy_only=False), index=content.index, name=content.name)
+
+@functools.lru_cache(maxsize=None)
+def cleaned_schema():
+    schema = tweet_schema()
+    schema = schema.set(schema.get_field_index("timestamp"), pa.field("timestamp", pa.timestamp("ns", tz="UTC")))
+    return schema.append(pa.field("dup_cluster", pa.int64())).append(pa.field("near_duplicate", pa.bool_()))
+
+def clean_stored_tweets(store=None, filename=CLEANED_FILE, window=CLEAN_WINDOW, batch_size=CLEAN_BATCH_ROWS,
+                        now=None, near_dups=None, near_dup_mode=None):
+    """
+    Streaming version of clean_tweets + save_cleaned over the partitioned store.
+
+    The time window is pushed down to the reader (date partitions outside it
+    are never opened, row groups are filtered on the timestamp column), each
+    record batch is normalized with vectorized Arrow kernels and appended to
+    `filename` as it goes, so peak memory is one batch plus the content hashes
+    used for dedup, whatever the size of the history.
+    Returns {"read": rows scanned, "written": rows kept, "near_duplicates": rows dropped as such}.
+    """
+    with METRICS.phase("clean"):
+        return _clean_stored(store or PartitionedTweetStore(), filename, window, batch_size,
+                             now or datetime.now(timezone.utc), near_dups, near_dup_mode)
+
+def _clean_stored(store, filename, window, batch_size, now, near_dups=None, near_dup_mode=None):
+    near_dup_mode = near_dup_mode or NEAR_DUP_MODE
+    cutoff = now - window
+    dataset = store.dataset(start=cutoff)
+    flt = ds.field("timestamp") >= _iso_utc(cutoff)
+
+    seen_hashes = set()
+    stats = {"read": 0, "written": 0, "near_duplicates": 0}
+    tmp = filename + ".tmp"
+    writer = None
+    try:
+        for batch in dataset.to_batches(filter=flt, batch_size=batch_size):
+            if batch.num_rows == 0:
+                continue
+            stats["read"] += batch.num_rows
+            # exact-duplicate content, across batches too (8-byte hash per kept row)
+            hashes = pd.util.hash_pandas_object(batch.column("content").to_pandas(), index=False).to_numpy()
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            keep &= np.fromiter((h not in seen_hashes for h in hashes.tolist()), dtype=bool, count=len(hashes))
+            ts = pd.to_datetime(batch.column("timestamp").to_pandas(), utc=True, errors="coerce", format="ISO8601")
+            keep &= ts.notna().to_numpy()
+            keep &= (ts >= cutoff).to_numpy()
+            if not keep.any():
+                continue
+            seen_hashes.update(hashes[keep].tolist())
+            mask = pa.array(keep)
+            content = pc.utf8_normalize(batch.column("content").filter(mask), form="NFKC")
+            dup_cluster = np.full(len(content), -1, dtype=np.int64)
+            near = np.zeros(len(content), dtype=bool)
+            if near_dup_mode != "off":
+                marked = mark_near_duplicates(pd.DataFrame({
+                    "content": content.to_pandas(), "tweet_id": batch.column("tweet_id").filter(mask).to_pandas()}),
+                    near_dups)
+                dup_cluster, near = marked["dup_cluster"].to_numpy(), marked["near_duplicate"].to_numpy()
+            columns = []
+            for field in cleaned_schema():
+                if field.name == "timestamp":
+                    col = pa.array(ts[keep], type=field.type)
+                elif field.name == "content":
+                    col = content
+                elif field.name == "dup_cluster":
+                    col = pa.array(dup_cluster, type=field.type)
+                elif field.name == "near_duplicate":
+                    col = pa.array(near, type=field.type)
+                else:
+                    col = batch.column(field.name).filter(mask)
+                columns.append(col)
+            out = pa.RecordBatch.from_arrays(columns, schema=cleaned_schema())
+            if near_dup_mode == "drop":
+                out = out.filter(pa.array(~near))
+                stats["near_duplicates"] += int(near.sum())
+                if out.num_rows == 0:
+                    continue
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, cleaned_schema(), compression="zstd")
+            writer.write_batch(out)
+            stats["written"] += out.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    if stats["written"]:
+        os.replace(tmp, filename)
+        print(f"[INFO] Saved cleaned data to {filename} (rows: {stats['written']} of {stats['read']} scanned)")
+    elif stats["near_duplicates"]:
+        print(f"[WARN] All {stats['near_duplicates']} tweets left after exact dedup are near duplicates of "
+              "earlier ones; nothing to save.")
+    elif stats["read"]:
+        print(f"[WARN] None of the {stats['read']} tweets in the cleaning window survived dedup; nothing to save.")
+    else:
+        print("[WARN] No tweets inside the cleaning window; nothing to save.")
+    return stats
+
 def save_cleaned(df, filename=CLEANED_FILE):
     if df.empty:
         print("[WARN] Cleaned dataframe is empty; nothing to save.")
@@ -519,41 +3566,1340 @@ def save_cleaned(df, filename=CLEANED_FILE):
     df.to_parquet(filename, index=False)
     print(f"[INFO] Saved cleaned data to {filename} (rows: {len(df)})")
 
-def generate_signal(df):
+class SparseSignalEngine:
+    """
+    Mean TF-IDF weight per tweet without ever densifying the matrix.
+
+    In "incremental"/"hashing" mode the vocabulary (or hash space) and the
+    document frequencies are kept in `model_file`, so a new batch is scored
+    against the running IDF (and folded into it) instead of refitting on all
+    past tweets.
+    """
+    def __init__(self, mode=SIGNAL_MODE, model_file=SIGNAL_MODEL_FILE, max_features=SIGNAL_MAX_FEATURES,
+                 hash_features=SIGNAL_HASH_FEATURES):
+        if mode not in ("refit", "incremental", "hashing"):
+            raise ValueError(f"Unknown signal mode: {mode}")
+        self.mode = mode
+        self.model_file = model_file
+        self.max_features = max_features
+        self.hash_features = hash_features
+        self.vocabulary = None
+        self.doc_freq = None
+        self.n_docs = 0
+        if mode != "refit" and model_file and os.path.exists(model_file):
+            self.load()
+
+    # ---- persistence ----
+    def load(self):
+        with open(self.model_file, "rb") as f:
+            state = pickle.load(f)
+        if state.get("mode") != self.mode:
+            print(f"[WARN] {self.model_file} was built in '{state.get('mode')}' mode; starting a fresh model.")
+            return
+        self.vocabulary = state["vocabulary"]
+        self.doc_freq = state["doc_freq"]
+        self.n_docs = state["n_docs"]
+
+    def save(self):
+        if self.mode == "refit" or not self.model_file:
+            return
+        tmp = self.model_file + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"mode": self.mode, "vocabulary": self.vocabulary,
+                         "doc_freq": self.doc_freq, "n_docs": self.n_docs}, f)
+        os.replace(tmp, self.model_file)
+
+    # ---- features ----
+    def _counts(self, texts):
+        if self.mode == "hashing":
+            vec = HashingVectorizer(n_features=self.hash_features, alternate_sign=False, norm=None,
+                                    stop_words="english")
+            return vec.transform(texts)
+        if self.vocabulary is None:
+            vec = CountVectorizer(max_features=self.max_features, stop_words="english")
+            X = vec.fit_transform(texts)
+            self.vocabulary = vec.vocabulary_
+            return X
+        return CountVectorizer(vocabulary=self.vocabulary, stop_words="english").transform(texts)
+
+    def _n_columns(self):
+        return self.hash_features if self.mode == "hashing" else len(self.vocabulary)
+
+    def partial_fit(self, counts):
+        if self.doc_freq is None:
+            self.doc_freq = np.zeros(counts.shape[1], dtype=np.int64)
+        self.doc_freq += np.bincount(counts.indices, minlength=counts.shape[1])[:counts.shape[1]]
+        self.n_docs += counts.shape[0]
+
+    def idf(self):
+        # same smoothing as TfidfVectorizer(smooth_idf=True)
+        return np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq)) + 1.0
+
+    def score(self, texts, update=True):
+        """
+        texts -> np.ndarray of mean TF-IDF weights (sum of the row / number of features).
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros(0)
+        if self.mode == "refit":
+            X = TfidfVectorizer(max_features=self.max_features, stop_words="english").fit_transform(texts)
+            return np.asarray(X.sum(axis=1)).ravel() / max(1, X.shape[1])
+        counts = self._counts(texts).tocsr()
+        counts.sum_duplicates()
+        if update or self.doc_freq is None:
+            self.partial_fit(counts)
+        X = l2_normalize(counts.multiply(self.idf()).tocsr(), norm="l2", copy=False)
+        return np.asarray(X.sum(axis=1)).ravel() / max(1, self._n_columns())
+
+def generate_signal(df, engine=None):
+    if df.empty:
+        return df
+    engine = engine or SparseSignalEngine()
+    with METRICS.phase("signal"):
+        df["signal"] = engine.score(df["content"].astype(str))
+        engine.save()
+    return df
+
+# =================== LEXICON SCORING ===================
+class LexiconMatcher:
+    """
+    Whole-word dictionary matcher for the direction lexicon and NSE instruments,
+    applied to a whole text column per call instead of per tweet.
+
+    Texts are lower-cased, split and stripped of punctuation by Arrow kernels;
+    every token, and every run of words starting at a phrase's first word, is
+    looked up in one hash set of all terms (the same result as an Aho-Corasick
+    pass restricted to word boundaries). Hits are counted per row and class
+    with one bincount. The longest phrase wins, so "bank nifty" counts for
+    BANKNIFTY and not also for NIFTY.
+    """
+    PUNCTUATION = "#$@.,!?:;()[]{}\"'`/\\-*~_+=<>|%^&"
+
+    def __init__(self, bullish=None, bearish=None, tickers=None, chunk_rows=LEXICON_CHUNK_ROWS):
+        bullish = BULLISH_TERMS if bullish is None else bullish
+        bearish = BEARISH_TERMS if bearish is None else bearish
+        tickers = NSE_TICKERS if tickers is None else tickers
+        self.classes = ["bullish", "bearish"] + [f"ticker_{sym.upper()}" for sym in tickers]
+        groups = [bullish, bearish] + list(tickers.values())
+        self.chunk_rows = chunk_rows
+        terms, owner = {}, []
+        for cls, group in enumerate(groups):
+            for term in group:
+                words = term.lower().split()
+                key = " ".join(w.strip(self.PUNCTUATION) for w in words)
+                if not key or key in terms:
+                    continue
+                terms[key] = len(owner)
+                owner.append(cls)
+        self.terms = list(terms)
+        self._owner = np.array(owner, dtype=np.int64)
+        self._value_set = pa.array(self.terms, type=pa.string())
+        heads = collections.defaultdict(set)
+        for term in self.terms:
+            words = term.split(" ")
+            if len(words) > 1:
+                heads[len(words)].add(words[0])
+        # longest phrases first so their words are claimed before shorter terms look
+        self._heads = {n: pa.array(sorted(h), type=pa.string()) for n, h in sorted(heads.items(), reverse=True)}
+
+    @classmethod
+    def from_file(cls, path=LEXICON_FILE):
+        """Matcher built from a JSON lexicon, falling back to the CONFIG lists for missing keys."""
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec.get("bullish"), spec.get("bearish"), spec.get("tickers"))
+
+    def counts(self, texts):
+        """(rows, classes) uint16 hit counts for a sequence / Series / Arrow array of texts."""
+        arr = texts if isinstance(texts, (pa.Array, pa.ChunkedArray)) else pa.array(texts, type=pa.string(),
+                                                                                     from_pandas=True)
+        n = len(arr)
+        out = np.zeros((n, len(self.classes)), dtype=np.uint16)
+        for start in range(0, n, self.chunk_rows):
+            chunk = arr.slice(start, self.chunk_rows)
+            out[start:start + len(chunk)] = self._count_chunk(chunk)
+        return out
+
+    def _count_chunk(self, texts):
+        n_rows, n_classes = len(texts), len(self.classes)
+        tokens = pc.ascii_split_whitespace(pc.ascii_lower(texts.fill_null("")))
+        rows = pc.list_parent_indices(tokens).to_numpy()
+        flat = pc.utf8_trim(pc.list_flatten(tokens), characters=self.PUNCTUATION)
+        claimed = np.zeros(len(flat), dtype=bool)
+        hit_rows, hit_terms = [], []
+        for size, heads in self._heads.items():
+            at = np.flatnonzero(pc.is_in(flat, value_set=heads).to_numpy(zero_copy_only=False))
+            at = at[at + size - 1 < len(flat)]
+            at = at[rows[at] == rows[at + size - 1]]
+            if not len(at):
+                continue
+            phrase = flat.take(at)
+            for k in range(1, size):
+                phrase = pc.binary_join_element_wise(phrase, flat.take(at + k), pa.scalar(" ", flat.type))
+            idx = pc.index_in(phrase, value_set=self._value_set)
+            found = idx.is_valid().to_numpy(zero_copy_only=False)
+            for k in range(size):
+                found &= ~claimed[at + k]
+            at = at[found]
+            for k in range(size):
+                claimed[at + k] = True
+            hit_rows.append(rows[at])
+            hit_terms.append(idx.fill_null(0).to_numpy()[found].astype(np.int64))
+        idx = pc.index_in(flat, value_set=self._value_set)
+        found = idx.is_valid().to_numpy(zero_copy_only=False) & ~claimed
+        hit_rows.append(rows[found])
+        hit_terms.append(idx.fill_null(0).to_numpy()[found].astype(np.int64))
+        keys = np.concatenate(hit_rows) * n_classes + self._owner[np.concatenate(hit_terms)]
+        return np.bincount(keys, minlength=n_rows * n_classes).reshape(n_rows, n_classes)
+
+    def score(self, texts):
+        """
+        DataFrame of bullish/bearish/ticker_* hit counts plus `direction`:
+        (bullish - bearish) / (bullish + bearish), 0 when neither matched.
+        """
+        counts = self.counts(texts)
+        frame = pd.DataFrame(counts, columns=self.classes)
+        bull, bear = counts[:, 0].astype(np.float64), counts[:, 1].astype(np.float64)
+        total = bull + bear
+        frame["direction"] = np.divide(bull - bear, total, out=np.zeros(len(total)), where=total > 0)
+        return frame
+
+@functools.lru_cache(maxsize=None)
+def default_lexicon():
+    if LEXICON_FILE and os.path.exists(LEXICON_FILE):
+        print(f"[INFO] Lexicon loaded from {LEXICON_FILE}.")
+        return LexiconMatcher.from_file(LEXICON_FILE)
+    return LexiconMatcher()
+
+def score_lexicon(df, matcher=None):
+    """
+    Add bullish/bearish/direction and per-ticker hit columns to a cleaned frame.
+    """
     if df.empty:
         return df
-    vectorizer = TfidfVectorizer(max_features=1000, stop_words="english")
-    X = vectorizer.fit_transform(df["content"].astype(str)).toarray()
-    df["signal"] = np.mean(X, axis=1)
+    matcher = matcher or default_lexicon()
+    with METRICS.phase("lexicon"):
+        scores = matcher.score(df["content"])
+        scores.index = df.index
+        df = df.drop(columns=[c for c in scores.columns if c in df.columns])
+        return pd.concat([df, scores], axis=1)
+
+# =================== SIGNAL SERIES ===================
+SERIES_SUMS = ["count", "signal_sum", "weight_sum", "weighted_signal_sum", "likes", "retweets", "replies",
+               "direction_sum"]
+SERIES_ROLLING = ["roll_count", "roll_mean_signal", "roll_ew_signal"]
+
+def engagement_weight(df):
+    """
+    Per-tweet weight for the engagement-weighted signal: 1 + log1p(weighted likes/retweets/replies).
+    """
+    engagement = sum(df[col].fillna(0).to_numpy(dtype=float) * w for col, w in ENGAGEMENT_WEIGHTS.items())
+    return 1.0 + np.log1p(np.maximum(engagement, 0.0))
+
+class SignalSeries:
+    """
+    Per-hashtag signal bars at every interval in SERIES_INTERVALS.
+
+    A bar only stores additive sums (tweet count, signal, engagement weight,
+    weighted signal, likes/retweets/replies), so a new batch is bucketed with
+    one grouped resample per interval and added onto the stored bars; tweets
+    arriving late land in their original bar. The rolling window columns are
+    recomputed only from the earliest bar a batch touched. Each interval is
+    one small Parquet file sorted by (tag, bucket), see read_signal_series();
+    directory=None keeps the bars in memory only.
+    """
+    def __init__(self, directory=SERIES_DIR, intervals=None, rolling=SERIES_ROLLING_WINDOW,
+                 retention=SERIES_RETENTION):
+        self.directory = directory
+        self.intervals = dict(intervals or SERIES_INTERVALS)
+        self.rolling = rolling
+        self.retention = retention
+        self.bars = {label: self._load(label) for label in self.intervals}
+
+    def path(self, label):
+        return os.path.join(self.directory, f"bars_{label}.parquet")
+
+    def _load(self, label):
+        if self.directory and os.path.exists(self.path(label)):
+            bars = pd.read_parquet(self.path(label))
+            bars["tag"] = bars["tag"].astype(str)
+            for col in SERIES_SUMS:
+                if col not in bars:
+                    # bars written before the column existed
+                    bars[col] = 0.0
+            return bars.set_index(["tag", "bucket"]).sort_index()
+        index = pd.MultiIndex.from_arrays([pd.Series([], dtype=object), pd.Series([], dtype="datetime64[ns, UTC]")],
+                                          names=["tag", "bucket"])
+        return pd.DataFrame({c: pd.Series([], dtype=float) for c in SERIES_SUMS + SERIES_ROLLING}, index=index)
+
+    def update(self, df, hashtag=None, replace=False):
+        """
+        Fold a scored batch (timestamp, signal, likes, retweets, replies and
+        a `query` column or `hashtag`) into every interval.
+
+        replace=True is for batches holding *every* tweet of the span they
+        cover (e.g. the 24h cleaned window): from each tag's first whole bar
+        on, their bars replace the stored ones instead of being added, so
+        tweets seen by an earlier run are not counted twice.
+        Returns {label: bars touched}.
+        """
+        if df is None or df.empty:
+            return {}
+        with METRICS.phase("series"):
+            tags = df["query"] if "query" in df else pd.Series(None, index=df.index, dtype=object)
+            if hashtag is not None:
+                tags = tags.fillna(hashtag)
+            frame = pd.DataFrame({
+                "tag": tags.to_numpy(),
+                "timestamp": pd.to_datetime(df["timestamp"], utc=True, errors="coerce").to_numpy(),
+                "count": 1.0,
+                "signal_sum": df["signal"].to_numpy(dtype=float),
+                "likes": df["likes"].fillna(0).to_numpy(dtype=float),
+                "retweets": df["retweets"].fillna(0).to_numpy(dtype=float),
+                "replies": df["replies"].fillna(0).to_numpy(dtype=float),
+                "direction_sum": df["direction"].to_numpy(dtype=float) if "direction" in df else 0.0,
+            })
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+            frame = frame[frame["timestamp"].notna() & frame["tag"].notna()]
+            if frame.empty:
+                return {}
+            frame["weight_sum"] = engagement_weight(frame)
+            frame["weighted_signal_sum"] = frame["signal_sum"] * frame["weight_sum"]
+            first_seen = frame.groupby("tag")["timestamp"].min()
+
+            touched = {}
+            for label, freq in self.intervals.items():
+                new = (frame.groupby(["tag", pd.Grouper(key="timestamp", freq=freq)])[SERIES_SUMS].sum()
+                       .rename_axis(["tag", "bucket"]))
+                new = new[new["count"] > 0]
+                bars = self.bars[label]
+                if replace:
+                    # the first bar may be only partly inside the batch; it is left as stored
+                    starts = first_seen.dt.ceil(freq)
+                    new_tags = new.index.get_level_values("tag")
+                    new = new[new.index.get_level_values("bucket") >= starts.reindex(new_tags).to_numpy()]
+                    ends = new.reset_index().groupby("tag")["bucket"].max()
+                    old_tags = bars.index.get_level_values("tag")
+                    old_buckets = bars.index.get_level_values("bucket")
+                    start_of = starts.reindex(old_tags).to_numpy()
+                    end_of = ends.reindex(old_tags).to_numpy()
+                    replaced = pd.notna(end_of) & (old_buckets >= start_of) & (old_buckets <= end_of)
+                    bars = bars[~replaced]
+                    sums = pd.concat([bars[SERIES_SUMS], new])
+                else:
+                    sums = bars[SERIES_SUMS].add(new, fill_value=0)
+                merged = sums.join(bars[SERIES_ROLLING]).sort_index()
+                since = new.reset_index().groupby("tag")["bucket"].min()
+                self.bars[label] = self._derive(merged, since)
+                touched[label] = len(new)
+            return touched
+
+    def _derive(self, bars, since):
+        if self.retention and len(bars):
+            bars = bars[bars.index.get_level_values("bucket") >= bars.index.get_level_values("bucket").max()
+                        - self.retention]
+        bars = bars.copy()
+        bars["mean_signal"] = bars["signal_sum"] / bars["count"]
+        bars["ew_signal"] = bars["weighted_signal_sum"] / bars["weight_sum"]
+        bars["mean_direction"] = bars["direction_sum"] / bars["count"]
+        for tag, start in since.items():
+            g = bars.xs(tag, level="tag")
+            # only bars that can still reach a changed bar take part in the window
+            window = g.loc[g.index >= start - self.rolling, ["count", "signal_sum", "weight_sum",
+                                                             "weighted_signal_sum"]].rolling(self.rolling).sum()
+            window = window[window.index >= start]
+            rows = pd.MultiIndex.from_arrays([[tag] * len(window), window.index], names=["tag", "bucket"])
+            bars.loc[rows, "roll_count"] = window["count"].to_numpy()
+            bars.loc[rows, "roll_mean_signal"] = (window["signal_sum"] / window["count"]).to_numpy()
+            bars.loc[rows, "roll_ew_signal"] = (window["weighted_signal_sum"] / window["weight_sum"]).to_numpy()
+        return bars
+
+    def frame(self, label, hashtags=None, start=None, end=None):
+        """Bars of one interval as a flat DataFrame (tag, bucket, ...)."""
+        bars = self.bars[label].reset_index()
+        if hashtags:
+            bars = bars[bars["tag"].isin(list(hashtags))]
+        if start is not None:
+            bars = bars[bars["bucket"] >= pd.Timestamp(start)]
+        if end is not None:
+            bars = bars[bars["bucket"] <= pd.Timestamp(end)]
+        return bars
+
+    def save(self):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for label in self.intervals:
+            table = pa.Table.from_pandas(self.frame(label), schema=series_schema(), preserve_index=False)
+            tmp = self.path(label) + ".tmp"
+            pq.write_table(table, tmp, compression="zstd", row_group_size=50_000)
+            os.replace(tmp, self.path(label))
+
+@functools.lru_cache(maxsize=None)
+def series_schema():
+    return pa.schema([("tag", pa.dictionary(pa.int32(), pa.string())),
+                      ("bucket", pa.timestamp("ns", tz="UTC"))]
+                     + [(c, pa.float64()) for c in SERIES_SUMS + SERIES_ROLLING]
+                     + [("mean_signal", pa.float64()), ("ew_signal", pa.float64()),
+                        ("mean_direction", pa.float64())])
+
+def read_signal_series(interval="5m", hashtags=None, start=None, end=None, columns=None, directory=SERIES_DIR):
+    """
+    Read stored bars for downstream jobs. Filters are pushed into the Parquet
+    reader, so only the matching row groups are decoded.
+    """
+    path = os.path.join(directory, f"bars_{interval}.parquet")
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=series_schema().names)
+    flt = []
+    if hashtags:
+        flt.append(("tag", "in", list(hashtags)))
+    if start is not None:
+        flt.append(("bucket", ">=", pd.Timestamp(start)))
+    if end is not None:
+        flt.append(("bucket", "<=", pd.Timestamp(end)))
+    df = pq.read_table(path, columns=columns, filters=flt or None).to_pandas()
+    if "tag" in df:
+        df["tag"] = df["tag"].astype(str)
     return df
 
-def plot_signals(df, sample_size=500):
+# =================== REPORTING ===================
+def bin_signals(df, bins=REPORT_BINS, interval=REPORT_INTERVAL, max_points=REPORT_MAX_POINTS):
+    """
+    Pre-bin a scored frame for render_report: a histogram of every signal
+    and, per hashtag (`query`), mean signal and tweet count per `interval`
+    (widened so no line has more than max_points bins). All vectorized
+    (np.histogram / np.bincount), nothing is sampled; the result is a small
+    dict of arrays that is cheap to hand to the report process.
+    """
+    signal = pd.to_numeric(df["signal"], errors="coerce").to_numpy(dtype=np.float64)
+    finite = np.isfinite(signal)
+    counts, edges = np.histogram(signal[finite], bins=bins)
+    out = {"generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "rows": int(len(df)),
+           "hist_counts": counts, "hist_edges": edges, "stats": {}, "series": {}}
+    if finite.any():
+        p5, p50, p95 = np.percentile(signal[finite], [5, 50, 95])
+        out["stats"] = {"scored": int(finite.sum()), "mean": float(signal[finite].mean()),
+                        "std": float(signal[finite].std()), "p5": float(p5), "p50": float(p50), "p95": float(p95)}
+
+    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce", format="ISO8601").to_numpy(dtype="datetime64[ns]")
+    ns = ts.view(np.int64)
+    tags = df["query"].fillna("all").astype(str) if "query" in df else pd.Series("all", index=df.index)
+    keep = finite & ~np.isnat(ts)
+    if not keep.any():
+        return out
+    tag_codes, tag_names = pd.factorize(tags.to_numpy()[keep])
+    ns, signal = ns[keep], signal[keep]
+    step = int(pd.Timedelta(interval).value)
+    start = ns.min() // step * step
+    n_bins = int((ns.max() - start) // step) + 1
+    if n_bins > max_points:
+        step *= -(-n_bins // max_points)
+        start = ns.min() // step * step
+        n_bins = int((ns.max() - start) // step) + 1
+    key = tag_codes * n_bins + (ns - start) // step
+    size = len(tag_names) * n_bins
+    tweets = np.bincount(key, minlength=size).reshape(len(tag_names), n_bins)
+    sums = np.bincount(key, weights=signal, minlength=size).reshape(len(tag_names), n_bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(tweets > 0, sums / tweets, np.nan)
+    times = (start + step * np.arange(n_bins)).astype("datetime64[ns]")
+    out["interval_seconds"] = step / 1e9
+    for i, tag in enumerate(tag_names):
+        out["series"][str(tag)] = {"time": times, "mean": means[i], "tweets": tweets[i]}
+    return out
+
+def render_report(binned, directory=REPORT_DIR):
+    """
+    Worker side: draw binned signals (see bin_signals) with the Agg backend
+    into signal_distribution.png and signal_series.png and write
+    signal_report.html next to them. Returns the paths written.
+    Matplotlib is imported here only, so it stays out of the collecting process.
+    """
+    import html
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+
+    def _save(fig, name):
+        path = os.path.join(directory, name)
+        tmp = path + ".tmp.png"
+        fig.savefig(tmp, dpi=110, bbox_inches="tight")
+        plt.close(fig)
+        os.replace(tmp, path)
+        paths.append(path)
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    edges = binned["hist_edges"]
+    ax.stairs(binned["hist_counts"], edges, fill=True)
+    ax.set_title(f"Distribution of Tweet Signals ({binned['stats'].get('scored', 0):,} tweets)")
+    ax.set_xlabel("Signal Score")
+    ax.set_ylabel("Count")
+    _save(fig, "signal_distribution.png")
+
+    series = binned["series"]
+    if series:
+        fig, (top, bottom) = plt.subplots(2, 1, figsize=(11, 6), sharex=True,
+                                           gridspec_kw={"height_ratios": (2, 1)})
+        for tag, s in series.items():
+            top.plot(s["time"], s["mean"], label=tag, linewidth=1)
+            bottom.step(s["time"], s["tweets"], where="post", linewidth=1)
+        top.set_ylabel("Mean signal")
+        top.legend(loc="upper left", fontsize="small")
+        bottom.set_ylabel("Tweets")
+        top.set_title(f"Signal per hashtag ({binned['interval_seconds'] / 60:g} min bins)")
+        fig.autofmt_xdate()
+        _save(fig, "signal_series.png")
+
+    stats = "".join(f"<tr><th>{k}</th><td>{v:.6g}</td></tr>" for k, v in binned["stats"].items())
+    tags = "".join(
+        f"<tr><td>{html.escape(tag)}</td><td>{int(s['tweets'].sum()):,}</td>"
+        f"<td>{np.nansum(s['mean'] * s['tweets']) / max(1, s['tweets'].sum()):.6g}</td></tr>"
+        for tag, s in series.items())
+    images = "".join(f'<p><img src="{os.path.basename(p)}" alt="{os.path.basename(p)}"></p>' for p in paths)
+    page = (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Signal report</title></head><body>"
+            f"<h1>Signal report</h1><p>Generated {binned['generated_at']} from {binned['rows']:,} tweets.</p>"
+            f"<table>{stats}</table>{images}"
+            f"<table><tr><th>Hashtag</th><th>Tweets</th><th>Mean signal</th></tr>{tags}</table></body></html>")
+    path = os.path.join(directory, "signal_report.html")
+    _atomic_write_bytes(path, page.encode("utf-8"))
+    paths.append(path)
+    return paths
+
+class ReportWorker:
+    """
+    One background process (spawned on first use) that renders reports, so
+    collection and scoring never wait for matplotlib's import or drawing.
+    submit() bins in the caller (cheap, vectorized) and returns a Future;
+    close() waits for what is queued and stops the process.
+    """
+    def __init__(self, directory=REPORT_DIR):
+        self.directory = directory
+        self._executor = None
+        self._futures = []
+
+    def submit(self, df):
+        if self._executor is None:
+            import multiprocessing
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        with METRICS.phase("report_bin"):
+            binned = bin_signals(df)
+        future = self._executor.submit(render_report, binned, self.directory)
+        self._futures = [f for f in self._futures if not f.done()] + [future]
+        return future
+
+    def close(self, wait=True):
+        if self._executor is None:
+            return
+        if wait:
+            for future in self._futures:
+                try:
+                    paths = future.result()
+                    print(f"[INFO] Wrote signal report: {', '.join(paths)}")
+                except Exception as e:
+                    print(f"[ERROR] Rendering the signal report failed: {e}", file=sys.stderr)
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._executor = None
+        self._futures = []
+
+_REPORT_WORKER = None
+
+def default_report_worker():
+    global _REPORT_WORKER
+    if _REPORT_WORKER is None:
+        _REPORT_WORKER = ReportWorker()
+    return _REPORT_WORKER
+
+def plot_signals(df):
+    """
+    Queue a headless report (PNG + HTML in REPORT_DIR) of the signal
+    distribution and per-hashtag series; returns the render Future, or None.
+    """
     if df.empty:
         print("[WARN] Nothing to plot.")
-        return
-    plot_df = df.sample(min(sample_size, len(df)), random_state=42)
-    plt.figure(figsize=(10, 4))
-    plt.hist(plot_df["signal"], bins=30)
-    plt.title("Distribution of Tweet Signals")
-    plt.xlabel("Signal Score")
-    plt.ylabel("Count")
-    plt.show()
+        return None
+    return default_report_worker().submit(df)
+
+def close_reports(wait=True):
+    """Wait for queued reports (wait=True) and stop the report process."""
+    if _REPORT_WORKER is not None:
+        _REPORT_WORKER.close(wait)
+
+# =================== DAEMON MODE ===================
+def market_is_open(now=None):
+    """
+    True during NSE cash-market hours (MARKET_HOURS, Mon-Fri, local time).
+    `now` is a unix timestamp or an aware datetime; defaults to the current time.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif not isinstance(now, datetime):
+        now = datetime.fromtimestamp(now, timezone.utc)
+    local = now.astimezone(timezone.utc) + MARKET_UTC_OFFSET
+    (open_h, open_m), (close_h, close_m) = MARKET_HOURS
+    minutes = local.hour * 60 + local.minute
+    return local.weekday() < 5 and open_h * 60 + open_m <= minutes < close_h * 60 + close_m
+
+class AdaptivePoller:
+    """
+    Poll schedule for one hashtag.
+
+    Keeps an EWMA of the tag's tweet rate (new tweets per second between
+    polls) and schedules the next poll for when about `target` new tweets
+    should be waiting: busy tags are polled often, quiet ones rarely. The
+    interval is divided by MARKET_BOOST while the market is open and clamped
+    to [min_interval, max_interval].
+    """
+    def __init__(self, hashtag, min_interval=DAEMON_MIN_INTERVAL, max_interval=DAEMON_MAX_INTERVAL,
+                 target=DAEMON_TARGET_NEW_PER_POLL, alpha=DAEMON_RATE_ALPHA, boost=MARKET_BOOST):
+        self.hashtag = hashtag
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target = target
+        self.alpha = alpha
+        self.boost = boost
+        self.rate = None        # tweets per second
+        self.last_poll = None
+        self.next_due = 0.0     # due right away
+
+    def interval(self, now):
+        if not self.rate:
+            seconds = self.max_interval if self.rate == 0 else self.min_interval
+        else:
+            seconds = self.target / self.rate
+        if market_is_open(now):
+            seconds /= self.boost
+        return min(self.max_interval, max(self.min_interval, seconds))
+
+    def observe(self, tweets, now, saturated=False):
+        """
+        Fold one poll's result into the rate and schedule the next poll.
+        On the first poll the rate comes from the spread of the tweets'
+        timestamps; `saturated` (the poll hit its tweet cap) means more were
+        waiting, so the sample is doubled.
+        """
+        sample = None
+        if self.last_poll is not None and now > self.last_poll:
+            sample = len(tweets) / (now - self.last_poll)
+        else:
+            sample = _rate_from_timestamps(tweets)
+        if sample is not None:
+            if saturated:
+                sample *= 2
+            self.rate = sample if self.rate is None else self.alpha * sample + (1 - self.alpha) * self.rate
+        self.last_poll = now
+        self.next_due = now + self.interval(now)
+        return self.next_due
+
+def _rate_from_timestamps(tweets):
+    raw = tweets.column("timestamp") if isinstance(tweets, TweetBuffer) else [t.get("timestamp") for t in tweets]
+    stamps = sorted(ts for ts in pd.to_datetime(raw, utc=True, errors="coerce") if not pd.isna(ts))
+    if len(stamps) < 2:
+        return 0.0 if not tweets else None
+    span = (stamps[-1] - stamps[0]).total_seconds()
+    return (len(stamps) - 1) / span if span > 0 else None
+
+class RequestBudget:
+    """
+    At most `limit` searches in any sliding `window` seconds across all tags.
+    """
+    def __init__(self, limit=DAEMON_REQUEST_BUDGET, window=DAEMON_BUDGET_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._spent = collections.deque()
+
+    def _expire(self, now):
+        while self._spent and self._spent[0] <= now - self.window:
+            self._spent.popleft()
+
+    def wait_time(self, now):
+        """Seconds until one more request fits in the budget (0 if it fits now)."""
+        self._expire(now)
+        if not self.limit or len(self._spent) < self.limit:
+            return 0.0
+        return self._spent[0] + self.window - now
+
+    def spend(self, now):
+        self._expire(now)
+        self._spent.append(now)
+
+    def remaining(self, now):
+        self._expire(now)
+        return max(0, self.limit - len(self._spent)) if self.limit else None
+
+@functools.lru_cache(maxsize=None)
+def scored_schema():
+    # tweet_schema() plus the scores; timestamps stay ISO strings so the store's range filters apply
+    return tweet_schema().append(pa.field("signal", pa.float64())).append(pa.field("direction", pa.float64()))
+
+def scored_table(df, hashtag):
+    """
+    Cleaned + scored DataFrame -> Arrow table in scored_schema().
+    """
+    out = df.copy()
+    if pd.api.types.is_datetime64_any_dtype(out["timestamp"]):
+        out["timestamp"] = out["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3] + "Z"
+    table = records_to_table(out.to_dict("records"), hashtag)
+    table = table.append_column("signal", pa.array(out["signal"].to_numpy(dtype=float), type=pa.float64()))
+    direction = out["direction"].to_numpy(dtype=float) if "direction" in out else None
+    return table.append_column("direction", pa.array(direction if direction is not None else [None] * len(out),
+                                                     type=pa.float64()))
+
+def score_new_tweets(tweets, hashtag, engine, signal_store, series=None, near_dups=None):
+    """
+    Clean and score one poll's new tweets, append them to `signal_store` and
+    add them to the hashtag's signal bars. The engine's running IDF absorbs
+    the batch, so nothing is refit.
+    """
+    cleaned = clean_tweets(tweets, near_dups)
+    if cleaned.empty:
+        return cleaned
+    cleaned = generate_signal(cleaned, engine=engine)
+    if LEXICON_SCORING:
+        cleaned = score_lexicon(cleaned)
+    with METRICS.phase("save"):
+        signal_store.append(scored_table(cleaned, hashtag), hashtag)
+    if series is not None:
+        series.update(cleaned, hashtag=hashtag)
+        series.save()
+    return cleaned
+
+def run_daemon(hashtags=None, driver=None, login=login_driver, max_polls=None, clock=time.time,
+               sleep=time.sleep, store=None, index=None, engine=None, signal_store=None, throttle=None,
+               near_dups=None):
+    """
+    Long-running collection: one session of the configured COLLECTOR_BACKEND
+    kept alive (unless `driver` is given), every hashtag polled on its own
+    AdaptivePoller schedule within the RequestBudget and the Throttle (a tag
+    that hits an error page cools down while the others keep being polled).
+    New tweets go to the partitioned store as each poll finishes and are
+    cleaned and scored incrementally into SIGNAL_STORE_DIR. Stops after
+    `max_polls` (None = until interrupted).
+    """
+    hashtags = list(hashtags or HASHTAGS)
+    own_driver = driver is None
+    if own_driver:
+        if COLLECTOR_BACKEND == "http":
+            driver, login = HttpCollector(), HttpCollector.login
+        else:
+            driver = init_driver()
+    if login is not None:
+        login(driver)
+    report_startup()
+    store = store or PartitionedTweetStore()
+    import_legacy_data_file(store)
+    index = index if index is not None else TweetIdIndex()
+    if engine is None:
+        engine = SparseSignalEngine(mode="incremental" if SIGNAL_MODE == "refit" else SIGNAL_MODE)
+    signal_store = signal_store or PartitionedTweetStore(SIGNAL_STORE_DIR, schema=scored_schema())
+    series = SignalSeries()
+    if near_dups is None and NEAR_DUP_MODE != "off":
+        near_dups = default_near_duplicate_index()
+    reports = ReportWorker()
+    pollers = {tag: AdaptivePoller(tag) for tag in hashtags}
+    budget = RequestBudget()
+    throttle = throttle or Throttle(clock=clock)
+    store.start_background_compaction()
+    signal_store.start_background_compaction()
+    polls = 0
+    print(f"[DAEMON] Polling {', '.join(hashtags)} (budget {budget.limit} searches / {budget.window}s).")
+    try:
+        while max_polls is None or polls < max_polls:
+            now = clock()
+            # earliest of (schedule, throttle) per tag; only throttle/budget waits count as throttled time
+            due = {}
+            for p in pollers.values():
+                held_until, reason = throttle.ready_at(p.hashtag, "daemon")
+                due[p.hashtag] = (p.next_due, None) if p.next_due >= held_until else (held_until, reason)
+            tag = min(due, key=lambda t: due[t][0])
+            poller = pollers[tag]
+            start_at, reason = due[tag]
+            if now + budget.wait_time(now) > start_at:
+                start_at, reason = now + budget.wait_time(now), "budget"
+            if start_at > now:
+                throttle.wait(start_at - now, reason, sleep)
+                continue
+            budget.spend(now)
+            throttle.acquire(tag, "daemon")
+            failed = True
+            try:
+                tweets = collect_tag(driver, tag, index=index, max_tweets=DAEMON_MAX_TWEETS_PER_POLL, min_tweets=0)
+                throttle.success(tag, "daemon")
+                failed = False
+            except TwitterErrorPage as e:
+                print(f"[WARN] {e}; polling other tags meanwhile.")
+                tweets = e.tweets
+                throttle.failure(tag, "daemon", session_wide=True)
+            except Exception as e:
+                print(f"[ERROR] Poll of {tag} failed: {e}", file=sys.stderr)
+                tweets = TweetBuffer()
+                throttle.failure(tag, "daemon")
+                if login is not None and session_lost(driver):
+                    print("[WARN] Session no longer logged in; logging in again.")
+                    login(driver)
+            if tweets and save_batch(store, tweets, tag):
+                index.add_many(tweets.column("tweet_id"), hashtag=tag)
+                try:
+                    score_new_tweets(tweets, tag, engine, signal_store, series, near_dups)
+                except Exception as e:
+                    print(f"[ERROR] Scoring {tag} failed: {e}", file=sys.stderr)
+            polls += 1
+            METRICS.inc("daemon_polls", hashtag=tag)
+            METRICS.inc("daemon_new_tweets", len(tweets), hashtag=tag)
+            if failed:
+                # the tag's breaker decides when it is tried again
+                continue
+            next_due = poller.observe(tweets, clock(), saturated=len(tweets) >= DAEMON_MAX_TWEETS_PER_POLL)
+            rate = f"{poller.rate * 60:.1f}/min" if poller.rate is not None else "n/a"
+            print(f"[DAEMON] {tag}: {len(tweets)} new, rate {rate}, next poll in {int(next_due - clock())}s "
+                  f"({budget.remaining(clock())} searches left in budget).")
+            if polls % DAEMON_FLUSH_EVERY == 0:
+                index.flush()
+                if near_dups is not None:
+                    near_dups.flush()
+            if DAEMON_REPORT_EVERY and polls % DAEMON_REPORT_EVERY == 0:
+                try:
+                    recent = signal_store.read(start=datetime.fromtimestamp(clock(), timezone.utc) - CLEAN_WINDOW)
+                    if not recent.empty:
+                        reports.submit(recent)
+                except Exception as e:
+                    print(f"[ERROR] Queuing the signal report failed: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("[DAEMON] Interrupted; shutting down.")
+    finally:
+        index.flush()
+        if near_dups is not None:
+            near_dups.flush()
+        store.stop_background_compaction()
+        signal_store.stop_background_compaction()
+        store.compact()
+        signal_store.compact()
+        if own_driver:
+            driver.quit()
+        reports.close()
+        throttle.print_summary()
+    return polls
+
+# =================== STREAMING PIPELINE ===================
+_PIPELINE_STOP = object()
+
+class PipelineError(RuntimeError):
+    """
+    Raised by StreamingPipeline.close() when a stage failed on some batch;
+    `errors` lists (stage, hashtag, exception) and the first is the cause.
+    """
+    def __init__(self, errors):
+        stage, hashtag, exc = errors[0]
+        super().__init__(f"{len(errors)} pipeline batch(es) failed; first in stage {stage} for {hashtag}: {exc}")
+        self.errors = errors
+
+class StreamingPipeline:
+    """
+    Overlaps scraping with analysis. The collectors hand every scroll batch
+    to submit(); one thread per stage then saves it raw (store + tweet
+    index), cleans it, scores it and persists the scores (signal store +
+    signal bars), so a tweet's signal is written seconds after it was
+    scraped instead of after the last hashtag. Stages are connected by
+    bounded queues: a full queue blocks submit(), which throttles the
+    scraper rather than piling batches up in memory. close() (or leaving
+    the `with` block) sends a sentinel down the stages, waits for every
+    queued batch, flushes the indexes and raises PipelineError if any
+    stage failed.
+
+    Unlike collect_then_analyze, each batch is cleaned on its own (exact
+    duplicates are only dropped against earlier batches of this run) and
+    scored without a refit: SIGNAL_MODE "refit" scores incrementally here.
+    """
+    STAGES = ("save", "clean", "score", "persist")
+
+    def __init__(self, store=None, index=None, engine=None, signal_store=None, series=None, near_dups=None,
+                 maxsize=PIPELINE_QUEUE_BATCHES):
+        self.store = store or PartitionedTweetStore()
+        if index is None and USE_TWEET_INDEX:
+            index = TweetIdIndex()
+        self.index = index
+        if engine is None:
+            engine = SparseSignalEngine(mode="incremental" if SIGNAL_MODE == "refit" else SIGNAL_MODE)
+        self.engine = engine
+        self.signal_store = signal_store or PartitionedTweetStore(SIGNAL_STORE_DIR, schema=scored_schema())
+        self.series = series if series is not None else SignalSeries()
+        if near_dups is None and NEAR_DUP_MODE != "off":
+            near_dups = default_near_duplicate_index()
+        self.near_dups = near_dups
+        self.latencies = []   # seconds from submit() to the batch's scores being persisted
+        self.stats = {"batches": 0, "tweets": 0, "scored": 0, "errors": 0}
+        self.errors = []      # (stage, hashtag, exception) of every failed batch
+        self._lock = threading.Lock()
+        self._submitted = set()
+        self._content_hashes = set()   # clean stage only
+        self._closed = False
+        self._queues = [queue.Queue(maxsize=max(1, int(maxsize))) for _ in self.STAGES]
+        self._threads = []
+        for i, name in enumerate(self.STAGES):
+            outbox = self._queues[i + 1] if i + 1 < len(self.STAGES) else None
+            t = threading.Thread(target=self._run_stage, args=(name, getattr(self, f"_{name}"), self._queues[i], outbox),
+                                 name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # an exception already leaving the block is not masked by stage errors
+        self.close(raise_errors=exc_type is None)
+
+    def submit(self, hashtag, tweets):
+        """
+        Queue one batch (a TweetBuffer) for `hashtag`; blocks while the first
+        stage is full. Tweets submitted before (say, re-collected after an
+        error page) are skipped.
+        """
+        if self._closed:
+            raise RuntimeError("StreamingPipeline is closed")
+        ids = tweets.column("tweet_id")
+        with self._lock:
+            keep = [i for i, tid in enumerate(ids) if not tid or tid not in self._submitted]
+            self._submitted.update(ids[i] for i in keep if ids[i])
+            if keep:
+                self.stats["batches"] += 1
+                self.stats["tweets"] += len(keep)
+        if not keep:
+            return
+        if len(keep) < len(tweets):
+            tweets = tweets.take(keep)
+        batch = {"hashtag": hashtag, "tweets": tweets, "frame": None, "submitted_at": time.monotonic()}
+        with METRICS.phase("pipeline_wait"):
+            self._queues[0].put(batch)
+
+    def _run_stage(self, name, fn, inbox, outbox):
+        while True:
+            batch = inbox.get()
+            if batch is _PIPELINE_STOP:
+                if outbox is not None:
+                    outbox.put(batch)
+                return
+            try:
+                out = fn(batch)
+            except Exception as e:
+                print(f"[ERROR] Pipeline stage {name} failed for {batch['hashtag']}: {e}", file=sys.stderr)
+                METRICS.inc("pipeline_errors", stage=name)
+                with self._lock:
+                    self.stats["errors"] += 1
+                    self.errors.append((name, batch["hashtag"], e))
+                continue
+            if out is None:
+                continue
+            if outbox is not None:
+                outbox.put(out)
+            else:
+                self._done(out)
+
+    def _save(self, batch):
+        if not save_batch(self.store, batch["tweets"], batch["hashtag"]):
+            raise RuntimeError(f"{len(batch['tweets'])} tweets were not saved")
+        if self.index is not None:
+            self.index.add_many(batch["tweets"].column("tweet_id"), hashtag=batch["hashtag"])
+        return batch
+
+    def _clean(self, batch):
+        # exact-duplicate content across batches too, like _clean_stored across record batches
+        tweets = batch["tweets"]
+        hashes = pd.util.hash_pandas_object(pa.array(tweets.column("content"), type=pa.string()).to_pandas(),
+                                            index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        keep &= np.fromiter((h not in self._content_hashes for h in hashes.tolist()), dtype=bool, count=len(hashes))
+        if not keep.all():
+            tweets, hashes = tweets.take(np.flatnonzero(keep)), hashes[keep]
+        frame = clean_tweets(tweets, self.near_dups)
+        if frame.empty:
+            return None
+        self._content_hashes.update(hashes[frame.index.to_numpy()].tolist())
+        batch["frame"] = frame
+        return batch
+
+    def _score(self, batch):
+        frame = generate_signal(batch["frame"], engine=self.engine)
+        if LEXICON_SCORING:
+            frame = score_lexicon(frame)
+        batch["frame"] = frame
+        return batch
+
+    def _persist(self, batch):
+        hashtag = batch["hashtag"]
+        with METRICS.phase("save"):
+            self.signal_store.append(scored_table(batch["frame"], hashtag), hashtag)
+        self.series.update(batch["frame"], hashtag=hashtag)
+        if self._queues[-1].empty():
+            # under backlog the bars are written once the queue catches up (and on close)
+            self.series.save()
+        return batch
+
+    def _done(self, batch):
+        latency = time.monotonic() - batch["submitted_at"]
+        with self._lock:
+            self.latencies.append(latency)
+            self.stats["scored"] += len(batch["frame"])
+        METRICS.inc("pipeline_scored_tweets", len(batch["frame"]), hashtag=batch["hashtag"])
+
+    def close(self, raise_errors=True):
+        """
+        Drain every queued batch, stop the stage threads and flush what they
+        wrote; then raise PipelineError if a stage failed (unless raise_errors=False).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queues[0].put(_PIPELINE_STOP)
+        for t in self._threads:
+            t.join()
+        self.series.save()
+        if self.index is not None:
+            self.index.flush()
+        if self.near_dups is not None:
+            self.near_dups.flush()
+        self.store.compact()
+        self.signal_store.compact()
+        self.print_summary()
+        if self.errors and raise_errors:
+            raise PipelineError(list(self.errors)) from self.errors[0][2]
+
+    def report(self):
+        with self._lock:
+            lat = np.array(self.latencies)
+            rep = dict(self.stats)
+        if len(lat):
+            rep.update(latency_p50=float(np.percentile(lat, 50)), latency_p95=float(np.percentile(lat, 95)),
+                       latency_max=float(lat.max()))
+        return rep
+
+    def print_summary(self):
+        rep = self.report()
+        line = (f"[INFO] Pipeline: {rep['tweets']} tweets in {rep['batches']} batches, {rep['scored']} scored, "
+                f"{rep['errors']} stage errors")
+        if "latency_p50" in rep:
+            line += (f"; scrape-to-signal p50 {rep['latency_p50']:.2f}s, p95 {rep['latency_p95']:.2f}s, "
+                     f"max {rep['latency_max']:.2f}s")
+        print(line + ".")
+
+# =================== BATCH ANALYSIS ===================
+def history_shards(store, start=None, end=None, hashtags=None, shard_by=HISTORY_SHARD_BY):
+    """
+    [(key, [part files])] sorted by key: one shard per tweet date or per hashtag.
+    """
+    if shard_by not in ("date", "tag"):
+        raise ValueError(f"Unknown shard_by: {shard_by}")
+    groups = collections.defaultdict(list)
+    for date, tag, directory in store.partitions(start, end, hashtags):
+        groups[date if shard_by == "date" else tag].extend(sorted(glob.glob(os.path.join(directory, "*.parquet"))))
+    return sorted((key, files) for key, files in groups.items() if files)
+
+def _shard_file(scratch, n, name):
+    return os.path.join(scratch, f"shard-{n:05d}.{name}")
+
+def _history_clean_shard(n, files, scratch, start, end, num_perm, shingle):
+    # worker, phase 1: memory-mapped read, normalize, order, exact dedup and signatures for one shard
+    flt = []
+    if start is not None:
+        flt.append(("timestamp", ">=", _iso_utc(start)))
+    if end is not None:
+        flt.append(("timestamp", "<=", _iso_utc(end)))
+    table = pq.read_table(files, schema=tweet_schema(), filters=flt or None, memory_map=True)
+    df = table.to_pandas()
+    df["content"] = nfkc_normalize(df["content"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce", format="ISO8601")
+    df = df[df["timestamp"].notna() & df["content"].notna()]
+    # part files come in arbitrary order; sorting makes every later step independent of it
+    df = df.sort_values(["timestamp", "tweet_id"], kind="stable").drop_duplicates(subset=["content"])
+    df["content_hash"] = pd.util.hash_pandas_object(df["content"], index=False).to_numpy()
+    content = pa.array(df["content"], type=pa.string(), from_pandas=True)
+    signatures = np.zeros((len(df), num_perm), dtype=np.uint32)
+    empty = np.zeros(len(df), dtype=bool)
+    for i in range(0, len(df), NEAR_DUP_CHUNK_ROWS):
+        chunk = content.slice(i, NEAR_DUP_CHUNK_ROWS)
+        signatures[i:i + len(chunk)], empty[i:i + len(chunk)] = minhash_signatures(chunk, num_perm, shingle)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), _shard_file(scratch, n, "clean.parquet"))
+    np.save(_shard_file(scratch, n, "signatures.npy"), signatures)
+    np.save(_shard_file(scratch, n, "empty.npy"), empty)
+    return table.num_rows, len(df)
+
+def _history_kept(scratch, n):
+    df = pq.read_table(_shard_file(scratch, n, "clean.parquet"), memory_map=True).to_pandas()
+    marks = np.load(_shard_file(scratch, n, "marks.npz"))
+    df["dup_cluster"] = marks["dup_cluster"]
+    df["near_duplicate"] = marks["near_duplicate"]
+    return df[marks["keep"]].drop(columns=["content_hash"])
+
+def _history_term_stats(n, scratch, mode, hash_features):
+    # worker, phase 2: document frequencies of the shard's kept tweets for the global IDF
+    texts = _history_kept(scratch, n)["content"].astype(str).tolist()
+    if not texts:
+        return None
+    if mode == "hashing":
+        counts = SparseSignalEngine(mode="hashing", model_file=None, hash_features=hash_features)._counts(texts)
+        counts = counts.tocsr()
+        counts.sum_duplicates()
+        return None, np.bincount(counts.indices, minlength=counts.shape[1]), len(texts)
+    vec = CountVectorizer(stop_words="english")
+    counts = vec.fit_transform(texts)
+    terms = vec.get_feature_names_out()
+    term_freq = np.asarray(counts.sum(axis=0)).ravel()
+    counts.data[:] = 1
+    return (terms, term_freq), np.asarray(counts.sum(axis=0)).ravel(), len(texts)
+
+def global_signal_engine(stats, mode=SIGNAL_MODE, max_features=SIGNAL_MAX_FEATURES,
+                         hash_features=SIGNAL_HASH_FEATURES):
+    """
+    One engine from per-shard term statistics: the vocabulary is the
+    `max_features` most frequent terms overall (ties alphabetical, like
+    CountVectorizer) and the IDF counts every shard's documents, so shards
+    score exactly as if the whole history had been fitted at once.
+    """
+    stats = [s for s in stats if s is not None]
+    if mode == "hashing":
+        engine = SparseSignalEngine(mode="hashing", model_file=None, hash_features=hash_features)
+        engine.doc_freq = np.sum([df for _, df, _ in stats], axis=0).astype(np.int64)
+        engine.n_docs = sum(n for _, _, n in stats)
+        return engine
+    engine = SparseSignalEngine(mode="incremental", model_file=None, max_features=max_features)
+    totals = pd.DataFrame({
+        "term": np.concatenate([terms for (terms, _), _, _ in stats]) if stats else np.zeros(0, dtype=object),
+        "tf": np.concatenate([tf for (_, tf), _, _ in stats]) if stats else np.zeros(0, dtype=np.int64),
+        "df": np.concatenate([df for _, df, _ in stats]) if stats else np.zeros(0, dtype=np.int64),
+    }).groupby("term", sort=True).sum()
+    top = totals.sort_values("tf", ascending=False, kind="stable").head(max_features).sort_index()
+    engine.vocabulary = {term: i for i, term in enumerate(top.index)}
+    engine.doc_freq = top["df"].to_numpy(dtype=np.int64)
+    engine.n_docs = sum(n for _, _, n in stats)
+    return engine
+
+def _history_score_shard(n, scratch, engine, mode, matcher):
+    # worker, phase 3: score the kept tweets against the shared engine (or a fresh per-shard one)
+    df = _history_kept(scratch, n)
+    if df.empty:
+        return 0
+    if engine is None:
+        df["signal"] = SparseSignalEngine(mode=mode, model_file=None).score(df["content"].astype(str))
+    else:
+        df["signal"] = engine.score(df["content"].astype(str), update=False)
+    if matcher is not None:
+        df = score_lexicon(df, matcher)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), _shard_file(scratch, n, "scored.parquet"))
+    return len(df)
+
+def _pool_map(fn, jobs, executor=None):
+    """fn(*job) for every job, in job order; in-process without an executor or with a single job."""
+    if executor is None or len(jobs) <= 1:
+        return [fn(*job) for job in jobs]
+    return list(executor.map(fn, *zip(*jobs)))
+
+def _history_pool_size(workers, shards):
+    """
+    Worker processes worth starting for `shards`: at most one per shard and
+    per CPU, and 1 (run in-process) when the shards are too small to pay
+    for spawning the workers.
+    """
+    workers = min(workers, len(shards), os.cpu_count() or 1)
+    input_mb = sum(os.path.getsize(f) for _, files in shards for f in files) / 2**20
+    return workers if workers > 1 and input_mb >= HISTORY_POOL_MIN_MB else 1
+
+def analyze_history(start=None, end=None, hashtags=None, shard_by=HISTORY_SHARD_BY, workers=HISTORY_WORKERS,
+                    global_idf=HISTORY_GLOBAL_IDF, output=HISTORY_FILE, store=None):
+    """
+    Re-clean and re-score the stored history, on one shared process pool
+    when the store is big enough to pay for it (see _history_pool_size).
+
+    The store's partitions are grouped into shards (per date or per hashtag)
+    and only file paths travel to the workers; they memory-map the Parquet
+    parts and hand results back through scratch files. Phases:
+      1. workers normalize, order and dedup each shard and compute MinHash signatures
+      2. the parent drops content seen in an earlier shard and assigns
+         near-duplicate clusters shard by shard (in key order)
+      3. with global_idf, workers count document frequencies and the parent
+         merges them into one vocabulary/IDF (see global_signal_engine)
+      4. workers score every shard (signal + lexicon)
+      5. the parent concatenates the scored shards in key order into `output`
+    Every phase is deterministic, so the result does not depend on `workers`.
+    Returns counts and timings.
+    """
+    import tempfile
+    store = store or PartitionedTweetStore()
+    workers = max(1, workers or os.cpu_count() or 1)
+    shards = history_shards(store, start, end, hashtags, shard_by)
+    stats = {"shards": len(shards), "workers": workers, "read": 0, "cleaned": 0, "kept": 0, "written": 0}
+    if not shards:
+        print("[WARN] No stored partitions match; nothing to analyze.")
+        return stats
+    mode = "hashing" if SIGNAL_MODE == "hashing" else ("incremental" if global_idf else SIGNAL_MODE)
+    stats["workers"] = _history_pool_size(workers, shards)
+    pool = None
+    if stats["workers"] > 1:
+        import multiprocessing
+        # one pool for every phase; spawn, not fork: the parent may be running store compaction threads
+        pool = ProcessPoolExecutor(max_workers=stats["workers"], mp_context=multiprocessing.get_context("spawn"))
+    print(f"[INFO] Analyzing {len(shards)} shard(s) by {shard_by} on {stats['workers']} worker(s).")
+    t_start = time.perf_counter()
+    scratch_root = os.path.dirname(os.path.abspath(output))
+    with pool or contextlib.nullcontext(), \
+            tempfile.TemporaryDirectory(prefix="tqb-history-", dir=scratch_root) as scratch:
+        with METRICS.phase("analyze_clean"):
+            counts = _pool_map(_history_clean_shard, [(n, files, scratch, start, end, NEAR_DUP_NUM_PERM,
+                                                       NEAR_DUP_SHINGLE) for n, (_, files) in enumerate(shards)],
+                               pool)
+        stats["read"] = sum(r for r, _ in counts)
+        stats["cleaned"] = sum(c for _, c in counts)
+
+        with METRICS.phase("analyze_dedup"):
+            seen = set()
+            near_dups = NearDuplicateIndex(directory=None) if NEAR_DUP_MODE != "off" else None
+            for n in range(len(shards)):
+                head = pq.read_table(_shard_file(scratch, n, "clean.parquet"), columns=["tweet_id", "content_hash"])
+                hashes = head.column("content_hash").to_numpy()
+                keep = np.fromiter((h not in seen for h in hashes.tolist()), dtype=bool, count=len(hashes))
+                seen.update(hashes[keep].tolist())
+                clusters = np.full(len(hashes), -1, dtype=np.int64)
+                near = np.zeros(len(hashes), dtype=bool)
+                if near_dups is not None:
+                    signatures = np.load(_shard_file(scratch, n, "signatures.npy"), mmap_mode="r")
+                    empty = np.load(_shard_file(scratch, n, "empty.npy"), mmap_mode="r")
+                    ids = head.column("tweet_id").to_numpy(zero_copy_only=False)
+                    rows = np.flatnonzero(keep)
+                    for i in range(0, len(rows), NEAR_DUP_CHUNK_ROWS):
+                        r = rows[i:i + NEAR_DUP_CHUNK_ROWS]
+                        clusters[r], near[r] = near_dups.assign(np.asarray(signatures[r]), ids[r], empty[r],
+                                                                hashes[r])
+                    if NEAR_DUP_MODE == "drop":
+                        keep &= ~near
+                np.savez(_shard_file(scratch, n, "marks.npz"), keep=keep, dup_cluster=clusters,
+                         near_duplicate=near)
+                stats["kept"] += int(keep.sum())
+
+        engine = None
+        if global_idf:
+            with METRICS.phase("analyze_idf"):
+                term_stats = _pool_map(_history_term_stats, [(n, scratch, mode, SIGNAL_HASH_FEATURES)
+                                                             for n in range(len(shards))], pool)
+                engine = global_signal_engine(term_stats, mode)
+
+        with METRICS.phase("analyze_score"):
+            matcher = default_lexicon() if LEXICON_SCORING else None
+            scored = _pool_map(_history_score_shard, [(n, scratch, engine, mode, matcher)
+                                                      for n in range(len(shards))], pool)
+
+        with METRICS.phase("analyze_merge"):
+            writer = None
+            tmp = output + ".tmp"
+            try:
+                for n, rows in enumerate(scored):
+                    if not rows:
+                        continue
+                    table = pq.read_table(_shard_file(scratch, n, "scored.parquet"), memory_map=True)
+                    if writer is None:
+                        schema = table.schema.remove_metadata()
+                        writer = pq.ParquetWriter(tmp, schema, compression="zstd")
+                    writer.write_table(table.cast(schema))
+                    stats["written"] += table.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is not None:
+                os.replace(tmp, output)
+    stats["seconds"] = time.perf_counter() - t_start
+    print(f"[INFO] History analysis: {stats['written']} of {stats['read']} tweets scored into {output} "
+          f"in {stats['seconds']:.1f}s.")
+    return stats
 
 # =================== RUN ===================
-if __name__ == "__main__":
-    print("[START] Running Twitter/X scraper.")
+def collect_then_analyze():
+    """
+    Original flow: scrape every hashtag, then clean and score the last
+    CLEAN_WINDOW of the store in one pass.
+    """
     collected = collect_all_hashtags()
     print(f"[INFO] Total raw tweets collected: {len(collected)}")
 
-    cleaned = clean_tweets(collected)
+    if STREAMING_CLEAN:
+        stats = clean_stored_tweets()
+        cleaned = pd.read_parquet(CLEANED_FILE) if stats["written"] else pd.DataFrame()
+    else:
+        # this run's tweets are already in the store; read back just the last day
+        recent = PartitionedTweetStore().read(start=datetime.now(timezone.utc) - CLEAN_WINDOW)
+        cleaned = clean_tweets(recent)
+        save_cleaned(cleaned)
+    if NEAR_DUP_MODE != "off":
+        default_near_duplicate_index().flush()
     print(f"[INFO] Cleaned tweets (24h): {len(cleaned)}")
-    save_cleaned(cleaned)
 
     if not cleaned.empty:
         cleaned = generate_signal(cleaned)
         print("[INFO] Generated 'signal' scores.")
+        if LEXICON_SCORING:
+            cleaned = score_lexicon(cleaned)
+            print(f"[INFO] Lexicon scored: mean direction {cleaned['direction'].mean():+.3f}.")
+        # the cleaned frame holds every tweet of its 24h window, so its bars replace the stored ones
+        series = SignalSeries()
+        touched = series.update(cleaned, replace=True)
+        series.save()
+        print(f"[INFO] Updated signal series in {SERIES_DIR} ({', '.join(f'{k}: {v} bars' for k, v in touched.items())}).")
         plot_signals(cleaned)
     else:
         print("[INFO] No cleaned tweets available for analysis.")
 
+def collect_streaming():
+    """
+    Scrape every hashtag through a StreamingPipeline, so each scroll batch is
+    cleaned, scored and persisted while the next one is scraped.
+    """
+    with StreamingPipeline() as pipeline:
+        collected = collect_all_hashtags(pipeline=pipeline)
+    print(f"[INFO] Total raw tweets collected: {len(collected)}")
+    scored = pipeline.signal_store.read(start=datetime.now(timezone.utc) - CLEAN_WINDOW)
+    print(f"[INFO] Scored tweets (24h) in {SIGNAL_STORE_DIR}: {len(scored)}")
+    if not scored.empty:
+        plot_signals(scored)
+
+def run_collection():
+    print("[START] Running Twitter/X scraper.")
+    with profiled():
+        if PIPELINE:
+            collect_streaming()
+        else:
+            collect_then_analyze()
+
+    METRICS.print_summary()
+    METRICS.write_report()
+    report_startup()
+    close_reports()
     print("[END] Done.")
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Collect, clean and score hashtag tweets from X.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep one session alive and poll every hashtag on an adaptive schedule")
+    parser.add_argument("--analyze", action="store_true",
+                        help="re-clean and re-score the stored history on a process pool instead of collecting")
+    parser.add_argument("--days", type=int, default=None, help="with --analyze: only the last DAYS days")
+    parser.add_argument("--workers", type=int, default=HISTORY_WORKERS, help="with --analyze: worker processes")
+    parser.add_argument("--shard-by", choices=("date", "tag"), default=HISTORY_SHARD_BY,
+                        help="with --analyze: one task per tweet date or per hashtag")
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        run_daemon()
+        METRICS.print_summary()
+        METRICS.write_report()
+        return
+    if args.analyze:
+        start = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+        analyze_history(start=start, shard_by=args.shard_by, workers=args.workers)
+        METRICS.print_summary()
+        return
+    run_collection()
+
+if __name__ == "__main__":
+    main()